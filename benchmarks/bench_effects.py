@@ -0,0 +1,268 @@
+"""Speed of the audio effects and the playback path.
+
+Measures every `AudioEffect` subclass, a few `AudioFxChain` combinations,
+`AudioSignal.get_chunk`, `Sample.get_chunk` (looped, with gain),
+`AudioSignal.load` and the audio callback of `SamplePlayer` (live effects
+and pre-rendered) for mono and stereo audio at block sizes from 64 to
+4096 samples. Reported are the processing time per sample frame (ns, all
+channels) and the realtime factor (audio duration / processing time; the
+audio callback has to stay well above 1).
+
+Results can be saved as JSON and compared against a baseline, cases more
+than `--threshold` slower than in the baseline are reported as
+regressions (exit code 1).
+
+Usage:
+
+    python benchmarks/bench_effects.py [--blocksizes 64 256 1024 4096]
+        [--min-time SECONDS] [--only NAME ...] [--save FILE]
+        [--baseline FILE] [--threshold 0.25]
+"""
+
+# external imports
+import os
+import sys
+import json
+import time
+import wave
+import inspect
+import platform
+import argparse
+import tempfile
+import numpy as np
+from typing import Callable
+# make the package importable when run as a script from the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+# internal imports
+from sb4deartraining.config import _SR, _DTYPE
+from sb4deartraining.effects import basic, filters, volume, stereo
+from sb4deartraining.effects.basic import AudioEffect, AudioFxChain
+from sb4deartraining.playback.samples import AudioSignal, Sample
+from sb4deartraining.playback.rendering import RenderedSample
+
+BLOCKSIZES = [64, 128, 256, 512, 1024, 2048, 4096]
+CHANNELS = [1, 2]
+# parameters of the effects (defaults of some effects are a bypass)
+EFFECT_PARAMS = {
+    "Amplifier": {"gain_db": -6},
+    "ParametricEQ": {"freq": 1000, "q": 2, "gain": 6},
+    "LowPassFilter": {"cutoff": 5000},
+    "HighPassFilter": {"cutoff": 100},
+    "StereoControl": {"pos": 0.5, "width": 0.5},
+}
+# effects chains as used by the exercises
+CHAINS = {
+    "chain:eq+amp": lambda: [filters.ParametricEQ(1000, 2, 6), volume.Amplifier(-6)],
+    "chain:hp+eq+stereo": lambda: [filters.HighPassFilter(100), filters.ParametricEQ(1000, 2, 6),
+                                   stereo.StereoControl(0.5, 0.5)],
+    "chain:comp+amp": lambda: [volume.Compressor(), volume.Amplifier(3)],
+}
+
+
+def measure(func:Callable, min_time:float, min_repeats:int=3) -> tuple[float, int]:
+    """Calls a function (after a warm-up call) until `min_time` seconds
+    and `min_repeats` calls have passed. Returns the mean time per call
+    and the number of calls."""
+    func()
+    repeats, elapsed = 0, 0.
+    start = time.perf_counter()
+    while elapsed < min_time or repeats < min_repeats:
+        func()
+        repeats += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / repeats, repeats
+
+
+def get_effect_classes() -> list[type]:
+    """All concrete subclasses of `AudioEffect` in the effects modules
+    (base classes like `Filter` are left out)."""
+    classes = []
+    for module in [basic, filters, volume, stereo]:
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if issubclass(cls, AudioEffect) and cls.__module__ == module.__name__ \
+                    and not cls.__subclasses__():
+                classes.append(cls)
+    return classes
+
+
+def get_noise(num_channels:int, num_samples:int, seed:int=0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    data = 0.25 * rng.standard_normal((num_channels, num_samples)).astype(_DTYPE)
+    return data[0] if num_channels == 1 else data
+
+
+def write_wav(file:str, audiodata:np.ndarray, sr:int=_SR):
+    frames = audiodata if audiodata.ndim == 1 else audiodata.T
+    with wave.open(file, "wb") as w:
+        w.setnchannels(1 if audiodata.ndim == 1 else audiodata.shape[0])
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes((np.clip(frames, -1, 1) * (2 ** 15 - 1)).astype("<i2").tobytes())
+
+
+def make_result(name:str, group:str, num_channels:int, blocksize:int,
+                seconds:float, repeats:int, sr:int=_SR) -> dict:
+    return {
+        "name": name,
+        "group": group,
+        "channels": num_channels,
+        "blocksize": blocksize,
+        "ns_per_sample": 1e9 * seconds / blocksize,
+        "realtime_factor": blocksize / sr / seconds,
+        "repeats": repeats,
+    }
+
+
+def is_selected(name:str, only:list[str]=None) -> bool:
+    return not only or any(part in name for part in only)
+
+
+def bench_effects(blocksizes:list[int], min_time:float, only:list[str]=None) -> list[dict]:
+    """Effects and effects chains processing one block per call."""
+    cases = {}
+    for cls in get_effect_classes():
+        cases[cls.__name__] = ("effect", lambda cls=cls: [cls(**EFFECT_PARAMS.get(cls.__name__, {}))])
+    for name, make_fxs in CHAINS.items():
+        cases[name] = ("chain", make_fxs)
+    results = []
+    for name, (group, make_fxs) in cases.items():
+        if not is_selected(name, only):
+            continue
+        for num_channels in CHANNELS:
+            for blocksize in blocksizes:
+                block = get_noise(num_channels, blocksize)
+                try:
+                    fxs = AudioFxChain(make_fxs())
+                    fxs(block)
+                except Exception as e:
+                    # e.g. effects without mono support
+                    print(f"skipped {name} ({num_channels} ch): {type(e).__name__}: {e}")
+                    break
+                seconds, repeats = measure(lambda: fxs(block), min_time)
+                results.append(make_result(name, group, num_channels, blocksize, seconds, repeats))
+    return results
+
+
+def bench_playback(blocksizes:list[int], min_time:float, tmp_dir:str,
+                   only:list[str]=None) -> list[dict]:
+    """Reading chunks, loading files and the audio callback."""
+    results = []
+    for num_channels in CHANNELS:
+        data = get_noise(num_channels, 10 * _SR)
+        file = os.path.join(tmp_dir, f"noise_{num_channels}.wav")
+        write_wav(file, data)
+        signal = AudioSignal(data, _SR)
+        sample = Sample(os.path.basename(file), file, loop=True, gain_db=-3)
+        fxs = AudioFxChain([filters.ParametricEQ(1000, 2, 6)])
+        wet = RenderedSample(sample, fxs)
+        # loading a file (10 s) per call
+        if is_selected("AudioSignal.load", only):
+            seconds, repeats = measure(lambda: AudioSignal.load(file), min_time, 1)
+            results.append(make_result("AudioSignal.load", "io", num_channels, signal.num_samples,
+                                       seconds, repeats))
+        players = get_players(sample, fxs, wet)
+        for blocksize in blocksizes:
+            for name, get_chunk in [("AudioSignal.get_chunk", signal.get_chunk),
+                                    ("Sample.get_chunk", sample.get_chunk)]:
+                if not is_selected(name, only):
+                    continue
+                # each case walks through the signal from its start
+                idx = 0
+                def read():
+                    # (wrapping around before the end of the signal)
+                    nonlocal idx
+                    get_chunk(idx, blocksize)
+                    idx = (idx + blocksize) % (signal.num_samples - blocksize)
+                seconds, repeats = measure(read, min_time)
+                results.append(make_result(name, "playback", num_channels, blocksize, seconds, repeats))
+            for name, player in players.items():
+                if not is_selected(name, only):
+                    continue
+                outdata = np.empty((blocksize, num_channels), dtype=_DTYPE)
+                player.idx = 0
+                seconds, repeats = measure(lambda: player._callback(outdata, blocksize, None, None), min_time)
+                results.append(make_result(name, "playback", num_channels, blocksize, seconds, repeats))
+    return results
+
+
+def get_players(sample:Sample, fxs:AudioFxChain, wet:RenderedSample) -> dict:
+    """Players with the effects applied live and pre-rendered (empty if
+    the user interface dependencies are not installed)."""
+    try:
+        from sb4deartraining.playback.player import SamplePlayer
+        # playing (the callback stops the stream otherwise), without an audio device
+        return {
+            "SamplePlayer._callback:live": SamplePlayer(sample, fxs, True, fxs_on=True),
+            "SamplePlayer._callback:rendered": SamplePlayer(sample, fxs, True, fxs_on=True, wet=wet),
+        }
+    except ImportError as e:
+        print(f"skipped SamplePlayer._callback: {e}")
+        return {}
+
+
+def compare(results:list[dict], baseline:list[dict], threshold:float) -> list[dict]:
+    """Returns the cases more than `threshold` (relative) slower than in
+    the baseline, with the ratio of the times added."""
+    reference = {(r["name"], r["channels"], r["blocksize"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get((result["name"], result["channels"], result["blocksize"]))
+        if base is None:
+            continue
+        ratio = result["ns_per_sample"] / base["ns_per_sample"]
+        if ratio > 1 + threshold:
+            regressions.append({**result, "baseline_ns_per_sample": base["ns_per_sample"], "ratio": ratio})
+    return regressions
+
+
+def print_results(results:list[dict]):
+    print(f"{'case':34s} {'ch':>2s} {'block':>6s} {'ns/sample':>11s} {'realtime':>10s}")
+    for r in results:
+        print(f"{r['name']:34s} {r['channels']:2d} {r['blocksize']:6d} "
+              f"{r['ns_per_sample']:11.1f} {r['realtime_factor']:9.1f}x")
+
+
+def main(argv:list[str]=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocksizes", type=int, nargs="+", default=BLOCKSIZES, help="block sizes")
+    parser.add_argument("--min-time", type=float, default=0.1, help="min. time per case (s)")
+    parser.add_argument("--only", nargs="+", help="run only cases containing one of these names")
+    parser.add_argument("--save", help="save the results to a JSON file")
+    parser.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown reported as regression")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = bench_effects(args.blocksizes, args.min_time, args.only) \
+            + bench_playback(args.blocksizes, args.min_time, tmp_dir, args.only)
+    print_results(results)
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "dtype": _DTYPE,
+            "sr": _SR,
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']} ({r['channels']} ch, block {r['blocksize']}): "
+                  f"{r['ns_per_sample']:.1f} ns/sample vs. {r['baseline_ns_per_sample']:.1f} "
+                  f"({r['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions (threshold {args.threshold:.0%}).")
+    return report
+
+
+if __name__ == "__main__":
+    main()
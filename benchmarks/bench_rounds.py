@@ -0,0 +1,82 @@
+"""Throughput of the headless exercises (no user interface or audio device).
+
+Measures how many rounds per second each exercise generates (options,
+solution, sample selection, effects chain) and answers, and optionally
+how many it renders (wet sample, see `Exercise.render`).
+
+Usage:
+
+    python benchmarks/bench_rounds.py [--samples PATH] [--rounds N] [--render] [--seed N]
+
+With the same seed (default 0), every run plays the same rounds.
+"""
+
+# external imports
+import os
+import sys
+import time
+import random
+import argparse
+# make the package importable when run as a script from the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+# internal imports
+from sb4deartraining.config import _AUDIO_SAMPLE_PATH, _SAMPLE_CACHE_PATH
+from sb4deartraining.playback.samples import SampleSelector
+from sb4deartraining.games.volume import GainExercise
+from sb4deartraining.games.frequency import FrequencyExercise
+from sb4deartraining.games.stereo import PanningExercise, WidthExercise
+
+EXERCISES = [GainExercise, FrequencyExercise, PanningExercise, WidthExercise]
+
+
+def bench_exercise(exercise_class:type, selector:SampleSelector, num_rounds:int, 
+                   render:bool=False, seed:int=0) -> dict:
+    """Plays `num_rounds` rounds with random answers and returns the
+    throughput (rounds per second)."""
+    rng = random.Random(seed)
+    exercise = exercise_class(sample_selector=selector, render=render, prerender_depth=0,
+                              rng=seed)
+    try:
+        # warm up (sample store, memoized library queries)
+        for _ in range(min(num_rounds, 10)):
+            exercise.next_round()
+        start = time.perf_counter()
+        for _ in range(num_rounds):
+            exercise.next_round()
+            exercise.answer(rng.randrange(len(exercise.options)))
+        seconds = time.perf_counter() - start
+    finally:
+        exercise.close()
+    return {
+        "exercise": exercise_class.__name__,
+        "render": render,
+        "rounds": num_rounds,
+        "seconds": seconds,
+        "rounds_per_second": num_rounds / seconds,
+    }
+
+
+def main(argv:list[str]=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", default=_AUDIO_SAMPLE_PATH, help="sample directory")
+    parser.add_argument("--cache", default=_SAMPLE_CACHE_PATH, help="cache directory")
+    parser.add_argument("--rounds", type=int, default=1000, help="rounds per exercise")
+    parser.add_argument("--render", action="store_true", help="also render the wet samples")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the rounds and answers")
+    args = parser.parse_args(argv)
+    selector = SampleSelector(args.samples, args.cache)
+    results = []
+    for exercise_class in EXERCISES:
+        for render in ([False, True] if args.render else [False]):
+            # rendering is much slower, keep the run time reasonable
+            num_rounds = max(1, args.rounds // 100) if render else args.rounds
+            result = bench_exercise(exercise_class, selector, num_rounds, render, args.seed)
+            results.append(result)
+            print(f"{result['exercise']:18s} render={str(render):5s} "
+                  f"{result['rounds_per_second']:10.1f} rounds/s")
+    selector.close()
+    return results
+
+
+if __name__ == "__main__":
+    main()
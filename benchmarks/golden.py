@@ -0,0 +1,266 @@
+"""Golden renders of the audio effects for regression tests.
+
+The output of each effect (see `GOLDEN_CASES`) for a set of test signals
+(synthetic signals and excerpts of the bundled samples) is stored once
+in a compact form: a hash of the exact output, its RMS and peak level
+and a decimated copy (every n-th sample). Optimized implementations of
+the effects (vectorized, fused, other precision, ...) are then verified
+against these goldens: outputs have to be identical or within the
+tolerance of the effect. Besides, effects have to be invariant to the
+block size, i.e. processing a signal in small blocks (as in the audio
+callback) has to give the same output as processing it in one go (as
+when rendering).
+
+The goldens and the bundled samples are looked up relative to this 
+file, i.e. in the repository (they are not part of the package).
+
+Usage:
+
+    python benchmarks/golden.py [--update] [--path FILE]
+"""
+
+# external imports
+import os
+import sys
+import glob
+import json
+import hashlib
+import argparse
+import numpy as np
+from typing import Callable, NamedTuple
+# make the package importable when run as a script from the repository
+_REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _REPO_PATH)
+# internal imports
+from sb4deartraining.config import _SR, _DTYPE
+from sb4deartraining.effects.basic import AudioEffect, AudioFxChain
+from sb4deartraining.effects.filters import LowPassFilter, HighPassFilter, ParametricEQ, KWeightingFilter
+from sb4deartraining.effects.volume import Amplifier, Compressor
+from sb4deartraining.effects.stereo import StereoControl
+
+_FORMAT_VERSION = 1
+GOLDEN_PATH = os.path.join(_REPO_PATH, "benchmarks", "goldens", "effects.npz")  # golden renders
+SAMPLE_PATH = os.path.join(_REPO_PATH, "samples")   # bundled samples of the repository
+DURATION = 0.25                                     # length of the test signals (s)
+DECIMATION = 256                                    # every n-th sample of renders is stored
+
+
+class GoldenCase(NamedTuple):
+    """An effect setting covered by the goldens."""
+    make_effect:Callable[[], AudioEffect]   # creates the effect (with a fresh state)
+    tolerance:float                         # max. absolute deviation from the golden output
+
+
+GOLDEN_CASES = {
+    "Amplifier": GoldenCase(lambda: Amplifier(-6), 1e-6),
+    "Amplifier:clip": GoldenCase(lambda: Amplifier(12), 1e-6),
+    "LowPassFilter": GoldenCase(lambda: LowPassFilter(2000), 1e-5),
+    "HighPassFilter": GoldenCase(lambda: HighPassFilter(200), 1e-5),
+    "ParametricEQ:boost": GoldenCase(lambda: ParametricEQ(1000, 2, 9), 1e-5),
+    "ParametricEQ:cut": GoldenCase(lambda: ParametricEQ(250, 4, -12), 1e-5),
+    "KWeightingFilter": GoldenCase(lambda: KWeightingFilter(), 1e-5),
+    "Compressor": GoldenCase(lambda: Compressor(-24, 4, 10, 100, 6), 1e-4),
+    "StereoControl": GoldenCase(lambda: StereoControl(0.5, 0.5), 1e-6),
+    "chain": GoldenCase(lambda: AudioFxChain([HighPassFilter(100), ParametricEQ(3000, 1, 6),
+                                              Amplifier(-3)]), 1e-5),
+}
+
+
+class GoldenMismatch(NamedTuple):
+    """A render deviating from its golden."""
+    case:str                # name of the case (see `GOLDEN_CASES`)
+    signal:str              # name of the test signal
+    reason:str              # description of the deviation
+    error:float = None      # max. absolute deviation (if comparable)
+
+
+def get_synthetic_signals(duration:float=DURATION, sr:int=_SR, seed:int=0) -> dict[str, np.ndarray]:
+    """Synthetic test signals (noise, sweep, impulse, level steps)."""
+    num_samples = int(duration * sr)
+    t = np.arange(num_samples) / sr
+    rng = np.random.default_rng(seed)
+    noise = 0.25 * rng.standard_normal((2, num_samples))
+    # logarithmic sweep from 20 Hz to 20 kHz
+    k = np.log(1000) / duration
+    sweep = 0.8 * np.sin(2 * np.pi * 20 * (np.exp(k * t) - 1) / k)
+    impulse = np.zeros(num_samples)
+    impulse[100] = 1
+    # quiet, then loud sine (attack and release of dynamics)
+    level = np.where((t > duration / 4) & (t < 3 * duration / 4), 0.9, 0.05)
+    steps = level * np.sin(2 * np.pi * 1000 * t + np.array([[0], [np.pi / 3]]))
+    signals = {
+        "noise:mono": noise[0],
+        "noise:stereo": np.stack([noise[0], 0.6 * noise[0] + 0.8 * noise[1]]),
+        "sweep:mono": sweep,
+        "impulse:mono": impulse,
+        "steps:stereo": steps,
+    }
+    return {name: signal.astype(_DTYPE) for name, signal in signals.items()}
+
+
+def get_sample_signals(path:str=SAMPLE_PATH, duration:float=DURATION) -> dict[str, np.ndarray]:
+    """Excerpts (from the middle) of the bundled samples (of the
+    repository, independent of the working directory)."""
+    from sb4deartraining.playback.samples import AudioSignal
+    signals = {}
+    for file in sorted(glob.glob(os.path.join(path, "*.wav"))):
+        audio = AudioSignal.load(file)
+        num_samples = int(duration * audio.sr)
+        start = max(audio.num_samples - num_samples, 0) // 2
+        signals[os.path.basename(file)] = audio.get_chunk(start, num_samples)
+    return signals
+
+
+def get_signals(path:str=SAMPLE_PATH, duration:float=DURATION) -> dict[str, np.ndarray]:
+    """All test signals (synthetic and samples, see above)."""
+    return {**get_synthetic_signals(duration), **get_sample_signals(path, duration)}
+
+
+def render(case:GoldenCase, audiodata:np.ndarray, blocksize:int=None) -> np.ndarray:
+    """Processes audio data with a fresh effect, in one go or in blocks."""
+    effect = case.make_effect()
+    if blocksize is None:
+        return effect(audiodata)
+    blocks = [effect(audiodata[..., i:i + blocksize])
+              for i in range(0, audiodata.shape[-1], blocksize)]
+    return np.concatenate(blocks, axis=-1)
+
+
+def get_hash(audiodata:np.ndarray) -> str:
+    """Hash of the exact values (and shape and precision) of an array."""
+    audiodata = np.ascontiguousarray(audiodata)
+    digest = hashlib.sha256(f"{audiodata.dtype.str}{audiodata.shape}".encode())
+    digest.update(audiodata.tobytes())
+    return digest.hexdigest()
+
+
+def summarize(audiodata:np.ndarray, decimation:int=DECIMATION) -> tuple[dict, np.ndarray]:
+    """Compact form of a render: hash, shape, RMS and peak level, and the
+    decimated output."""
+    data = audiodata.astype(np.float64)
+    info = {
+        "hash": get_hash(audiodata),
+        "shape": list(audiodata.shape),
+        "rms": float(np.sqrt(np.mean(data ** 2))),
+        "peak": float(np.max(np.abs(data))),
+    }
+    return info, np.ascontiguousarray(audiodata[..., ::decimation])
+
+
+def get_key(name:str, signal:str) -> str:
+    return f"{name}|{signal}"
+
+
+def make_goldens(path:str=GOLDEN_PATH, cases:dict[str, GoldenCase]=GOLDEN_CASES,
+                 signals:dict[str, np.ndarray]=None, decimation:int=DECIMATION):
+    """Renders all test signals with the given effects and saves the
+    goldens (overwriting existing ones).
+
+    Arguments:
+    - path: golden file (compressed NumPy archive)
+    - cases: effect settings
+    - signals: test signals (see `get_signals()` by default)
+    - decimation: keep every n-th sample of the renders
+    """
+    if signals is None:
+        signals = get_signals()
+    meta = {"version": _FORMAT_VERSION, "sr": _SR, "dtype": _DTYPE,
+            "decimation": decimation, "inputs": {}, "renders": {}}
+    arrays = {}
+    for signal, audiodata in signals.items():
+        meta["inputs"][signal] = get_hash(audiodata)
+        for name, case in cases.items():
+            key = get_key(name, signal)
+            meta["renders"][key], arrays[key] = summarize(render(case, audiodata), decimation)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez_compressed(path, __meta__=np.array(json.dumps(meta)), **arrays)
+
+
+def load_goldens(path:str=GOLDEN_PATH) -> tuple[dict, dict[str, np.ndarray]]:
+    """Loads the metadata and decimated renders of the goldens."""
+    with np.load(path, allow_pickle=False) as archive:
+        meta = json.loads(str(archive["__meta__"]))
+        arrays = {key: archive[key] for key in archive.files if key != "__meta__"}
+    if meta["version"] != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported golden format version: {meta['version']}")
+    return meta, arrays
+
+
+def compare(name:str, signal:str, case:GoldenCase, audiodata:np.ndarray,
+            info:dict, golden:np.ndarray, decimation:int) -> GoldenMismatch:
+    """Compares a render with its golden (returns None if it matches)."""
+    if list(audiodata.shape) != info["shape"]:
+        return GoldenMismatch(name, signal, f"shape {audiodata.shape} != {tuple(info['shape'])}")
+    if get_hash(audiodata) == info["hash"]:
+        return None
+    new_info, decimated = summarize(audiodata, decimation)
+    error = max(float(np.max(np.abs(decimated.astype(np.float64) - golden))),
+                abs(new_info["rms"] - info["rms"]), abs(new_info["peak"] - info["peak"]))
+    if error > case.tolerance:
+        return GoldenMismatch(name, signal, f"deviation above tolerance {case.tolerance:g}", error)
+    return None
+
+
+def verify_goldens(path:str=GOLDEN_PATH, cases:dict[str, GoldenCase]=GOLDEN_CASES,
+                   signals:dict[str, np.ndarray]=None) -> list[GoldenMismatch]:
+    """Renders the test signals with the (current implementations of
+    the) effects and compares them with the goldens. Returns all
+    deviations beyond the tolerances of the effects (and goldens which
+    could not be checked as their effect or test signal is missing or
+    changed).
+
+    Arguments:
+    - path: golden file (see `make_goldens()`)
+    - cases: effect settings
+    - signals: test signals (see `get_signals()` by default)
+    """
+    meta, arrays = load_goldens(path)
+    if signals is None:
+        signals = get_signals()
+    mismatches = []
+    for key, info in meta["renders"].items():
+        name, signal = key.split("|", 1)
+        if name not in cases:
+            mismatches.append(GoldenMismatch(name, signal, "missing effect"))
+        elif signal not in signals:
+            mismatches.append(GoldenMismatch(name, signal, "missing test signal"))
+        elif get_hash(signals[signal]) != meta["inputs"][signal]:
+            mismatches.append(GoldenMismatch(name, signal, "changed test signal"))
+        else:
+            audiodata = render(cases[name], signals[signal])
+            mismatch = compare(name, signal, cases[name], audiodata, info, arrays[key],
+                               meta["decimation"])
+            if mismatch is not None:
+                mismatches.append(mismatch)
+    return mismatches
+
+
+def check_block_invariance(case:GoldenCase, audiodata:np.ndarray, blocksize:int=64) -> float:
+    """Max. absolute difference between processing audio data in blocks
+    and in one go (0 for block size invariant effects)."""
+    whole = render(case, audiodata)
+    blocks = render(case, audiodata, blocksize)
+    if whole.shape != blocks.shape:
+        return np.inf
+    return float(np.max(np.abs(whole.astype(np.float64) - blocks)))
+
+
+def main(argv:list[str]=None):
+    parser = argparse.ArgumentParser(description="Verify (or update) the golden renders of the effects.")
+    parser.add_argument("--path", default=GOLDEN_PATH, help="golden file")
+    parser.add_argument("--update", action="store_true", help="render and save new goldens")
+    args = parser.parse_args(argv)
+    if args.update:
+        make_goldens(args.path)
+        print(f"Saved goldens to {args.path}")
+        return []
+    mismatches = verify_goldens(args.path)
+    for mismatch in mismatches:
+        error = "" if mismatch.error is None else f" (max. error {mismatch.error:.3g})"
+        print(f"{mismatch.case} / {mismatch.signal}: {mismatch.reason}{error}")
+    print(f"{len(mismatches)} mismatches")
+    return mismatches
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,20 @@
 on technical hearing in the context of audio production.
 The goal is to learn to recognize parameter settings for
 common audio effects such as EQ/filters, compression, as
-well as level balance and stereo field placement."""
\ No newline at end of file
+well as level balance and stereo field placement.
+
+Subpackages are imported lazily on first access (PEP 562)."""
+
+import importlib
+
+_SUBPACKAGES = ["effects", "games", "playback", "server", "utilities"]
+
+
+def __getattr__(name:str):
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + _SUBPACKAGES)
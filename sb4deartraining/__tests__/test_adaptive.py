@@ -0,0 +1,153 @@
+"""Test cases for the adaptive difficulty of exercises."""
+# external import
+import os
+import wave
+import tempfile
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.playback.samples import SampleSelector
+from sb4deartraining.games.adaptive import DifficultyScheduler
+from sb4deartraining.games.adaptive import StaircaseScheduler, EloScheduler
+from sb4deartraining.games.volume import GainExercise
+from sb4deartraining.games.frequency import FrequencyExercise
+from sb4deartraining.games.stereo import PanningExercise, WidthExercise
+
+
+def simulate(scheduler:DifficultyScheduler, p_correct:list[float], num_rounds:int=3000) -> np.ndarray:
+    """Plays rounds answered correctly with a probability per level and
+    returns the levels played."""
+    rng = np.random.default_rng(0)
+    levels = []
+    for _ in range(num_rounds):
+        level = scheduler.difficulty
+        scheduler.update(rng.random() < p_correct[level], level)
+        levels.append(level)
+    return np.array(levels)
+
+
+class TestSchedulers(TestCase):
+
+    def test_staircase(self):
+        scheduler = StaircaseScheduler(5, down=2, up=1)
+        for is_correct, level in [(True, 0), (True, 1), (True, 1), (True, 2), (False, 1), (False, 0), (False, 0)]:
+            scheduler.update(is_correct)
+            self.assertEqual(scheduler.difficulty, level)
+
+    def test_convergence(self):
+        # the user answers 95% correctly up to level 2 and guesses above
+        p_correct = [0.95, 0.95, 0.95, 0.4, 0.4]
+        for scheduler in [StaircaseScheduler(5), EloScheduler(5)]:
+            levels = simulate(scheduler, p_correct)
+            counts = np.bincount(levels[500:], minlength=5)
+            self.assertEqual(np.argmax(counts), 2, type(scheduler).__name__)
+
+    def test_elo(self):
+        scheduler = EloScheduler(4, target=0.75)
+        self.assertEqual(scheduler.difficulty, 0)
+        self.assertAlmostEqual(scheduler.expected(0), 0.75)
+        for _ in range(100):
+            scheduler.update(True)
+        self.assertEqual(scheduler.difficulty, 3)
+        with self.assertRaises(ValueError):
+            EloScheduler(4, target=1)
+
+    def test_state(self):
+        for scheduler in [StaircaseScheduler(5), EloScheduler(5)]:
+            for is_correct in [True, True, True, False, True]:
+                scheduler.update(is_correct)
+            restored = DifficultyScheduler.from_dict(scheduler.as_dict())
+            self.assertIs(type(restored), type(scheduler))
+            self.assertEqual(vars(restored), vars(scheduler))
+        with self.assertRaises(ValueError):
+            DifficultyScheduler.from_dict({"type": "Unknown"})
+
+
+class TestAdaptiveExercise(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        pcm = np.random.default_rng(2).integers(-2**13, 2**13, size=(_SR // 4, 2), dtype=np.int16)
+        with wave.open(os.path.join(cls.tmp_dir.name, "a.wav"), "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(_SR)
+            w.writeframes(pcm.tobytes())
+        cls.selector = SampleSelector(cls.tmp_dir.name, cache_path=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.selector.close()
+        cls.tmp_dir.cleanup()
+
+    def test_levels(self):
+        for exercise_class in [GainExercise, FrequencyExercise, PanningExercise, WidthExercise]:
+            num_levels = len(exercise_class.difficulty_levels)
+            scheduler = StaircaseScheduler(num_levels, down=1)
+            exercise = exercise_class(sample_selector=self.selector, render=False,
+                                      prerender_depth=0, scheduler=scheduler)
+            self.addCleanup(exercise.close)
+            defaults = exercise.get_settings()
+            # correct answers make the rounds harder up to the last level
+            for level in list(range(num_levels)) + [num_levels - 1]:
+                round = exercise.next_round()
+                self.assertEqual(round.difficulty, level)
+                settings = exercise.get_settings(level)
+                for name, val in exercise_class.difficulty_levels[level].items():
+                    self.assertEqual(settings[name], val)
+                if "num_choices" in exercise_class.difficulty_levels[level]:
+                    self.assertEqual(len(round.options), settings["num_choices"])
+                exercise.answer(round.options.index(round.solution))
+            # the settings of the levels are not set on the exercise
+            self.assertEqual(exercise.get_settings(), defaults)
+        # settings are applied to the rounds
+        exercise = GainExercise(sample_selector=self.selector, render=False, prerender_depth=0,
+                                scheduler=StaircaseScheduler(5, start=4))
+        self.addCleanup(exercise.close)
+        round = exercise.next_round()
+        values = [option["value"] for option in round.options]
+        self.assertEqual(len(values), 5)
+        self.assertTrue(np.all(np.diff(values) % 1 == 0))
+
+    def test_concurrent_levels(self):
+        # rounds of different levels prepared by several workers get the
+        # settings of their own level
+        scheduler = StaircaseScheduler(5)
+        exercise = FrequencyExercise(sample_selector=self.selector, render=False,
+                                     prerender_depth=0, scheduler=scheduler)
+        self.addCleanup(exercise.close)
+        def make_round(level:int):
+            scheduler.level = level
+            return exercise.new_round()
+        with ThreadPoolExecutor(4) as executor:
+            rounds = list(executor.map(make_round, [0, 4] * 20))
+        for round in rounds:
+            eq = round.fxs.fxs[0]
+            level = FrequencyExercise.difficulty_levels[round.difficulty]
+            self.assertEqual((eq.gain, eq.q), (level["eq_gain"], level["eq_q"]))
+
+    def test_option_buttons(self):
+        try:
+            import ipywidgets
+        except ImportError:
+            self.skipTest("ipywidgets is not installed")
+        from sb4deartraining.games.stereo import GuessWhere
+        game = GuessWhere(sample_selector=self.selector, prerender_depth=0,
+                          scheduler=StaircaseScheduler(4, down=1))
+        self.addCleanup(game.exercise.close)
+        self.assertEqual(len(game.choice_buttons), 3)
+        game.evaluate_choice(game.choice_buttons[game.options.index(game.solution)])
+        game.player.start = lambda: None
+        game._restart_button_click(game.restart_button)
+        # the buttons follow the number of options of the new level
+        self.assertEqual(len(game.choice_buttons), 5)
+        self.assertEqual(list(game.button_box.children), game.choice_buttons)
+        self.assertEqual([b.description for b in game.choice_buttons],
+                         [option["label"] for option in game.options])
+
+    def test_invalid_scheduler(self):
+        with self.assertRaises(ValueError):
+            GainExercise(sample_selector=self.selector, scheduler=StaircaseScheduler(2))
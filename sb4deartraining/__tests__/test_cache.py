@@ -0,0 +1,60 @@
+"""Test cases for sample caching."""
+# external import
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.playback.cache import SampleCache
+
+
+class TestSampleCache(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = SampleCache(os.path.join(self.tmp_dir.name, "cache"))
+        # dummy "audio file"
+        self.file = os.path.join(self.tmp_dir.name, "sample.wav")
+        with open(self.file, "wb") as f:
+            f.write(b"dummy")
+        self.num_decodes = 0
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def decode(self):
+        self.num_decodes += 1
+        return np.arange(10, dtype=np.float32).reshape(2, 5)
+
+    def test_load(self):
+        audio_1 = self.cache.load(self.file, "native", 44100, self.decode)
+        audio_2 = self.cache.load(self.file, "native", 44100, self.decode)
+        self.assertEqual(self.num_decodes, 1)
+        self.assertIs(type(audio_2), np.ndarray)
+        self.assertEqual(audio_2.dtype, np.float32)
+        self.assertFalse(audio_2.flags.writeable)
+        np.testing.assert_equal(audio_1, audio_2)
+        np.testing.assert_equal(audio_2, self.decode())
+
+    def test_keys(self):
+        self.cache.load(self.file, "native", 44100, self.decode)
+        self.assertTrue(self.cache.contains(self.file, "native", 44100))
+        self.assertFalse(self.cache.contains(self.file, "mono", 44100))
+        self.assertFalse(self.cache.contains(self.file, "native", 48000))
+        # modified files are decoded again
+        stat = os.stat(self.file)
+        os.utime(self.file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertFalse(self.cache.contains(self.file, "native", 44100))
+
+    def test_damaged_cache_file(self):
+        cache_file = self.cache.get_cache_file(self.file, "native", 44100)
+        os.makedirs(self.cache.path)
+        with open(cache_file, "wb") as f:
+            f.write(b"garbage")
+        audio = self.cache.load(self.file, "native", 44100, self.decode)
+        np.testing.assert_equal(audio, self.decode())
+
+    def test_clear(self):
+        self.cache.load(self.file, "native", 44100, self.decode)
+        self.cache.clear()
+        self.assertFalse(self.cache.contains(self.file, "native", 44100))
@@ -0,0 +1,77 @@
+"""Test cases for decoding audio files."""
+# external import
+import os
+import wave
+import tempfile
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.playback.decoding import read_wav_info
+from sb4deartraining.playback.decoding import read_wav
+from sb4deartraining.playback.decoding import decode
+
+
+class TestDecoding(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp_dir.name, "test.wav")
+        rng = np.random.default_rng(909)
+        self.pcm = rng.integers(-2**23, 2**23, size=(1000, 2), dtype=np.int32)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_wav(self, sampwidth:int, sr:int=44100):
+        """Writes the test data as integer PCM WAV file and returns the
+        expected float data."""
+        shift = 8 * (3 - sampwidth)
+        pcm = self.pcm >> shift if shift > 0 else self.pcm << -shift
+        if sampwidth == 1:
+            raw = (pcm + 128).astype(np.uint8).tobytes()
+        elif sampwidth == 3:
+            raw = pcm.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        else:
+            raw = pcm.astype(f'<i{sampwidth}').tobytes()
+        with wave.open(self.file, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(sampwidth)
+            w.setframerate(sr)
+            w.writeframes(raw)
+        return pcm.T / 2 ** (8 * sampwidth - 1)
+
+    def test_read_wav_info(self):
+        self.write_wav(3, sr=48000)
+        info = read_wav_info(self.file)
+        self.assertEqual(info.num_channels, 2)
+        self.assertEqual(info.sr, 48000)
+        self.assertEqual(info.sampwidth, 3)
+        self.assertEqual(info.num_frames, 1000)
+        self.assertEqual(info.offset, 44)
+
+    def test_read_wav(self):
+        for sampwidth in [1, 2, 3, 4]:
+            expected = self.write_wav(sampwidth)
+            audio, sr = read_wav(self.file)
+            self.assertEqual(sr, 44100)
+            self.assertEqual(audio.dtype, np.float32)
+            self.assertEqual(audio.shape, (2, 1000))
+            np.testing.assert_allclose(audio, expected, atol=1e-7)
+            mono, sr = read_wav(self.file, mono=True)
+            np.testing.assert_allclose(mono, expected.mean(axis=0), atol=1e-7)
+
+    def test_decode(self):
+        expected = self.write_wav(2)
+        # no resampling at the native sample rate
+        audio = decode(self.file, sr=44100)
+        np.testing.assert_allclose(audio, expected, atol=1e-7)
+        # resampling
+        audio = decode(self.file, sr=22050, mono=True)
+        self.assertEqual(audio.shape, (500,))
+        self.assertEqual(audio.dtype, np.float32)
+
+    def test_invalid_file(self):
+        with open(self.file, "wb") as f:
+            f.write(b"no audio")
+        with self.assertRaises(ValueError):
+            read_wav_info(self.file)
@@ -4,10 +4,14 @@ from unittest import TestCase
 import numpy as np
 # internal imports
 from sb4deartraining.effects.basic import AudioEffect
+from sb4deartraining.effects.basic import AudioFxChain
+from sb4deartraining.effects.filters import LowPassFilter, HighPassFilter, ParametricEQ
+from sb4deartraining.effects.volume import Amplifier, Compressor
 from sb4deartraining.effects.stereo import StereoControl
 from sb4deartraining.playback.samples import AudioSignal
 from sb4deartraining.effects.stereo import mid_side_split
 from sb4deartraining.effects.stereo import adjust_stereo_width
+from sb4deartraining.playback.generators import multitone, NoiseGenerator
 
 class TestAudioEffect(TestCase):
 
@@ -109,6 +113,48 @@ def test_adjust_stereo_width():
     np.testing.assert_equal(side_0, np.zeros(909))
 
 
-
-
-        
+class TestDtypePolicy(TestCase):
+    """Effects must preserve the precision of float32 audio data."""
+
+    def get_effects(self):
+        return [
+            LowPassFilter(cutoff=5000),
+            HighPassFilter(cutoff=100),
+            ParametricEQ(freq=1000, q=2, gain=6),
+            StereoControl(pos=0.3, width=0.5),
+            Amplifier(gain_db=np.int64(-3)),
+            Compressor(threshold_db=-12),
+        ]
+
+    def test_effects_preserve_float32(self):
+        mono = (np.random.sample(512) * 2 - 1).astype(np.float32)
+        stereo = (np.random.sample([2, 512]) * 2 - 1).astype(np.float32)
+        for fx in self.get_effects():
+            for audiodata in [mono, stereo]:
+                processed = fx(audiodata)
+                self.assertEqual(processed.dtype, np.float32, fx.name)
+        self.assertEqual(adjust_stereo_width(stereo, 0.5).dtype, np.float32)
+
+    def test_fx_chain_preserves_float32(self):
+        chain = AudioFxChain(self.get_effects())
+        stereo = np.random.sample([2, 512]) * 2 - 1
+        # float64 input is converted once when entering the chain
+        self.assertEqual(chain(stereo).dtype, np.float32)
+        self.assertEqual(chain(stereo.astype(np.float32)).dtype, np.float32)
+
+    def test_float64_mode(self):
+        default_dtype = AudioEffect.dtype
+        try:
+            AudioEffect.dtype = np.dtype("float64")
+            chain = AudioFxChain(self.get_effects())
+            stereo = np.random.sample([2, 512]) * 2 - 1
+            self.assertEqual(chain.fxs[2].sos.dtype, np.float64)
+            self.assertEqual(chain(stereo).dtype, np.float64)
+            # the mid/side basis is applied in full precision
+            mono = StereoControl(width=0)(stereo)
+            np.testing.assert_allclose(mono, np.tile(stereo.mean(axis=0), (2, 1)), rtol=0, atol=1e-12)
+            # and test signals are generated in it
+            self.assertEqual(multitone(duration=0.01).data.dtype, np.float64)
+            self.assertEqual(NoiseGenerator(rng=0).generate().dtype, np.float64)
+        finally:
+            AudioEffect.dtype = default_dtype
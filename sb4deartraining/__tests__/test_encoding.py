@@ -0,0 +1,111 @@
+"""Test cases for encoding audio for delivery and the render cache."""
+# external import
+import io
+import os
+import wave
+import tempfile
+from unittest import TestCase, skipIf
+import importlib.util
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.effects.basic import AudioFxChain
+from sb4deartraining.effects.filters import ParametricEQ
+from sb4deartraining.playback.samples import Sample
+from sb4deartraining.playback.encoding import PCM16Encoder, encode_pcm16
+from sb4deartraining.playback.encoding import RenderCache, iter_encoded
+
+
+class TestPCM16Encoder(TestCase):
+
+    def test_interleaving_and_clipping(self):
+        audiodata = np.array([[0., 0.5, 2.], [-0.25, -1., -2.]], dtype=np.float32)
+        pcm = np.frombuffer(encode_pcm16(audiodata, dither=False), dtype='<i2')
+        np.testing.assert_array_equal(pcm, [0, -2**13, 2**14, -2**15, 2**15 - 1, -2**15])
+
+    def test_dither(self):
+        rng = np.random.default_rng(0)
+        audiodata = rng.uniform(-0.5, 0.5, size=(2, 10000)).astype(np.float32)
+        pcm = np.frombuffer(encode_pcm16(audiodata, seed=1), dtype='<i2').reshape(-1, 2).T
+        # triangular dither: max. 1 LSB (+ rounding) from the exact value
+        error = pcm - audiodata * 2 ** 15
+        self.assertLessEqual(np.abs(error).max(), 1.5)
+        self.assertAlmostEqual(error.mean(), 0, delta=0.05)
+        # reproducible with a seed
+        self.assertEqual(encode_pcm16(audiodata, seed=1), encode_pcm16(audiodata, seed=1))
+
+    def test_blocks(self):
+        # buffers are reused for blocks of any size
+        encoder = PCM16Encoder(dither=False)
+        audiodata = np.linspace(-1, 1, 3000, dtype=np.float32).reshape(2, -1)
+        blocks = [encoder.encode(audiodata[:, i:i + 512]) for i in range(0, 1500, 512)]
+        self.assertEqual(b"".join(blocks), encode_pcm16(audiodata, dither=False))
+
+
+class TestRenderCache(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp_dir.name, "noise.wav")
+        rng = np.random.default_rng(42)
+        pcm = rng.integers(-2**13, 2**13, size=(_SR // 4, 2), dtype=np.int16)
+        with wave.open(self.file, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(_SR)
+            w.writeframes(pcm.tobytes())
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_wav(self):
+        sample = Sample("noise.wav", self.file, loop=True)
+        data = b"".join(iter_encoded(sample, "wav", chunk_size=1000, dither=False))
+        with wave.open(io.BytesIO(data)) as w:
+            self.assertEqual((w.getnchannels(), w.getframerate()), (2, _SR))
+            self.assertEqual(w.getnframes(), sample.loop_end)
+            pcm = np.frombuffer(w.readframes(w.getnframes()), dtype='<i2')
+        expected = encode_pcm16(sample.get_chunk(0, sample.loop_end), dither=False)
+        self.assertEqual(pcm.tobytes(), bytes(expected))
+
+    @skipIf(importlib.util.find_spec("soundfile") is None, "soundfile not installed")
+    def test_flac(self):
+        import soundfile as sf
+        sample = Sample("noise.wav", self.file, loop=True)
+        data = b"".join(iter_encoded(sample, "flac", dither=False))
+        pcm, sr = sf.read(io.BytesIO(data), dtype='int16')
+        self.assertEqual(sr, _SR)
+        expected = encode_pcm16(sample.get_chunk(0, sample.loop_end), dither=False)
+        self.assertEqual(pcm.tobytes(), bytes(expected))
+
+    def test_key(self):
+        sample = Sample("noise.wav", self.file, loop=True)
+        fxs = AudioFxChain([ParametricEQ(freq=1000, gain=6)])
+        key = RenderCache.get_key(sample, fxs)
+        self.assertEqual(key, RenderCache.get_key(sample, AudioFxChain([ParametricEQ(freq=1000, gain=6)])))
+        self.assertNotEqual(key, RenderCache.get_key(sample, AudioFxChain([ParametricEQ(freq=1000, gain=3)])))
+        self.assertNotEqual(key, RenderCache.get_key(sample, fxs, "flac"))
+        self.assertNotEqual(key, RenderCache.get_key(sample))
+
+    def test_stream(self):
+        cache = RenderCache(max_bytes=100)
+        encoded = []
+        def encode(data:bytes):
+            def produce():
+                encoded.append(data)
+                yield from (data[i:i + 10] for i in range(0, len(data), 10))
+            return produce
+        self.assertEqual(b"".join(cache.stream("a", encode(b"a" * 40))), b"a" * 40)
+        self.assertEqual(b"".join(cache.stream("a", encode(b"a" * 40), chunk_size=7)), b"a" * 40)
+        self.assertEqual(len(encoded), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # least recently used entries are evicted
+        list(cache.stream("b", encode(b"b" * 40)))
+        cache.get("a")
+        list(cache.stream("c", encode(b"c" * 40)))
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual((len(cache), cache.resident_bytes, cache.evictions), (2, 80, 1))
+        # incomplete streams are not cached
+        next(cache.stream("d", encode(b"d" * 40)))
+        self.assertNotIn("d", cache)
@@ -0,0 +1,127 @@
+"""Test cases for the headless exercises."""
+# external import
+import os
+import wave
+import random
+import tempfile
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.playback.samples import SampleSelector
+from sb4deartraining.games.engine import Exercise, Score
+from sb4deartraining.games.volume import GainExercise
+from sb4deartraining.games.frequency import FrequencyExercise
+from sb4deartraining.games.stereo import PanningExercise, WidthExercise
+
+
+class TestScore(TestCase):
+
+    def test_update(self):
+        score = Score()
+        self.assertEqual(score.accuracy, 0)
+        for is_correct in [True, True, False, True]:
+            score.update(is_correct)
+        self.assertEqual(score.num_rounds, 4)
+        self.assertEqual(score.num_correct, 3)
+        self.assertEqual(score.accuracy, 0.75)
+        self.assertEqual((score.streak, score.best_streak), (1, 2))
+
+
+class TestExercise(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(7)
+        for name, num_channels in [("stereo.wav", 2), ("mono.wav", 1)]:
+            pcm = rng.integers(-2**13, 2**13, size=(_SR // 2, num_channels), dtype=np.int16)
+            with wave.open(os.path.join(cls.tmp_dir.name, name), "wb") as w:
+                w.setnchannels(num_channels)
+                w.setsampwidth(2)
+                w.setframerate(_SR)
+                w.writeframes(pcm.tobytes())
+        cls.selector = SampleSelector(cls.tmp_dir.name, cache_path=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.selector.close()
+        cls.tmp_dir.cleanup()
+
+    def get_exercise(self, exercise_class:type=Exercise, **kwargs) -> Exercise:
+        exercise = exercise_class(sample_selector=self.selector, **kwargs)
+        self.addCleanup(exercise.close)
+        return exercise
+
+    def test_rounds(self):
+        for exercise_class in [GainExercise, FrequencyExercise, PanningExercise, WidthExercise]:
+            exercise = self.get_exercise(exercise_class, render=False, prerender_depth=0)
+            for _ in range(5):
+                round = exercise.next_round()
+                self.assertIn(round.solution, round.options)
+                self.assertIsNone(round.wet)
+                self.assertTrue(all("label" in option and "value" in option for option in round.options))
+            if exercise_class is WidthExercise:
+                self.assertEqual(round.sample.num_channels, 2)
+
+    def test_render(self):
+        exercise = self.get_exercise(GainExercise, prerender_depth=1)
+        round = exercise.next_round()
+        self.assertEqual(round.wet.num_samples, round.sample.loop_end)
+        gain = 10 ** (round.solution["value"] / 20)
+        np.testing.assert_allclose(round.wet.get_chunk(0, 1024), 
+                                   round.sample.get_chunk(0, 1024) * gain, atol=1e-6)
+        # rendering on request
+        exercise = self.get_exercise(GainExercise, render=False, prerender_depth=0)
+        round = exercise.render(exercise.next_round())
+        self.assertIsNotNone(round.wet)
+
+    def test_answer(self):
+        exercise = self.get_exercise(render=False, prerender_depth=0)
+        round = exercise.next_round()
+        correct = round.options.index(round.solution)
+        wrong = (correct + 1) % len(round.options)
+        self.assertFalse(exercise.answer(wrong))
+        # only the first answer is scored
+        self.assertTrue(exercise.answer(correct))
+        self.assertEqual((exercise.score.num_rounds, exercise.score.num_correct), (1, 0))
+        exercise.next_round()
+        self.assertTrue(exercise.answer(exercise.options.index(exercise.solution)))
+        self.assertEqual((exercise.score.num_rounds, exercise.score.num_correct), (2, 1))
+
+    def test_duplicate_values(self):
+        exercise = self.get_exercise(render=False, prerender_depth=0)
+        for _ in range(20):
+            values = [option["value"] for option in exercise.next_round().options]
+            self.assertEqual(len(set(values)), len(values))
+        # options with the value of the solution are still wrong
+        exercise.get_options = lambda settings=None: [{"label": f"Option {i + 1}", "value": 100}
+                                                      for i in range(3)]
+        round = exercise.next_round()
+        correct = round.options.index(round.solution)
+        self.assertFalse(exercise.answer((correct + 1) % 3))
+        self.assertTrue(exercise.answer(correct))
+        # unless the evaluator accepts answers off by a tolerance
+        exercise.evaluator.tolerance = 10
+        self.assertTrue(exercise.answer((correct + 1) % 3))
+
+    def test_shared_selector(self):
+        exercise = self.get_exercise(render=False, prerender_depth=0)
+        exercise.close()
+        # the shared selector is still usable
+        self.assertIsNotNone(self.selector.get_random_sample())
+
+    def test_seed(self):
+        def play(exercise_class:type, seed:int, depth:int) -> list:
+            exercise = self.get_exercise(exercise_class, render=False, prerender_depth=depth, rng=seed)
+            rounds = [exercise.next_round() for _ in range(8)]
+            return [(r.options, r.solution, r.sample.name, r.sample.gain_db) for r in rounds]
+        random.seed(0)
+        state = random.getstate()
+        for exercise_class in [GainExercise, FrequencyExercise, PanningExercise, WidthExercise]:
+            # same rounds for the same seed (also if prepared in the background)
+            rounds = play(exercise_class, 1, 0)
+            self.assertEqual(rounds, play(exercise_class, 1, 2))
+        self.assertNotEqual(play(GainExercise, 1, 0), play(GainExercise, 2, 0))
+        # the global generator is left alone
+        self.assertEqual(random.getstate(), state)
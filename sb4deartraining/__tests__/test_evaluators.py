@@ -1,7 +1,9 @@
 from unittest import TestCase
-
+import numpy as np
 
 from sb4deartraining.games.frequency import FrequencyChoiceEvaluator
+from sb4deartraining.games.evaluators import Evaluator, GainEvaluator, PanEvaluator
+from sb4deartraining.games.evaluators import FrequencyEvaluator
 class TestFequencyChoiceEvaluator(TestCase):
 
     def test_evaluate(self):
@@ -10,4 +12,28 @@ class TestFequencyChoiceEvaluator(TestCase):
         self.assertTrue(evaluate(500), "500")
         self.assertTrue(evaluate(1000), "1000")
         self.assertTrue(evaluate(2000), "2000")
-        self.assertFalse(evaluate(2001), "2001")
\ No newline at end of file
+        self.assertFalse(evaluate(2001), "2001")
+
+class TestBatchEvaluators(TestCase):
+
+    def test_frequency(self):
+        choices = np.array([499, 500, 1000, 2000, 2001])
+        grades = FrequencyEvaluator().evaluate(1000, choices, tolerance=12)
+        np.testing.assert_array_equal(grades.correct, [False, True, True, True, False])
+        np.testing.assert_allclose(grades.error[1:4], [-12, 0, 12])
+        # same bounds as the single-answer evaluator
+        rng = np.random.default_rng(0)
+        solutions = rng.choice([125., 250, 500, 1000, 2000], size=1000)
+        choices = solutions * 2 ** rng.uniform(-1, 1, size=1000)
+        tolerances = rng.integers(0, 7, size=1000)
+        grades = FrequencyEvaluator().evaluate(solutions, choices, tolerances)
+        expected = [FrequencyChoiceEvaluator(s, int(t)).evaluate(c) for s, c, t in zip(solutions, choices, tolerances)]
+        np.testing.assert_array_equal(grades.correct, expected)
+
+    def test_linear(self):
+        grades = GainEvaluator(tolerance=1).evaluate([0, 0, -6], [1, -2, -6])
+        np.testing.assert_array_equal(grades.correct, [True, False, True])
+        np.testing.assert_array_equal(grades.error, [1, -2, 0])
+        self.assertTrue(PanEvaluator().evaluate_one(0.5, 0.5))
+        self.assertFalse(PanEvaluator().evaluate_one(0.5, 1))
+        self.assertEqual(Evaluator().evaluate([[1], [2]], [1, 2, 3]).correct.shape, (2, 3))
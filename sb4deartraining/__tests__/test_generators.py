@@ -0,0 +1,57 @@
+"""Test cases for test signal generators."""
+# external import
+from unittest import TestCase
+import numpy as np
+from scipy.signal import fftconvolve
+# internal imports
+from sb4deartraining.playback.generators import exponential_sweep
+from sb4deartraining.playback.generators import inverse_sweep_filter
+from sb4deartraining.playback.generators import multitone
+from sb4deartraining.playback.generators import impulse_train
+from sb4deartraining.playback.generators import step_train
+from sb4deartraining.playback.generators import NoiseGenerator
+
+
+class TestTestSignals(TestCase):
+
+    def test_sweep_deconvolves_to_impulse(self):
+        sr = 8000
+        sweep = exponential_sweep(50, 3000, duration=1, sr=sr)
+        inverse = inverse_sweep_filter(50, 3000, duration=1, sr=sr)
+        self.assertEqual(sweep.num_samples, sr)
+        self.assertEqual(inverse.num_samples, sr)
+        ir = fftconvolve(sweep.data, inverse.data)
+        peak_idx = np.argmax(np.abs(ir))
+        self.assertEqual(peak_idx, sweep.num_samples - 1)
+        # flat (unit) magnitude response within the sweep range
+        response = np.abs(np.fft.rfft(ir))
+        freqs = np.fft.rfftfreq(len(ir), 1 / sr)
+        in_band = (freqs > 200) & (freqs < 2000)
+        np.testing.assert_allclose(response[in_band], 1, atol=0.1)
+
+    def test_multitone(self):
+        signal = multitone([100, 200, 400], duration=0.5, sr=8000, vol=0.5)
+        self.assertEqual(signal.num_samples, 4000)
+        self.assertAlmostEqual(np.max(np.abs(signal.data)), 0.5)
+        spectrum = np.abs(np.fft.rfft(signal.data))
+        freqs = np.fft.rfftfreq(signal.num_samples, 1 / 8000)
+        peaks = freqs[np.argsort(spectrum)[-3:]]
+        self.assertEqual(sorted(peaks), [100, 200, 400])
+
+    def test_seeded(self):
+        np.testing.assert_array_equal(NoiseGenerator(rng=5).generate(), NoiseGenerator(rng=5).generate())
+        np.testing.assert_array_equal(multitone([100, 200], phases="random", rng=5).data,
+                                      multitone([100, 200], phases="random", rng=5).data)
+
+    def test_impulse_and_step_train(self):
+        impulses = impulse_train(period=0.25, duration=1, sr=100)
+        np.testing.assert_equal(np.nonzero(impulses.data)[0], [0, 25, 50, 75])
+        steps = step_train(period=0.25, duration=1, sr=100)
+        self.assertEqual(steps.data[:25].sum(), 0)
+        self.assertEqual(steps.data[25:50].sum(), 25)
+
+    def test_iter_chunks(self):
+        signal = impulse_train(duration=1, sr=100)
+        chunks = list(signal.iter_chunks(30))
+        self.assertEqual([len(chunk) for chunk in chunks], [30, 30, 30, 10])
+        np.testing.assert_equal(np.concatenate(chunks), signal.data)
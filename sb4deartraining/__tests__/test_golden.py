@@ -0,0 +1,59 @@
+"""Test cases for the golden renders of the audio effects."""
+# external import
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+# internal imports
+from benchmarks.golden import GOLDEN_CASES, GoldenCase
+from benchmarks.golden import get_synthetic_signals, get_sample_signals
+from benchmarks.golden import make_goldens, verify_goldens, check_block_invariance
+from sb4deartraining.effects.volume import Amplifier, Compressor
+
+
+class TestGoldens(TestCase):
+
+    def test_goldens(self):
+        # the effects still render the stored goldens
+        mismatches = verify_goldens()
+        self.assertEqual(mismatches, [], "\n".join(map(str, mismatches)))
+
+    def test_block_invariance(self):
+        samples = get_sample_signals()
+        self.assertGreater(len(samples), 0, "bundled samples not found")
+        signals = get_synthetic_signals()
+        signals.update(list(samples.items())[:1])
+        for name, case in GOLDEN_CASES.items():
+            for signal, audiodata in signals.items():
+                with self.subTest(case=name, signal=signal):
+                    self.assertEqual(check_block_invariance(case, audiodata, 64), 0)
+
+    def test_compressor_channels(self):
+        # the channels are compressed independently of each other
+        audiodata = get_synthetic_signals()["steps:stereo"]
+        stereo = Compressor()(audiodata)
+        for ch in range(2):
+            np.testing.assert_array_equal(stereo[ch], Compressor()(audiodata[ch]))
+
+    def test_deviations(self):
+        signals = {name: signal for name, signal in get_synthetic_signals().items()
+                   if name.endswith("mono")}
+        cases = {"Amplifier": GoldenCase(lambda: Amplifier(-6), 1e-6)}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "goldens.npz")
+            make_goldens(path, cases, signals)
+            self.assertEqual(verify_goldens(path, cases, signals), [])
+            # deviations within the tolerance are accepted
+            cases = {"Amplifier": GoldenCase(lambda: Amplifier(-6.00001), 1e-5)}
+            self.assertEqual(verify_goldens(path, cases, signals), [])
+            # larger ones are reported with the max. error
+            cases = {"Amplifier": GoldenCase(lambda: Amplifier(-5), 1e-5)}
+            mismatches = verify_goldens(path, cases, signals)
+            self.assertEqual(len(mismatches), len(signals))
+            self.assertTrue(all(m.error > 1e-5 for m in mismatches))
+            # changed inputs and missing effects are reported as well
+            signals["noise:mono"] = signals["noise:mono"] * 0.5
+            reasons = {m.signal: m.reason for m in verify_goldens(path, cases, signals)}
+            self.assertEqual(reasons["noise:mono"], "changed test signal")
+            reasons = {m.reason for m in verify_goldens(path, {}, signals)}
+            self.assertEqual(reasons, {"missing effect"})
@@ -0,0 +1,59 @@
+"""Import time benchmarks guarding against heavy imports. Each module
+is imported in a fresh interpreter, which reports the import time and 
+the modules loaded along the way."""
+# external import
+import sys
+import json
+import subprocess
+from unittest import TestCase
+
+# modules which must not be imported by headless/DSP code
+HEAVY_MODULES = ["librosa", "sounddevice", "ipywidgets", "IPython", "numba"]
+# generous upper bound for the import time (seconds)
+IMPORT_TIME_BUDGET = 3.0
+
+SCRIPT = """
+import sys, json, time
+t = time.perf_counter()
+import {module}
+t = time.perf_counter() - t
+print(json.dumps({{"seconds": t, "modules": list(sys.modules)}}))
+"""
+
+
+def measure_import(module:str) -> dict:
+    """Imports a module in a new interpreter and returns the import 
+    time (seconds) and the list of loaded modules."""
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(module=module)],
+        capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+class TestImports(TestCase):
+
+    def check_import(self, module:str):
+        result = measure_import(module)
+        heavy = [m for m in HEAVY_MODULES if m in result["modules"]]
+        self.assertEqual(heavy, [], f"'{module}' imports heavy modules")
+        self.assertLess(result["seconds"], IMPORT_TIME_BUDGET, 
+                        f"Importing '{module}' is too slow")
+
+    def test_effects(self):
+        self.check_import("sb4deartraining.effects")
+        result = measure_import("sb4deartraining.effects")
+        self.assertNotIn("sb4deartraining.playback", result["modules"])
+
+    def test_playback(self):
+        self.check_import("sb4deartraining.playback.samples")
+        self.check_import("sb4deartraining.playback.player")
+
+    def test_games(self):
+        self.check_import("sb4deartraining.games")
+        self.check_import("sb4deartraining.games.frequency")
+        self.check_import("sb4deartraining.games.stereo")
+        self.check_import("sb4deartraining.games.volume")
+        self.check_import("sb4deartraining.games.engine")
+
+    def test_server(self):
+        self.check_import("sb4deartraining.server")
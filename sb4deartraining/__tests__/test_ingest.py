@@ -0,0 +1,63 @@
+"""Test cases for the parallel sample ingestion."""
+# external import
+import os
+import wave
+import tempfile
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.playback.ingest import ingest, main
+from sb4deartraining.playback.library import SampleLibrary
+
+
+def write_wav(file:str, audio:np.ndarray):
+    """Writes float data of shape (num_channels, num_samples) as 16 bit WAV."""
+    pcm = np.round(np.atleast_2d(audio).T * 2**15).astype(np.int16)
+    with wave.open(file, "wb") as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(_SR)
+        w.writeframes(pcm.tobytes())
+
+
+class TestIngest(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sample_path = os.path.join(self.tmp_dir.name, "samples")
+        self.cache_path = os.path.join(self.tmp_dir.name, "cache")
+        os.makedirs(self.sample_path)
+        for idx in range(4):
+            write_wav(os.path.join(self.sample_path, f"Noise_{idx}.wav"), 
+                      0.1 * np.random.randn(2, _SR // 10))
+        with open(os.path.join(self.sample_path, "Broken.wav"), "wb") as f:
+            f.write(b"RIFF0000WAVEjunk")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_ingest(self):
+        library = SampleLibrary(self.sample_path, self.cache_path, refresh=False)
+        self.assertEqual(len(library), 0)
+        results = list(ingest(library, max_workers=2))
+        self.assertEqual(sorted(r.name for r in results), 
+                         ["Broken.wav"] + [f"Noise_{idx}.wav" for idx in range(4)])
+        failures = [r for r in results if not r.ok]
+        self.assertEqual([r.name for r in failures], ["Broken.wav"])
+        self.assertTrue(all(r.seconds >= 0 for r in results))
+        # index and cache are written by the parent/worker processes
+        self.assertEqual(library.names, [f"Noise_{idx}.wav" for idx in range(4)])
+        reloaded = SampleLibrary(self.sample_path, self.cache_path, refresh=False)
+        self.assertEqual(reloaded.get("Noise_0.wav"), library.get("Noise_0.wav"))
+        file = library.get_path("Noise_0.wav")
+        self.assertTrue(os.path.isfile(library.cache.get_cache_file(file, "native", _SR)))
+        # only the failed file is retried
+        self.assertEqual([r.name for r in ingest(library, max_workers=2)], ["Broken.wav"])
+
+    def test_cli(self):
+        code = main([self.sample_path, "--cache", self.cache_path, "--workers", "2"])
+        self.assertEqual(code, 1)
+        os.remove(os.path.join(self.sample_path, "Broken.wav"))
+        code = main([self.sample_path, "--cache", self.cache_path, "--force"])
+        self.assertEqual(code, 0)
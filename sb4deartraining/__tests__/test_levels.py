@@ -24,3 +24,9 @@ class LevelsTest(TestCase):
         signal_out = add_db(signal_in, DB_DOUBLE)
         np.testing.assert_almost_equal(signal_out, 2 * signal_in)
         
+
+    def test_arrays(self):
+        from sb4deartraining.utilities.levels import convert_db_to_ratio, convert_ratio_to_db
+        dbs = [-DB_DOUBLE, 0, DB_DOUBLE]
+        np.testing.assert_allclose(convert_db_to_ratio(dbs), [0.5, 1, 2])
+        np.testing.assert_allclose(convert_ratio_to_db(convert_db_to_ratio(np.array(dbs))), dbs, atol=1e-12)
@@ -0,0 +1,128 @@
+"""Test cases for the sample library index."""
+# external import
+import os
+import wave
+import tempfile
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.playback import library
+from sb4deartraining.playback.library import SampleLibrary
+from sb4deartraining.playback.library import get_tags
+from sb4deartraining.playback.samples import SampleSelector
+
+
+def write_wav(file:str, audio:np.ndarray):
+    """Writes float data of shape (num_channels, num_samples) as 16 bit WAV."""
+    pcm = np.round(np.atleast_2d(audio).T * 2**15).astype(np.int16)
+    with wave.open(file, "wb") as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(_SR)
+        w.writeframes(pcm.tobytes())
+
+
+class TestSampleLibrary(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sample_path = os.path.join(self.tmp_dir.name, "samples")
+        self.cache_path = os.path.join(self.tmp_dir.name, "cache")
+        os.makedirs(self.sample_path)
+        write_wav(os.path.join(self.sample_path, "Drum_Loop_01.wav"), 0.5 * np.ones((2, _SR)))
+        write_wav(os.path.join(self.sample_path, "Bass_02.wav"), 0.25 * np.ones(_SR // 2))
+        with open(os.path.join(self.sample_path, "copyright.info"), "w") as f:
+            f.write("not audio")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_library(self):
+        return SampleLibrary(self.sample_path, self.cache_path)
+
+    def test_metadata(self):
+        lib = self.get_library()
+        self.assertEqual(lib.names, ["Bass_02.wav", "Drum_Loop_01.wav"])
+        drums = lib.get("Drum_Loop_01.wav")
+        self.assertEqual(drums["num_channels"], 2)
+        self.assertEqual(drums["sr"], _SR)
+        self.assertAlmostEqual(drums["duration"], 1)
+        self.assertAlmostEqual(drums["peak_db"], 20 * np.log10(0.5), places=4)
+        self.assertAlmostEqual(drums["rms_db"], 20 * np.log10(0.5), places=4)
+        self.assertEqual(drums["tags"], ["drum", "loop", "stereo"])
+        self.assertEqual(lib.get("Bass_02.wav")["num_channels"], 1)
+
+    def test_filter(self):
+        lib = self.get_library()
+        self.assertEqual(lib.filter(num_channels=2), ["Drum_Loop_01.wav"])
+        self.assertEqual(lib.filter(tags=["bass"]), ["Bass_02.wav"])
+        self.assertEqual(lib.filter(min_duration=0.75), ["Drum_Loop_01.wav"])
+        self.assertEqual(lib.choice(num_channels=1), "Bass_02.wav")
+        with self.assertRaises(LookupError):
+            lib.choice(tags=["guitar"])
+
+    def test_incremental_update(self):
+        self.get_library()
+        analysed = []
+        analyse_file = library.analyse_file
+        def counting_analyse_file(file, cache=None):
+            analysed.append(os.path.basename(file))
+            return analyse_file(file, cache)
+        library.analyse_file = counting_analyse_file
+        try:
+            # the index is persistent
+            lib = self.get_library()
+            self.assertEqual(analysed, [])
+            self.assertEqual(len(lib), 2)
+            # only new files are analysed
+            write_wav(os.path.join(self.sample_path, "Synth_03.wav"), np.zeros(100))
+            self.assertTrue(lib.refresh())
+            self.assertEqual(analysed, ["Synth_03.wav"])
+            # deleted files are removed
+            os.remove(os.path.join(self.sample_path, "Bass_02.wav"))
+            self.assertTrue(lib.refresh())
+            self.assertEqual(lib.names, ["Drum_Loop_01.wav", "Synth_03.wav"])
+            self.assertFalse(lib.refresh())
+        finally:
+            library.analyse_file = analyse_file
+
+    def test_corrupt_file(self):
+        file = os.path.join(self.sample_path, "bad.wav")
+        with open(os.path.join(self.sample_path, "Bass_02.wav"), "rb") as f:
+            # truncated header
+            data = f.read(30)
+        with open(file, "wb") as f:
+            f.write(data)
+        with self.assertWarns(UserWarning):
+            lib = self.get_library()
+        self.assertEqual(lib.names, ["Bass_02.wav", "Drum_Loop_01.wav"])
+        self.assertEqual(list(lib.errors), ["bad.wav"])
+        # exercises can still select samples
+        with self.assertWarns(UserWarning):
+            selector = SampleSelector(self.sample_path, cache_path=None)
+        self.addCleanup(selector.close)
+        self.assertNotEqual(selector.get_random_sample().name, "bad.wav")
+        # the file is analysed again once it is fixed
+        write_wav(file, 0.1 * np.ones(_SR // 4))
+        self.assertTrue(lib.refresh())
+        self.assertIn("bad.wav", lib)
+        self.assertEqual(lib.errors, {})
+
+    def test_get_tags(self):
+        self.assertEqual(get_tags("Song_HT_Lights_Out_drop_b1.wav"), 
+                         ["song", "ht", "lights", "out", "drop", "b1"])
+
+    def test_choice_by_band(self):
+        t = np.arange(_SR) / _SR
+        write_wav(os.path.join(self.sample_path, "Low_Sine.wav"), 0.5 * np.sin(2 * np.pi * 125 * t))
+        write_wav(os.path.join(self.sample_path, "High_Sine.wav"), 0.5 * np.sin(2 * np.pi * 4000 * t))
+        lib = self.get_library()
+        self.assertEqual(len(lib.get("Low_Sine.wav")["band_energy_db"]), len(library.BAND_FREQS))
+        filters = {"tags": ["sine"]}
+        for _ in range(10):
+            name, freq = lib.choice_by_band([125, 1000, 4000], **filters)
+            self.assertEqual((name, freq), {"Low_Sine.wav": ("Low_Sine.wav", 125),
+                                            "High_Sine.wav": ("High_Sine.wav", 4000)}[name])
+        with self.assertRaises(LookupError):
+            lib.choice_by_band([1000], **filters)
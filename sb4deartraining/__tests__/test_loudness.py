@@ -0,0 +1,47 @@
+"""Test cases for loudness measurement and normalization."""
+# external import
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.effects.filters import KWeightingFilter
+from sb4deartraining.utilities.loudness import get_k_weighting_sos
+from sb4deartraining.utilities.loudness import integrated_loudness
+from sb4deartraining.utilities.loudness import get_normalization_gain
+
+SR = 48000
+
+
+def get_sine(freq:float=997, duration:float=5, db:float=0) -> np.ndarray:
+    t = np.arange(int(duration * SR)) / SR
+    return 10 ** (db / 20) * np.sin(2 * np.pi * freq * t)
+
+
+class TestLoudness(TestCase):
+
+    def test_k_weighting_coefficients(self):
+        # coefficients given in ITU-R BS.1770 for 48 kHz
+        sos = get_k_weighting_sos(48000)
+        # the filter effect uses the same design
+        expected = get_k_weighting_sos(KWeightingFilter.sr).astype(KWeightingFilter.dtype)
+        np.testing.assert_array_equal(KWeightingFilter().sos, expected)
+        np.testing.assert_allclose(sos[0, :3], [1.53512485958697, -2.69169618940638, 1.19839281085285])
+        np.testing.assert_allclose(sos[0, 4:], [-1.69065929318241, 0.73248077421585])
+        np.testing.assert_allclose(sos[1, 4:], [-1.99004745483398, 0.99007225036621])
+
+    def test_integrated_loudness(self):
+        # a full scale 997 Hz sine in one channel measures -3.01 LUFS
+        sine = get_sine()
+        self.assertAlmostEqual(integrated_loudness(sine, SR), -3.01, places=2)
+        stereo = np.stack([sine, np.zeros_like(sine)])
+        self.assertAlmostEqual(integrated_loudness(stereo, SR), -3.01, places=2)
+        # level changes shift the loudness accordingly
+        self.assertAlmostEqual(integrated_loudness(get_sine(db=-20), SR), -23.01, places=2)
+        # gating ignores silence
+        gated = np.concatenate([get_sine(db=-20), np.zeros(10 * SR)])
+        self.assertAlmostEqual(integrated_loudness(gated, SR), -23.01, delta=0.2)
+        self.assertEqual(integrated_loudness(np.zeros(SR), SR), -np.inf)
+
+    def test_normalization_gain(self):
+        self.assertEqual(get_normalization_gain(-18, -23), -5)
+        self.assertEqual(get_normalization_gain(-30, -23, peak_db=-3), 3)
+        self.assertEqual(get_normalization_gain(-np.inf, -23), 0)
@@ -0,0 +1,97 @@
+"""Test cases for pre-rendering samples and exercise rounds."""
+# external import
+import os
+import wave
+import time
+import tempfile
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.effects.basic import AudioFxChain
+from sb4deartraining.effects.filters import ParametricEQ
+from sb4deartraining.playback.samples import Sample
+from sb4deartraining.playback.rendering import RenderedSample
+from sb4deartraining.games._rounds import RoundPipeline
+
+
+def play(sample:Sample, num_blocks:int, size:int=1024) -> np.ndarray:
+    idx, chunks = 0, []
+    for _ in range(num_blocks):
+        chunks.append(sample.get_chunk(idx, size))
+        idx = sample.get_next_idx(idx, size)
+    return np.concatenate(chunks, axis=-1)
+
+
+class TestRenderedSample(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp_dir.name, "noise.wav")
+        rng = np.random.default_rng(42)
+        pcm = rng.integers(-2**13, 2**13, size=(_SR // 2, 2), dtype=np.int16)
+        with wave.open(self.file, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(_SR)
+            w.writeframes(pcm.tobytes())
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_fxs(self):
+        return AudioFxChain([ParametricEQ(freq=1000, gain=12)])
+
+    def test_matches_live_processing(self):
+        sample = Sample("noise.wav", self.file, loop=True, gain_db=-3)
+        wet = RenderedSample(sample, self.get_fxs())
+        self.assertEqual(wet.num_samples, sample.loop_end)
+        self.assertEqual((wet.loop_start, wet.loop_end), (sample.loop_start, sample.loop_end))
+        # effects applied block by block in the audio callback
+        fxs = self.get_fxs()
+        num_blocks = 3 * sample.loop_end // 1024
+        live = np.concatenate([fxs(chunk) for chunk in np.split(
+            play(sample, num_blocks), num_blocks, axis=-1)], axis=-1)
+        rendered = play(wet, num_blocks)
+        self.assertEqual(rendered.shape, live.shape)
+        # identical from the second pass on (same filter history)
+        second_pass = slice(sample.loop_end, None)
+        np.testing.assert_allclose(rendered[:, second_pass], live[:, second_pass], atol=1e-4)
+
+
+class TestRoundPipeline(TestCase):
+
+    def test_depth(self):
+        made = []
+        def make_round():
+            made.append(len(made))
+            return made[-1]
+        pipeline = RoundPipeline(make_round, depth=3)
+        try:
+            self.assertEqual(len(pipeline), 3)
+            self.assertEqual([pipeline.get() for _ in range(4)], [0, 1, 2, 3])
+            # bounded: never more than `depth` rounds ahead
+            time.sleep(0.1)
+            self.assertEqual(len(made), 7)
+        finally:
+            pipeline.close()
+        # rounds are made on demand after closing
+        self.assertEqual(pipeline.get(), 7)
+
+    def test_on_demand(self):
+        pipeline = RoundPipeline(lambda: "round", depth=0)
+        self.assertEqual(len(pipeline), 0)
+        self.assertEqual(pipeline.get(), "round")
+
+    def test_failure_fallback(self):
+        calls = []
+        def make_round():
+            calls.append(None)
+            if len(calls) == 1:
+                raise RuntimeError("rendering failed")
+            return "round"
+        pipeline = RoundPipeline(make_round, depth=1)
+        try:
+            self.assertEqual(pipeline.get(), "round")
+        finally:
+            pipeline.close()
@@ -0,0 +1,168 @@
+"""Test cases for recording answers and the statistics over results."""
+# external import
+import os
+import wave
+import sqlite3
+import tempfile
+from unittest import TestCase, mock
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.playback.samples import SampleSelector
+from sb4deartraining.games.volume import GainExercise
+from sb4deartraining.games.results import Results, ResultsStore
+from sb4deartraining.games.evaluators import FrequencyEvaluator
+
+
+class TestResultsStore(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "results.sqlite")
+
+    def get_store(self, **kwargs) -> ResultsStore:
+        store = ResultsStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_record(self):
+        store = self.get_store(batch_size=7)
+        for i in range(100):
+            store.record_answer("Gain", "s1" if i < 50 else "s2", i, "a.wav", 3,
+                                solution=i % 5, choice=i % 5 if i % 2 else 0, correct=bool(i % 2),
+                                user="alice")
+        self.assertEqual(len(store), 100)
+        results = store.query(session="s2")
+        self.assertEqual(len(results), 50)
+        np.testing.assert_array_equal(results.solution, np.arange(50, 100) % 5)
+        self.assertEqual(len(store.query(user="bob")), 0)
+        # the most recent answers in the order of recording
+        np.testing.assert_array_equal(store.query(limit=3).solution, [2, 3, 4])
+        # answers are persistent
+        store.close()
+        self.assertEqual(len(self.get_store().query(exercise="Gain")), 100)
+        with self.assertRaises(RuntimeError):
+            store.record_answer("Gain", "s1", 0, "a.wav", 3, 0, 0, True)
+
+    def test_write_errors(self):
+        store = self.get_store(flush_interval=0.01, retries=2)
+        con = sqlite3.connect(self.path)
+        self.addCleanup(con.close)
+        # answers which cannot be written are dropped
+        con.execute("ALTER TABLE answers RENAME TO moved")
+        with self.assertWarns(UserWarning):
+            store.record_answer("Gain", "s1", 0, "a.wav", 3, 0, 0, True)
+            store.flush()
+        self.assertEqual(store.num_dropped, 1)
+        # the writer keeps running
+        con.execute("ALTER TABLE moved RENAME TO answers")
+        store.record_answer("Gain", "s1", 1, "a.wav", 3, 0, 0, True)
+        self.assertEqual(len(store), 1)
+        # a stopped writer is reported instead of waiting forever
+        def fail(con, answers):
+            raise MemoryError()
+        store._write_batch = fail
+        with mock.patch("threading.excepthook"):
+            store.record_answer("Gain", "s1", 2, "a.wav", 3, 0, 0, True)
+            store._writer.join(5)
+        with self.assertRaises(RuntimeError):
+            store.record_answer("Gain", "s1", 3, "a.wav", 3, 0, 0, True)
+        store._queue.put(None)
+        with self.assertRaises(RuntimeError):
+            store.flush()
+
+    def test_states(self):
+        store = self.get_store()
+        self.assertIsNone(store.load_state("alice", "gain", "elo"))
+        store.save_state("alice", "gain", "elo", {"rating": 1200.})
+        store.save_state("alice", "gain", "elo", {"rating": 1300.})
+        store.save_state("bob", "gain", "elo", {"rating": 900.})
+        self.assertEqual(store.load_state("alice", "gain", "elo"), {"rating": 1300.})
+        # older states do not replace newer ones
+        store.save_state("alice", "gain", "elo", {"rating": 1100.}, timestamp=0)
+        self.assertEqual(store.load_state("alice", "gain", "elo"), {"rating": 1300.})
+        self.assertIsNone(store.load_state("alice", "gain", "staircase"))
+
+
+class TestResults(TestCase):
+
+    def get_results(self, solution, choice) -> Results:
+        solution, choice = np.asarray(solution, dtype=float), np.asarray(choice, dtype=float)
+        return Results({
+            "time": np.arange(len(solution), dtype=float),
+            "solution": solution,
+            "choice": choice,
+            "correct": solution == choice,
+        })
+
+    def test_accuracy(self):
+        results = self.get_results([-6, -6, 0, 3, 3, 3], [-6, -3, 0, 3, 0, 6])
+        self.assertEqual(results.accuracy, 0.5)
+        values, accuracy, counts = results.accuracy_per_value()
+        np.testing.assert_array_equal(values, [-6, 0, 3])
+        np.testing.assert_allclose(accuracy, [0.5, 1, 1 / 3])
+        np.testing.assert_array_equal(counts, [2, 1, 3])
+        distances, share, counts = results.accuracy_per_distance()
+        np.testing.assert_array_equal(distances, [0, 3])
+        np.testing.assert_array_equal(counts, [3, 3])
+        self.assertEqual(share[0], results.accuracy)
+
+    def test_accuracy_per_band(self):
+        results = self.get_results([125, 1000, 1000, 4000], [125, 500, 1000, 4000])
+        freqs, accuracy, counts = results.accuracy_per_band()
+        np.testing.assert_allclose(freqs, [125, 1000, 4000])
+        np.testing.assert_allclose(accuracy, [1, 0.5, 1])
+        distances, _, counts = results.accuracy_per_distance(log=True)
+        np.testing.assert_array_equal(distances, [0, 1])
+
+    def test_learning_curve(self):
+        results = self.get_results([0, 0, 0, 0], [1, 0, 0, 1])
+        np.testing.assert_allclose(results.learning_curve(window=2), [0, 0.5, 1, 0.5])
+        self.assertEqual(len(self.get_results([], []).learning_curve()), 0)
+
+    def test_regrade(self):
+        results = self.get_results([1000, 1000, 500], [1000, 2000, 250])
+        grades = results.grade(FrequencyEvaluator(), tolerance=12)
+        np.testing.assert_array_equal(grades.correct, [True, True, True])
+        np.testing.assert_array_equal(results.grade(FrequencyEvaluator()).correct, results.correct)
+
+    def test_large(self):
+        # aggregations stay vectorized over many answers
+        rng = np.random.default_rng(0)
+        solution = 1000 * 2. ** rng.integers(-3, 4, size=200000)
+        choice = np.where(rng.random(200000) < 0.7, solution, 2 * solution)
+        results = self.get_results(solution, choice)
+        _, accuracy, counts = results.accuracy_per_band()
+        self.assertEqual(counts.sum(), 200000)
+        np.testing.assert_allclose(accuracy, 0.7, atol=0.02)
+
+
+class TestRecordedExercise(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        pcm = np.random.default_rng(1).integers(-2**13, 2**13, size=(_SR // 4, 2), dtype=np.int16)
+        with wave.open(os.path.join(self.tmp_dir.name, "a.wav"), "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(_SR)
+            w.writeframes(pcm.tobytes())
+        self.selector = SampleSelector(self.tmp_dir.name, cache_path=None)
+        self.addCleanup(self.selector.close)
+
+    def test_answers_recorded(self):
+        store = ResultsStore(os.path.join(self.tmp_dir.name, "results.sqlite"))
+        self.addCleanup(store.close)
+        exercise = GainExercise(sample_selector=self.selector, render=False, prerender_depth=0,
+                                results=store, user="alice")
+        self.addCleanup(exercise.close)
+        for _ in range(3):
+            exercise.next_round()
+            exercise.answer(0)
+            # only the first answer of a round is recorded
+            exercise.answer(1)
+        results = store.query(exercise=exercise.name, user="alice")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results.correct.sum(), exercise.score.num_correct)
@@ -0,0 +1,299 @@
+"""Test cases for audio signals, samples and sample management."""
+# external import
+import os
+import wave
+import mmap
+import random
+import tempfile
+from unittest import TestCase
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.playback.samples import AudioSignal
+from sb4deartraining.playback.samples import MappedAudioSignal
+from sb4deartraining.playback.samples import Sample
+from sb4deartraining.playback.samples import SampleStore
+from sb4deartraining.playback.samples import SharedSampleStore
+from sb4deartraining.playback.samples import SampleSelector
+
+
+def write_test_wav(file:str, num_samples:int=4410, sr:int=_SR) -> np.ndarray:
+    """Writes a 16 bit stereo WAV file with random content and returns
+    the data as (2, num_samples) float array."""
+    rng = np.random.default_rng(909)
+    pcm = rng.integers(-2**15, 2**15, size=(num_samples, 2), dtype=np.int16)
+    with wave.open(file, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm.tobytes())
+    return pcm.T / 2**15
+
+
+class TestMappedAudioSignal(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp_dir.name, "test.wav")
+        self.data = write_test_wav(self.file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_open(self):
+        signal = AudioSignal.open(self.file)
+        self.assertIsInstance(signal, MappedAudioSignal)
+        self.assertEqual(signal.num_samples, 4410)
+        self.assertEqual(signal.num_channels, 2)
+        # files at other sample rates are loaded and resampled
+        write_test_wav(self.file, sr=22050)
+        signal = AudioSignal.open(self.file)
+        self.assertNotIsInstance(signal, MappedAudioSignal)
+        self.assertEqual(signal.num_samples, 8820)
+
+    def test_get_chunk(self):
+        for mode in ['native', 'mono', 'center']:
+            mapped = MappedAudioSignal(self.file, mode)
+            loaded = AudioSignal.load(self.file, mode)
+            self.assertEqual(mapped.num_channels, loaded.num_channels)
+            # chunks with and without wrap-around
+            for start_idx in [0, 1000, 4000]:
+                np.testing.assert_allclose(
+                    mapped.get_chunk(start_idx, 1024), 
+                    loaded.get_chunk(start_idx, 1024), atol=1e-6)
+            chunks = list(mapped.iter_chunks(1000))
+            np.testing.assert_allclose(np.concatenate(chunks, axis=-1), loaded.data, atol=1e-6)
+
+
+class TestSampleLoop(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp_dir.name, "sine.wav")
+        # the sine does not complete its last period (click when looping)
+        t = np.arange(int(1.03 * _SR)) / _SR
+        sine = 0.5 * np.sin(2 * np.pi * 110 * t + 1)
+        pcm = np.round(np.stack([sine, sine], axis=1) * 2**15).astype(np.int16)
+        with wave.open(self.file, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(_SR)
+            w.writeframes(pcm.tobytes())
+        # max. difference of consecutive samples of the sine
+        self.max_step = 0.5 * 2 * np.pi * 110 / _SR
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def play(self, sample:Sample, num_blocks:int, size:int=1024) -> np.ndarray:
+        idx, chunks = 0, []
+        for _ in range(num_blocks):
+            chunks.append(sample.get_chunk(idx, size))
+            idx = sample.get_next_idx(idx, size)
+        return np.concatenate(chunks, axis=-1)
+
+    def test_click_without_loop_points(self):
+        sample = Sample("sine.wav", self.file)
+        audio = self.play(sample, 100)
+        self.assertGreater(np.max(np.abs(np.diff(audio[0]))), 5 * self.max_step)
+
+    def test_loop_points(self):
+        sample = Sample("sine.wav", self.file, loop=True)
+        data = sample.audio.data[0]
+        for idx in [sample.loop_start, sample.loop_end]:
+            self.assertTrue(data[idx - 1] < 0 <= data[idx])
+        self.assertLess(sample.loop_start, _SR * 0.03)
+        self.assertGreater(sample.loop_end, sample.num_samples - _SR * 0.02)
+        # seam is short and continuous across the loop boundary
+        self.assertEqual(sample.seam.shape, (2, int(0.01 * _SR)))
+        audio = self.play(sample, 100)
+        self.assertLess(np.max(np.abs(np.diff(audio[0]))), 1.5 * self.max_step)
+
+    def test_block_size_invariance(self):
+        sample = Sample("sine.wav", self.file, loop=True)
+        np.testing.assert_array_equal(self.play(sample, 30, 4096), 
+                                      self.play(sample, 120, 1024))
+
+    def test_beat_aligned_loop(self):
+        # 0.25 s per beat, i.e. the loop is 4 beats long
+        sample = Sample("sine.wav", self.file, loop=True, bpm=240)
+        loop_len = sample.loop_end - sample.loop_start
+        self.assertLessEqual(loop_len, _SR)
+        self.assertGreater(loop_len, _SR - 0.02 * _SR)
+
+
+class TestSampleStore(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.files = [os.path.join(self.tmp_dir.name, f"{i}.wav") for i in range(3)]
+        self.data = [write_test_wav(file) for file in self.files]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sharing(self):
+        store = SampleStore()
+        sample_1 = Sample("0.wav", self.files[0], store=store)
+        sample_2 = Sample("0.wav", self.files[0], store=store)
+        self.assertIs(sample_1.audio.data, sample_2.audio.data)
+        self.assertFalse(sample_1.audio.data.flags.writeable)
+        np.testing.assert_allclose(sample_1.audio.data, self.data[0], atol=1e-6)
+        self.assertEqual(store.stats["hits"], 1)
+        self.assertEqual(store.stats["misses"], 1)
+        self.assertEqual(store.hit_rate, 0.5)
+
+    def test_center_from_mono(self):
+        store = SampleStore()
+        mono = store.get(self.files[0], 'mono')
+        center = store.get(self.files[0], 'center')
+        np.testing.assert_allclose(center.data, AudioSignal.mono_to_center(mono.data), atol=1e-6)
+        # the centered data only takes up the memory of one channel
+        self.assertEqual(store.resident_bytes, 2 * mono.data.nbytes)
+
+    def test_eviction(self):
+        store = SampleStore()
+        nbytes = store.get(self.files[0]).data.nbytes
+        store = SampleStore(max_bytes=2 * nbytes)
+        for file in self.files:
+            store.get(file)
+        self.assertEqual(store.stats["entries"], 2)
+        self.assertEqual(store.evictions, 1)
+        self.assertLessEqual(store.resident_bytes, store.max_bytes)
+        # least recently used sample was evicted
+        store.get(self.files[2])
+        self.assertEqual(store.hits, 1)
+        store.get(self.files[0])
+        self.assertEqual(store.misses, 4)
+
+
+def is_memory_mapped(audiodata:np.ndarray) -> bool:
+    base = audiodata
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return isinstance(base, mmap.mmap)
+
+def load_shared(path:str, file:str, mode:str) -> tuple:
+    """Loads a sample from a shared store (in a worker process)."""
+    audio = SharedSampleStore(path).get(file, mode)
+    return float(np.sum(audio.data)), is_memory_mapped(audio.data), audio.data.flags.writeable
+
+
+class TestSharedSampleStore(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp_dir.name, "0.wav")
+        self.data = write_test_wav(self.file)
+        self.shared_path = os.path.join(self.tmp_dir.name, "shared")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_only_views(self):
+        store = SharedSampleStore(self.shared_path)
+        for mode in ['native', 'mono', 'center']:
+            audio = store.get(self.file, mode)
+            self.assertTrue(is_memory_mapped(audio.data), mode)
+            self.assertFalse(audio.data.flags.writeable, mode)
+            with self.assertRaises(ValueError):
+                audio.data[..., 0] = 0
+        np.testing.assert_allclose(store.get(self.file).data, self.data, atol=1e-6)
+
+    def test_processes(self):
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(load_shared, [self.shared_path] * 6, 
+                                        [self.file] * 6, ['native', 'center'] * 3))
+        for idx, (checksum, mapped, writeable) in enumerate(results):
+            self.assertAlmostEqual(checksum, results[idx % 2][0], places=3)
+            self.assertTrue(mapped)
+            self.assertFalse(writeable)
+        # one copy of the decoded data per mode (native, mono, center)
+        files = [f for f in os.listdir(self.shared_path) if f.endswith(".npy")]
+        self.assertEqual(len(files), 3)
+        SharedSampleStore(self.shared_path).clear_shared()
+        self.assertEqual(os.listdir(self.shared_path), [])
+
+
+class TestSampleSelector(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for i in range(3):
+            write_test_wav(os.path.join(self.tmp_dir.name, f"{i}.wav"))
+        self.selector = SampleSelector(self.tmp_dir.name, cache_path=None)
+
+    def tearDown(self):
+        self.selector.close()
+        self.tmp_dir.cleanup()
+
+    def test_prefetch(self):
+        future = self.selector.prefetch('mono')
+        # only one pending prefetch per mode
+        self.assertIs(self.selector.prefetch('mono'), future)
+        sample = self.selector.get_random_sample('mono')
+        self.assertIs(sample, future.result())
+        self.assertEqual(sample.num_channels, 1)
+        # no prefetch left
+        self.assertEqual(self.selector._prefetched, {})
+
+    def test_auto_prefetch(self):
+        self.selector.auto_prefetch = True
+        self.selector.get_random_sample()
+        future = self.selector._prefetched[(self.selector.rng, 'native', (), None)]
+        sample = self.selector.get_random_sample()
+        self.assertIs(sample, future.result())
+        self.selector.close()
+        self.assertEqual(self.selector._prefetched, {})
+
+    def test_prefetch_rng(self):
+        # prefetched samples are only handed out to the generator they were drawn with
+        rng, other_rng = random.Random(1), random.Random(2)
+        future = self.selector.prefetch(rng=rng)
+        self.selector.get_random_sample(rng=other_rng)
+        self.assertEqual(list(self.selector._prefetched.values()), [future])
+        self.assertIs(self.selector.get_random_sample(rng=rng), future.result())
+        # no draws are thrown away, i.e. the same samples as without prefetching
+        self.selector.auto_prefetch = True
+        rng, reference = random.Random(3), random.Random(3)
+        names = [self.selector.get_random_sample(rng=rng).name for _ in range(8)]
+        self.assertEqual(names, [self.selector.library.choice(reference) for _ in range(8)])
+
+    def test_prefetch_for_band(self):
+        self.selector.auto_prefetch = True
+        freqs = [125, 1000, 4000]
+        rng, reference = random.Random(4), random.Random(4)
+        pairs = []
+        for _ in range(4):
+            sample, freq = self.selector.get_sample_for_band(freqs, -np.inf, rng=rng)
+            pairs.append((sample.name, freq))
+            # the next pair is loaded in the background
+            future = self.selector._prefetched[(rng, 'native', (), ((125, 1000, 4000), -np.inf))]
+            self.assertIsInstance(future.result()[0], Sample)
+        expected = [self.selector.library.choice_by_band(freqs, -np.inf, reference) for _ in range(4)]
+        self.assertEqual(pairs, expected)
+
+    def test_filters(self):
+        mono_file = os.path.join(self.tmp_dir.name, "mono.wav")
+        with wave.open(mono_file, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(_SR)
+            w.writeframes(np.zeros(1000, dtype=np.int16).tobytes())
+        self.selector.library.refresh()
+        self.assertEqual(len(self.selector.samples), 4)
+        for _ in range(5):
+            sample = self.selector.get_random_sample(num_channels=2)
+            self.assertEqual(sample.num_channels, 2)
+        sample = self.selector.get_random_sample(num_channels=1)
+        self.assertEqual(sample.name, "mono.wav")
+
+    def test_loudness_normalization(self):
+        self.selector.loudness_target = -30
+        sample = self.selector.get_random_sample()
+        loudness = self.selector.library.get(sample.name)["loudness_lufs"]
+        self.assertAlmostEqual(sample.gain_db, -30 - loudness)
+        ratio = 10 ** (sample.gain_db / 20)
+        np.testing.assert_allclose(sample.get_chunk(0, 1024), 
+                                   sample.audio.get_chunk(0, 1024) * ratio, rtol=1e-5)
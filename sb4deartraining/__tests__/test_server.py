@@ -0,0 +1,267 @@
+"""Test cases for the training server (using a local HTTP client)."""
+# external import
+import io
+import os
+import json
+import wave
+import socket
+import asyncio
+import tempfile
+import threading
+import http.client
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.playback.samples import SampleSelector
+from sb4deartraining.games.results import ResultsStore
+from sb4deartraining.server import TrainingServer
+from sb4deartraining.server.app import Session
+
+
+class TestTrainingServer(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(3)
+        for name in ["a.wav", "b.wav"]:
+            pcm = rng.integers(-2**13, 2**13, size=(_SR // 2, 2), dtype=np.int16)
+            with wave.open(os.path.join(cls.tmp_dir.name, name), "wb") as w:
+                w.setnchannels(2)
+                w.setsampwidth(2)
+                w.setframerate(_SR)
+                w.writeframes(pcm.tobytes())
+        cls.selector = SampleSelector(cls.tmp_dir.name, cache_path=None)
+        # run the server in a background event loop
+        cls.loop = asyncio.new_event_loop()
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+        cls.server = TrainingServer(cls.selector, max_workers=2, max_sessions=20, chunk_size=4096)
+        asyncio.run_coroutine_threadsafe(cls.server.start("127.0.0.1", 0), cls.loop).result()
+        cls.port = cls.server.address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.server.close(), cls.loop).result()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        cls.selector.close()
+        cls.tmp_dir.cleanup()
+
+    def request(self, method:str, path:str, data:dict=None, conn=None):
+        conn = conn or http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        body = json.dumps(data) if data is not None else None
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        content = response.read()
+        if response.getheader("Content-Type") == "application/json":
+            content = json.loads(content)
+        return response.status, content
+
+    def test_session(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        status, data = self.request("POST", "/sessions", {"exercise": "gain", "params": {"num_choices": 4}}, conn)
+        self.assertEqual(status, 200)
+        path = f"/sessions/{data['session']}"
+        # answering needs a round
+        self.assertEqual(self.request("POST", f"{path}/answer", {"choice": 0}, conn)[0], 409)
+        status, round = self.request("POST", f"{path}/rounds", conn=conn)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(round["options"]), 4)
+        self.assertEqual(round["num_channels"], 2)
+        # audio is streamed as WAV file
+        for version in ["dry", "wet"]:
+            status, content = self.request("GET", f"{path}/audio?version={version}", conn=conn)
+            self.assertEqual(status, 200)
+            with wave.open(io.BytesIO(content)) as w:
+                self.assertEqual(w.getframerate(), round["sr"])
+                self.assertEqual(w.getsampwidth(), 2)
+                self.assertAlmostEqual(w.getnframes() / _SR, round["duration"])
+        # repeated requests are served from the render cache
+        hits = self.server.render_cache.hits
+        self.assertEqual(self.request("GET", f"{path}/audio", conn=conn)[1], content)
+        self.assertEqual(self.server.render_cache.hits, hits + 1)
+        self.assertEqual(self.request("GET", f"{path}/audio?format=mp3", conn=conn)[0], 400)
+        status, result = self.request("POST", f"{path}/answer", {"choice": 1}, conn)
+        self.assertEqual(status, 200)
+        self.assertEqual(result["correct"], result["solution"] == 1)
+        self.assertEqual(result["score"]["num_rounds"], 1)
+        # session ends
+        self.assertEqual(self.request("DELETE", path, conn=conn)[0], 200)
+        self.assertEqual(self.request("GET", path, conn=conn)[0], 404)
+
+    def test_errors(self):
+        self.assertEqual(self.request("GET", "/nothing")[0], 404)
+        self.assertEqual(self.request("POST", "/sessions", {"exercise": "unknown"})[0], 400)
+        self.assertEqual(self.request("POST", "/sessions", {"exercise": "gain", "params": {"x": 1}})[0], 400)
+        self.assertEqual(self.request("POST", "/sessions", {"exercise": "gain", "adaptive": "x"})[0], 400)
+        status, data = self.request("GET", "/exercises")
+        self.assertEqual(data["exercises"], ["frequency", "gain", "panning", "width"])
+
+    def test_streaming_unlocked(self):
+        _, data = self.request("POST", "/sessions", {"exercise": "width"})
+        path = f"/sessions/{data['session']}"
+        session = self.server.sessions[data["session"]]
+        self.request("POST", f"{path}/rounds")
+        # (earlier tests might have cached the round's audio)
+        self.server.render_cache.clear()
+        # the audio is streamed after the session is unlocked (a slow
+        # client does not block the other requests of the session)
+        locked = []
+        iter_in_executor = self.server.iter_in_executor
+        async def check_lock(chunks):
+            locked.append(session.lock.locked())
+            async for chunk in iter_in_executor(chunks):
+                yield chunk
+        self.server.iter_in_executor = check_lock
+        try:
+            for version in ["wet", "dry", "wet"]:
+                self.assertEqual(self.request("GET", f"{path}/audio?version={version}")[0], 200)
+        finally:
+            del self.server.iter_in_executor
+        self.assertEqual(locked, [False] * 3)
+        self.assertIsNotNone(session.exercise.round.wet)
+        self.request("DELETE", path)
+
+    def test_invalid_requests(self):
+        def send(data:bytes) -> bytes:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=10) as sock:
+                sock.sendall(data)
+                return sock.makefile("rb").readline()
+        self.assertIn(b" 400 ", send(b"POST /sessions HTTP/1.1\r\nContent-Length: abc\r\n\r\n"))
+        self.assertIn(b" 400 ", send(b"POST /sessions HTTP/1.1\r\nContent-Length: -1\r\n\r\n"))
+        # unexpected errors are answered as well
+        def fail():
+            raise LookupError("No matching sample.")
+        self.server.create_session = lambda data: fail()
+        try:
+            status, data = self.request("POST", "/sessions", {"exercise": "gain"})
+        finally:
+            del self.server.create_session
+        self.assertEqual(status, 500)
+        self.assertIn("LookupError", data["error"])
+        self.assertEqual(self.request("GET", "/exercises")[0], 200)
+
+    def test_adaptive(self):
+        def start(user:str=None) -> str:
+            _, data = self.request("POST", "/sessions", {"exercise": "panning", "user": user,
+                                                         "adaptive": "staircase"})
+            return f"/sessions/{data['session']}"
+        path = start("alice")
+        for _ in range(100):
+            _, round = self.request("POST", f"{path}/rounds")
+            self.assertEqual(len(round["options"]), 2 * round["difficulty"] + 3)
+            if round["difficulty"] == 1:
+                break
+            self.request("POST", f"{path}/answer", {"choice": 0})
+        self.assertEqual(round["difficulty"], 1)
+        self.request("DELETE", path)
+        # the difficulty of a user carries over to new sessions
+        for user, difficulty in [("alice", 1), (None, 0)]:
+            path = start(user)
+            self.assertEqual(self.request("POST", f"{path}/rounds")[1]["difficulty"], difficulty)
+            self.request("DELETE", path)
+
+    def test_idle_sessions(self):
+        def start() -> str:
+            return self.request("POST", "/sessions", {"exercise": "gain"})[1]["session"]
+        def reap() -> int:
+            async def reap():
+                return self.server.reap_sessions()
+            return asyncio.run_coroutine_threadsafe(reap(), self.loop).result()
+        idle, active = start(), start()
+        exercise, closed = self.server.sessions[idle].exercise, []
+        exercise.close = lambda: closed.append(True)
+        self.server.sessions[idle].last_access -= self.server.session_ttl + 1
+        self.assertEqual(reap(), 1)
+        self.assertEqual(self.request("GET", f"/sessions/{idle}")[0], 404)
+        self.assertEqual(closed, [True])
+        self.assertEqual(self.request("GET", f"/sessions/{active}")[0], 200)
+        # when the sessions are used up, idle ones are ended for new ones
+        max_sessions = self.server.max_sessions
+        self.server.max_sessions = len(self.server.sessions)
+        try:
+            self.assertEqual(self.request("POST", "/sessions", {"exercise": "gain"})[0], 503)
+            self.server.sessions[active].last_access -= self.server.session_ttl + 1
+            new = start()
+            self.assertEqual(self.request("GET", f"/sessions/{active}")[0], 404)
+        finally:
+            self.server.max_sessions = max_sessions
+        self.request("DELETE", f"/sessions/{new}")
+
+    def test_adaptive_persistent(self):
+        results = ResultsStore(os.path.join(self.tmp_dir.name, "results.sqlite"))
+        self.addCleanup(results.close)
+        def run(coroutine):
+            return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+        async def play(server:TrainingServer, user:str) -> int:
+            if server._server is None:
+                await server.start("127.0.0.1", 0)
+            data = await server.create_session({"exercise": "width", "user": user,
+                                                "adaptive": "staircase"})
+            session = server.get_session(data["session"])
+            for _ in range(2):
+                await server.next_round(session)
+                exercise = session.exercise
+                server.answer(session, {"choice": exercise.options.index(exercise.solution)})
+            server.end_session(session)
+            return exercise.round.difficulty
+        # the difficulty is restored by a new server from the results store
+        for difficulty in [0, 1]:
+            server = TrainingServer(self.selector, max_workers=1, max_sessions=2, results=results)
+            self.assertEqual(run(play(server, "alice")), difficulty)
+            run(server.close())
+        # at most `max_sessions` schedulers are kept in memory
+        server = TrainingServer(self.selector, max_workers=1, max_sessions=2, results=results)
+        for user in ["bob", "carol", "dave", "alice"]:
+            run(play(server, user))
+        self.assertEqual(list(server.schedulers), [(user, "Guess How Wide!", "staircase")
+                                                   for user in ["dave", "alice"]])
+        run(server.close())
+        self.assertEqual(results.load_state("alice", "Guess How Wide!", "staircase")["level"], 3)
+
+    def test_scheduler_eviction(self):
+        results = ResultsStore(os.path.join(self.tmp_dir.name, "results.sqlite"))
+        self.addCleanup(results.close)
+        server = TrainingServer(self.selector, max_workers=1, max_sessions=2, results=results)
+        def run(coroutine):
+            return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+        async def open_session(user:str) -> Session:
+            data = await server.create_session({"exercise": "width", "user": user,
+                                                "adaptive": "staircase"})
+            return server.get_session(data["session"])
+        run(server.start("127.0.0.1", 0))
+        self.addCleanup(run, server.close())
+        erin = run(open_session("erin"))
+        # the schedulers of other users do not push out the one of a live session
+        for user in ["bob", "carol"]:
+            server.end_session(run(open_session(user)))
+        self.assertIn(erin.scheduler_key, server.schedulers)
+        self.assertIs(server.schedulers[erin.scheduler_key], erin.scheduler)
+        for _ in range(6):
+            run(server.next_round(erin))
+            exercise = erin.exercise
+            server.answer(erin, {"choice": exercise.options.index(exercise.solution)})
+        server.end_session(erin)
+        # (waiting for the save in the worker thread)
+        server._executor.submit(lambda: None).result()
+        state = results.load_state("erin", "Guess How Wide!", "staircase")
+        self.assertEqual(state, erin.scheduler.as_dict())
+        self.assertEqual(state["level"], 3)
+
+    def test_concurrent_sessions(self):
+        def play(exercise:str) -> int:
+            _, data = self.request("POST", "/sessions", {"exercise": exercise})
+            path = f"/sessions/{data['session']}"
+            for _ in range(2):
+                self.request("POST", f"{path}/rounds")
+                self.request("GET", f"{path}/audio")
+                self.request("POST", f"{path}/answer", {"choice": 0})
+            _, data = self.request("DELETE", path)
+            return data["score"]["num_rounds"]
+        exercises = ["gain", "frequency", "panning", "width"] * 3
+        with ThreadPoolExecutor(len(exercises)) as executor:
+            self.assertEqual(list(executor.map(play, exercises)), [2] * len(exercises))
+        self.assertEqual(self.server.sessions, {})
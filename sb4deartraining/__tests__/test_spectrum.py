@@ -0,0 +1,29 @@
+"""Test cases for the spectral analysis utilities."""
+# external import
+from unittest import TestCase
+import numpy as np
+# internal imports
+from sb4deartraining.config import _SR
+from sb4deartraining.utilities.frequencies import get_third_freqs
+from sb4deartraining.utilities.spectrum import get_power_spectrum
+from sb4deartraining.utilities.spectrum import get_band_energies
+
+
+class TestSpectrum(TestCase):
+
+    def test_power_spectrum(self):
+        t = np.arange(_SR) / _SR
+        freqs, power = get_power_spectrum(np.sin(2 * np.pi * 1000 * t), n_fft=4096)
+        self.assertEqual(len(freqs), len(power))
+        self.assertAlmostEqual(freqs[np.argmax(power)], 1000, delta=_SR / 4096)
+
+    def test_band_energies(self):
+        t = np.arange(_SR) / _SR
+        sine = np.sin(2 * np.pi * 1000 * t)
+        band_freqs = get_third_freqs(f_max=_SR / 2 - 1)
+        energies = get_band_energies(np.stack([sine, sine]))
+        self.assertEqual(len(energies), len(band_freqs))
+        self.assertEqual(band_freqs[np.argmax(energies)], 1000)
+        self.assertAlmostEqual(np.max(energies), 0, delta=0.1)
+        # silence has no energy in any band
+        self.assertTrue(np.all(get_band_energies(np.zeros(1000)) == -np.inf))
@@ -9,3 +9,37 @@ class TestUtilities(TestCase):
         self.assertEqual(add_semi_tones(1000, 12), 2000, "Octave up fails")
         self.assertAlmostEqual(add_semi_tones(1000, 3.14), 1000 * 2 **(3.14/12), "Crooked steps fail")
 
+
+    def test_add_semi_tones_arrays(self):
+        import numpy as np
+        from sb4deartraining.utilities.frequencies import add_semi_tones
+        # integer steps: identical to the scalar results
+        sts = np.arange(-30, 31)
+        np.testing.assert_array_equal(add_semi_tones(1000, sts), [add_semi_tones(1000, int(st)) for st in sts])
+        # fractional steps (broadcast against several frequencies)
+        freqs = np.array([[250.], [1000.]])
+        shifted = add_semi_tones(freqs, np.array([-0.5, 3.14]))
+        self.assertEqual(shifted.shape, (2, 2))
+        np.testing.assert_allclose(shifted[1], [add_semi_tones(1000, -0.5), add_semi_tones(1000, 3.14)])
+
+    def test_band_freqs(self):
+        import numpy as np
+        from sb4deartraining.utilities.frequencies import get_band_freqs
+        from sb4deartraining.utilities.frequencies import get_octave_freqs, get_third_freqs
+        octaves = get_octave_freqs(1000, 40, 20000)
+        self.assertEqual(octaves, [62.5, 125, 250, 500, 1000, 2000, 4000, 8000, 16000])
+        thirds = get_band_freqs(1000, 40, 20000, 3)
+        np.testing.assert_array_equal(get_band_freqs(1000, 40, 20000), octaves)
+        np.testing.assert_allclose(np.diff(np.log2(thirds)), 1 / 3)
+        self.assertEqual(get_third_freqs(1000, 40, 20000), thirds.tolist())
+
+    def test_time_arrays(self):
+        import numpy as np
+        from sb4deartraining.utilities.time import convert_seconds_to_samples, convert_ms_to_samples
+        from sb4deartraining.utilities.time import convert_samples_to_ms
+        self.assertEqual(convert_seconds_to_samples(0.5, 1000), 500)
+        self.assertIs(type(convert_seconds_to_samples(0.0019, 1000)), int)
+        # truncated towards zero like int()
+        np.testing.assert_array_equal(convert_seconds_to_samples([0.0019, -0.0019, 1], 1000), [1, -1, 1000])
+        np.testing.assert_array_equal(convert_ms_to_samples(np.array([1.5, 10]), 1000), [1, 10])
+        np.testing.assert_allclose(convert_samples_to_ms(np.arange(3), 1000), [0, 1, 2])
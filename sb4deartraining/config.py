@@ -4,6 +4,38 @@
 _SR = 44100                         # default sample rate
 _JUST_BELOW_NYQUIST = _SR // 2 - 1  # frequency just  below nyquist
 _BLOCKSIZE = 1024                   # default block size for audio streams
+_DTYPE = "float32"                  # precision of audio data ("float64" for higher precision)
+_LOUDNESS_TARGET = -23.             # loudness of level-matched samples (LUFS)
+_MIN_BAND_ENERGY_DB = -25.          # band energy (rel. to total) for frequency exercises (dB)
+_LOOP_CROSSFADE = 0.01              # crossfade at the loop seam of samples (s)
+_LOOP_SEARCH = 0.02                 # max. distance of loop points to zero crossings (s)
+
+# --- Memory Settings ---
+_SAMPLE_STORE_SIZE = 256 * 2 ** 20  # memory budget for decoded samples (bytes)
+_RENDER_CACHE_SIZE = 128 * 2 ** 20  # memory budget for encoded renders (bytes)
+
+# --- Concurrency Settings ---
+_PREFETCH_WORKERS = 1               # threads decoding samples in the background
+_PRERENDER_DEPTH = 2                # rounds of exercises prepared ahead of time (0 renders live)
+_RENDER_WORKERS = 1                 # threads preparing rounds of exercises
+
+# --- Server Settings ---
+_SERVER_HOST = "127.0.0.1"          # interface of the training server
+_SERVER_PORT = 8000                 # port of the training server
+_SERVER_WORKERS = 4                 # threads preparing and rendering rounds for the server
+_SERVER_MAX_SESSIONS = 500          # max. number of concurrent training sessions
+_SERVER_SESSION_TTL = 30 * 60       # idle time after which sessions are ended (s, None keeps them)
+_STREAM_CHUNK_SIZE = 16384          # samples per chunk of streamed audio
+
+# --- Exercise Settings ---
+_ADAPTIVE_TARGET = 0.75             # share of correct answers adaptive exercises aim for
+
+# --- Results Settings ---
+_RESULTS_BATCH_SIZE = 256           # max. number of answers written per transaction
+_RESULTS_FLUSH_INTERVAL = 1.        # max. time recorded answers wait before being written (s)
+_RESULTS_RETRIES = 3                # attempts to write a batch of answers before dropping it
 
 # --- Default Paths ---
-_AUDIO_SAMPLE_PATH = "./samples/"   # default sample path
\ No newline at end of file
+_AUDIO_SAMPLE_PATH = "./samples/"       # default sample path
+_SAMPLE_CACHE_PATH = "./.sample_cache/" # cache for decoded samples (None disables)
+_RESULTS_PATH = "./results.sqlite"      # database of recorded answers
\ No newline at end of file
@@ -7,7 +7,10 @@ import numpy as np
 ### MATHEMATICS ###
 
 PI = np.pi              # 3.14159... you know it
-SQRT12 = np.sqrt(0.5)   # needed for pan laws
+SQRT12 = 0.5 ** 0.5     # needed for pan laws
+
+# NOTE: The constants are Python floats (not NumPy scalars) so that they
+# don't change the precision of float32 audio data in computations.
 
 ### MUSIC ###
 
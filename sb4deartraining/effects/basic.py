@@ -1,7 +1,7 @@
 # external imports
 import numpy as np
 # internal/relative imports
-from ..config import _SR, _JUST_BELOW_NYQUIST, _BLOCKSIZE
+from ..config import _SR, _JUST_BELOW_NYQUIST, _BLOCKSIZE, _DTYPE
 
 
 class AudioEffect:
@@ -19,9 +19,15 @@ class AudioEffect:
     that implements the effect. The audio input is expected to be
     a NumPy ndarray and the output needs to be an array of the same
     dimension and shape.
+
+    3) Coefficient arrays should be cast to `.dtype` on construction
+    so that the precision of the audio data is preserved (float32 
+    by default, see `config._DTYPE`).
     """
     # Sample rate
     sr:int = _SR
+    # Precision of audio data and coefficients
+    dtype:np.dtype = np.dtype(_DTYPE)
     # Dummy name for effects category (override in subclasses!)
     name:str = "Generic Audio Effect"
 
@@ -30,6 +36,16 @@ class AudioEffect:
         """Returns the effect instance attributes as a dictionary.
         (Equivalent to `.__dict__`.)"""
         return self.__dict__
+
+    @property
+    def key(self) -> tuple:
+        """Hashable identification of the effect and its settings, e.g. 
+        for caching rendered audio. Private attributes and arrays (filter
+        coefficients and states derived from the settings) are ignored."""
+        settings = tuple(sorted(
+            (key, val) for key, val in self.params.items()
+            if not key.startswith("_") and not isinstance(val, np.ndarray)))
+        return (type(self).__name__, settings)
     
     def set_params(self, new_params):
         if self.params:
@@ -84,7 +100,9 @@ class AudioEffect:
 
 
 class AudioFxChain:
-    """Container class for chaining multiple audio effects."""
+    """Container class for chaining multiple audio effects. Audio data
+    is converted to the precision of the effects (`AudioEffect.dtype`)
+    once before it enters the chain."""
 
     def __init__(self, fxs:list[AudioEffect]=[]):
         """Creates a container for multiple audio effects."""
@@ -104,9 +122,18 @@ class AudioFxChain:
         """Adds add a new effect to the end of the chain."""
         self.fxs.append(fx)
     
+    @property
+    def dtype(self) -> np.dtype:
+        return AudioEffect.dtype
+
+    @property
+    def key(self) -> tuple:
+        """Hashable identification of the chain (see `AudioEffect.key`)."""
+        return tuple(fx.key for fx in self.fxs)
+
     def apply_fxs(self, audiodata:np.ndarray):
         """Applies the effects chain to an audio signal."""
-
+        audiodata = audiodata.astype(self.dtype, copy=False)
         for fx in self.fxs:
             audiodata = fx(audiodata)
         return audiodata
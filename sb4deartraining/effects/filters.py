@@ -11,6 +11,7 @@ from scipy.signal import lfilter, butter
 from scipy.signal import sosfilt, sosfilt_zi, tf2sos
 # internal/relative imports
 from ..config import _SR, _JUST_BELOW_NYQUIST, _BLOCKSIZE
+from ..utilities.loudness import get_k_weighting_sos
 from .basic import AudioEffect
 
 
@@ -28,7 +29,9 @@ class Filter(AudioEffect):
     2.2) Define two more instance attributes `self.sos` and `self.zi` 
     for the second-order sections and the filter state. The values must 
     with `scipy.signal.sosfilt`. (Please consult the SciPy documentation 
-    for more details.)
+    for more details.) The method `._get_sos_and_zi()` casts the 
+    coefficients to the precision of the audio data and computes the
+    initial filter state.
     """
 
     name = "Generic Audio Filter"
@@ -38,6 +41,13 @@ class Filter(AudioEffect):
         self.sos:np.ndarray = None  # filter coefficients
         self.zi:np.ndarray = None   # filter state
     
+    def _get_sos_and_zi(self, sos:np.ndarray) -> tuple[np.ndarray]:
+        """Casts second-order sections to `self.dtype` and computes the
+        matching initial filter state."""
+        sos = sos.astype(self.dtype)
+        zi = sosfilt_zi(sos).astype(self.dtype)
+        return sos, zi
+
     def _adjust_zi_to_audiochannels(self, zi:np.ndarray, audiodata:np.ndarray):
         """Adjust the a filter state array to an audio data array in case of a 
         dimension mismatch."""
@@ -47,7 +57,7 @@ class Filter(AudioEffect):
         # reset filter state (zi) and adjust to audiodata
         if not zi_fits_audio:
             # recompute initial state for mono signal
-            zi_0 = sosfilt_zi(self.sos)
+            zi_0 = sosfilt_zi(self.sos).astype(self.dtype)
             # mono case
             if audio_dim == 1:
                 zi = zi_0
@@ -94,8 +104,7 @@ class LowPassFilter(Filter):
             fs=self.sr,     # sample rate
             output='sos'    # needed for real-time processing
         )
-        zi = sosfilt_zi(sos)
-        return sos, zi
+        return self._get_sos_and_zi(sos)
 
 
 class HighPassFilter(Filter):
@@ -116,8 +125,7 @@ class HighPassFilter(Filter):
             fs=self.sr,     # sample rate
             output='sos'    # needed for real-time processing
         )
-        zi = sosfilt_zi(sos)
-        return sos, zi
+        return self._get_sos_and_zi(sos)
 
 
 class ParametricEQ(Filter):
@@ -146,5 +154,20 @@ class ParametricEQ(Filter):
         a = np.array([1, a1 / a0, a2 / a0])
         # Convert to SOS for numerical stability
         sos = tf2sos(b, a)
-        zi = sosfilt_zi(sos)
-        return sos, zi
+        return self._get_sos_and_zi(sos)
+
+
+class KWeightingFilter(Filter):
+    """K-weighting filter used for loudness measurements according to
+    ITU-R BS.1770: a high shelf (+4 dB above ~1.7 kHz) modeling the head
+    followed by a high pass (RLB weighting). The coefficients are 
+    derived for arbitrary sample rates (see 
+    `utilities.loudness.get_k_weighting_sos`)."""
+
+    name = "K-Weighting Filter (BS.1770, SOS)"
+
+    def __init__(self):
+        self.sos, self.zi = self._get_sos_and_zi(self.design(self.sr))
+
+    # second-order sections for a sample rate (float64)
+    design = staticmethod(get_k_weighting_sos)
@@ -2,13 +2,24 @@
 
 # external imports
 import numpy as np
+from functools import lru_cache
 # internal imports
+from ..config import _DTYPE
 from ..constants import PI, SQRT12
 from .basic import AudioEffect
 
-# mid-side orthonormal basis
-MID_VEC = np.array([[1], [1]]) * SQRT12
-SIDE_VEC = np.array([[1], [-1]]) * SQRT12
+
+@lru_cache
+def get_mid_side_vecs(dtype:np.dtype=_DTYPE) -> tuple[np.ndarray, np.ndarray]:
+    """Mid-side orthonormal basis as (2, 1) arrays (for broadcasting) 
+    in the given precision (created once per dtype, read-only)."""
+    mid_vec = np.array([[1], [1]], dtype=dtype) * SQRT12
+    side_vec = np.array([[1], [-1]], dtype=dtype) * SQRT12
+    mid_vec.flags.writeable = side_vec.flags.writeable = False
+    return mid_vec, side_vec
+
+# mid-side orthonormal basis (in the default precision)
+MID_VEC, SIDE_VEC = get_mid_side_vecs(np.dtype(_DTYPE))
 
 
 def mid_side_split(stereoaudio:np.ndarray) -> np.ndarray:
@@ -23,15 +34,17 @@ def convert_stereo_to_mono(stereoaudio:np.ndarray) -> np.ndarray:
     """Converts stereo signal to mono signal of equal intensity."""
     return np.sum(stereoaudio, axis=0) * SQRT12
 
-def adjust_stereo_width(stereoaudio:np.ndarray, width:float|int=1) -> np.ndarray:
-    """Adjust the stereo width of a stereo signal."""
+def adjust_stereo_width(stereoaudio:np.ndarray, width:float|int=1, dtype:np.dtype=None) -> np.ndarray:
+    """Adjust the stereo width of a stereo signal (in the precision 
+    `dtype`, by default the one of the signal)."""
     # bypass for width=1
     if width == 1.:
         return stereoaudio
     # get mid and side channels
     mid, side = mid_side_split(stereoaudio)
     # recombine
-    processed_audio = mid * MID_VEC + width * side * SIDE_VEC
+    mid_vec, side_vec = get_mid_side_vecs(stereoaudio.dtype if dtype is None else np.dtype(dtype))
+    processed_audio = mid * mid_vec + width * side * side_vec
     return processed_audio
 
 
@@ -41,11 +54,12 @@ class StereoControl(AudioEffect):
 
     def __init__(self, pos:float=0, width:float=1):
         try:
-            self.pos = np.clip(pos, -1, 1)
-            self.width = np.clip(width, 0, 1)
+            self.pos = float(np.clip(pos, -1, 1))
+            self.width = float(np.clip(width, 0, 1))
         except:
             raise ValueError("The arguments expect floating point input.")
-        self._coefficients = self.get_coefficients()
+        # panning coefficients as (2, 1) array for broadcasting
+        self._coefficients = np.array(self.get_coefficients(), dtype=self.dtype).reshape(2, 1)
     
     def get_coefficients(self):
         pos = self.pos
@@ -74,13 +88,12 @@ class StereoControl(AudioEffect):
         """
         # Case 1: Mono Signals
         if audiodata.ndim == 1:
-            lam, rho = self._coefficients
             # compute panned signal (using NumPy's broadcasting)
-            processed_audio = np.array([[lam],[rho]]) * audiodata
+            processed_audio = self._coefficients * audiodata
         # Case 2: Stereo Signals
         if audiodata.ndim == 2:
             # adjust stero width 
-            audiodata = adjust_stereo_width(audiodata,self.width)
+            audiodata = adjust_stereo_width(audiodata, self.width, self.dtype)
             # avoid re-centering already centered data
             if self.pos == 0. and (audiodata[0] == audiodata[1]).all():
                 return audiodata
@@ -89,6 +102,6 @@ class StereoControl(AudioEffect):
             # pan the mid channel to self.pos
             panned_mid = self.apply(mid)
             # add side side information
-            sides = side * SIDE_VEC
+            sides = side * get_mid_side_vecs(self.dtype)[1]
             processed_audio = panned_mid + sides
         return processed_audio
\ No newline at end of file
@@ -37,8 +37,8 @@ class Amplifier(AudioEffect):
     
     def apply(self, audiodata):
         """Amplify an audio signal."""
-        # rescale the audio data
-        audiodata_out = audiodata * self.gain_ratio
+        # rescale the audio data (preserving its precision)
+        audiodata_out = audiodata * self.dtype.type(self.gain_ratio)
         # clip the values if needed
         if self.clip:
             audiodata_out = np.clip(audiodata_out, -1, 1)
@@ -68,7 +68,7 @@ class Compressor(AudioEffect):
         self._makeup_ratio = convert_db_to_ratio(makeup_db)
         self._attack_coeff = self._time_to_coeff(attack_ms)
         self._release_coeff = self._time_to_coeff(release_ms)
-        # envelope follower state register
+        # envelope follower state register (one value per channel)
         self._env = 0.0
 
     def _time_to_coeff(self, time_ms):
@@ -77,32 +77,45 @@ class Compressor(AudioEffect):
         return np.exp(-1.0 / (0.001 * time_ms * self.sr))
 
     def apply(self, audio:np.ndarray) -> np.ndarray:
-        """Process a block of samples (NumPy array)."""
+        """Process a block of samples (NumPy array). The envelope of 
+        each channel is followed separately, so processing a signal in
+        blocks gives the same result as processing it at once."""
         # Case 1: Mono Signals
         if audio.ndim == 1:
-            processed_audio = self._process_channel(audio)
+            env = self._env if np.ndim(self._env) == 0 else max(self._env)
+            processed_audio, self._env = self._process_channel(audio, env)
         # Case 2: Stereo Signals (more channels possible)
         else: 
             N = audio.shape[0] # number of channels
-            processed_channels = [self._process_channel(audio[ch, :]) for ch in range(N)]
+            envs = list(self._env) if np.ndim(self._env) == 1 else []
+            if len(envs) != N:
+                # (re)start all channels from the current envelope
+                envs = [max(envs) if envs else self._env] * N
+            processed_channels = []
+            for ch in range(N):
+                processed_channel, envs[ch] = self._process_channel(audio[ch, :], envs[ch])
+                processed_channels.append(processed_channel)
             processed_audio =  np.stack(processed_channels, axis=0)
+            self._env = envs
         return processed_audio
 
-    def _process_channel(self, x):
+    def _process_channel(self, x, env):
+        """Compresses a channel starting with envelope `env`. Returns the
+        output and the envelope at its end."""
         out = np.zeros_like(x)
 
         for n, sample in enumerate(x):
             rectified = abs(sample)
 
             # envelope follower
-            if rectified > self._env:
+            if rectified > env:
                 coeff = self._attack_coeff
             else:
                 coeff = self._release_coeff
-            self._env = coeff * self._env + (1.0 - coeff) * rectified
+            env = coeff * env + (1.0 - coeff) * rectified
 
             # gain computer
-            env_db = convert_ratio_to_db(self._env)
+            env_db = convert_ratio_to_db(env)
             thresh_db = convert_ratio_to_db(self._threshold_ratio)
             if env_db > thresh_db:
                 over_db = env_db - thresh_db
@@ -112,5 +125,4 @@ class Compressor(AudioEffect):
 
             gain = convert_db_to_ratio(gain_db)
             out[n] = sample * gain * self._makeup_ratio
-        return out
-
+        return out, env
@@ -1,6 +1,49 @@
-"""A collection of audio ear training exercises"""
+"""A collection of audio ear training exercises
 
-from .volume import GuessTheGain
-from .frequency import GuessTheFrequency
-from .stereo import GuessWhere
-from .stereo import GuessTheWidth
\ No newline at end of file
+The exercises are imported lazily on first access (PEP 562). The user
+interface dependencies (`ipywidgets`, `IPython`, `sounddevice`) are only
+imported once an exercise is created or run. The headless exercises 
+(e.g. `GainExercise`) never import them (see `engine`)."""
+
+import importlib
+
+# maps public names to the submodules defining them
+_LAZY_ATTRIBUTES = {
+    "GuessTheGain": ".volume",
+    "GuessTheFrequency": ".frequency",
+    "GuessWhere": ".stereo",
+    "GuessTheWidth": ".stereo",
+    # headless exercises (no user interface or audio device)
+    "Exercise": ".engine",
+    "Score": ".engine",
+    "GainExercise": ".volume",
+    "FrequencyExercise": ".frequency",
+    "PanningExercise": ".stereo",
+    "WidthExercise": ".stereo",
+    # recorded answers
+    "ResultsStore": ".results",
+    "Results": ".results",
+    # bulk grading
+    "GainEvaluator": ".evaluators",
+    "FrequencyEvaluator": ".evaluators",
+    "PanEvaluator": ".evaluators",
+    "WidthEvaluator": ".evaluators",
+    # adaptive difficulty
+    "StaircaseScheduler": ".adaptive",
+    "EloScheduler": ".adaptive",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name:str):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,76 @@
+"""Preparation of exercise rounds in the background."""
+
+# external imports
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple
+# internal/relative imports
+from ..config import _PRERENDER_DEPTH, _RENDER_WORKERS
+from ..playback.samples import Sample
+from ..effects.basic import AudioFxChain
+
+
+class Round(NamedTuple):
+    """Everything needed to play a round of an exercise."""
+    options:list            # choices offered to the user
+    solution:Any            # the correct option
+    sample:Sample           # the (dry) sample
+    fxs:AudioFxChain        # effects chain applied to the sample
+    wet:Sample              # pre-rendered sample with effects (or None)
+    difficulty:int = None   # difficulty level (see `Exercise.difficulty_levels`)
+
+
+class RoundPipeline:
+    """Prepares the next rounds of an exercise on a pool of worker threads
+    (sample loading, effect rendering, ...). At most `depth` rounds are
+    prepared ahead of time, a new one is started whenever a round is
+    taken. With a depth of 0, rounds are prepared on demand."""
+
+    def __init__(self, make_round:Callable[[], Round], depth:int=_PRERENDER_DEPTH,
+                 max_workers:int=_RENDER_WORKERS):
+        """Starts preparing rounds in the background.
+
+        Arguments:
+        - make_round: function without arguments returning a new round
+        - depth: number of rounds prepared ahead of time
+        - max_workers: number of worker threads
+        """
+        self.make_round = make_round
+        self.depth = depth
+        self._queue:deque[Future] = deque()
+        self._executor = None
+        if depth > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="round-render")
+            self._fill()
+
+    def _fill(self):
+        while len(self._queue) < self.depth:
+            self._queue.append(self._executor.submit(self.make_round))
+
+    def __len__(self) -> int:
+        """Number of rounds prepared (or being prepared)."""
+        return len(self._queue)
+
+    def get(self) -> Round:
+        """Returns the next round (waiting for it if necessary) and starts
+        preparing another one."""
+        if self._executor is None:
+            return self.make_round()
+        future = self._queue.popleft()
+        self._fill()
+        try:
+            return future.result()
+        except Exception:
+            # fall back to preparing the round synchronously
+            return self.make_round()
+
+    def close(self):
+        """Cancels pending rounds and shuts down the worker threads."""
+        for future in self._queue:
+            future.cancel()
+        self._queue.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
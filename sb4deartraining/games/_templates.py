@@ -1,83 +1,80 @@
 """Templates classes for games."""
 
 # external imports
-import numpy as np
-import random
-import ipywidgets as widgets
-from IPython.display import display
 from time import sleep
 # internal/relative imports
-from ..playback.samples import SampleSelector
 from ..playback.player import SamplePlayer
-from ..effects.volume import Amplifier
-from ..effects.basic import AudioEffect
-from ..effects.basic import AudioFxChain
+from .engine import Exercise
 
 
 #TODO Include instructions in doc string.
 class OptionButtonExercise():
     """Template class for exercises offering a finite number of
     choices one of which is the solution. Currently built for 
-    use in Jupyter Notebooks."""
+    use in Jupyter Notebooks.
+    
+    This is a thin user interface on top of a headless exercise (see
+    `engine.Exercise`) given by the class attribute `exercise_class`.
+    The arguments of the constructor are passed on to the exercise.
+    Rounds are prepared in the background by the exercise, so starting
+    a round and playing the effects only reads prepared buffers. The
+    choice buttons are rebuilt whenever the number of options changes
+    (e.g. with the difficulty level chosen by a scheduler)."""
 
-    name = "Dummy Exercise"
+    # headless exercise (round generation, evaluation, scoring)
+    exercise_class:type = Exercise
     
-    def __init__(self, num_choices:int=3, mode='native'):
-        self.num_choices = num_choices
-        self.mode=mode
-        # build effect with random parameter selection
-        self.options:list = self.get_options()
-        self.solution = self.get_solution()
-        # get random sample
-        self.sample_selector:SampleSelector = SampleSelector()
-        sample = self.get_sample()
-        fxs = self.get_fx_chain()
+    def __init__(self, *args, **kwargs):
+        import ipywidgets as widgets
+        self.exercise:Exercise = self.exercise_class(*args, **kwargs)
+        first_round = self.exercise.next_round()
         # initialize player with sample and fx
-        self.player:SamplePlayer = SamplePlayer(sample, fxs)
+        self.player:SamplePlayer = SamplePlayer(
+            first_round.sample, first_round.fxs, wet=first_round.wet)
         # add UI elements
-        self.choice_buttons:list[widgets.Button] = \
-            [widgets.Button(description=option['label']) for option in self.options]
-        for button in self.choice_buttons:
-            button.on_click(self.evaluate_choice)
+        self.choice_buttons:list[widgets.Button] = self._make_choice_buttons()
+        self.button_box:widgets.HBox = widgets.HBox(self.choice_buttons)
         self.restart_button:widgets.Button = \
             widgets.Button(description="Start over!", button_style="warning")
         self.restart_button.on_click(self._restart_button_click)
-    
-    def get_options(self):
-        dummy_options = []
-        for i in range(self.num_choices):
-            button_label = f"Option {i + 1}"
-            val = random.randint(100, 500)
-            option = {
-                "label":button_label,
-                "value":val
-            }
-            dummy_options.append(option)
-        return dummy_options
-    
-    def get_solution(self):
-        solution = random.choice(self.options)
-        return solution
 
-    def get_sample(self):
-        return self.sample_selector.get_random_sample(mode=self.mode)
-    
-    def get_fx_chain(self):
-        param = self.solution
-        fx = AudioEffect()
-        fx_chain = AudioFxChain([fx])
-        return fx_chain
+    @property
+    def name(self) -> str:
+        return self.exercise.name
+
+    @property
+    def options(self) -> list:
+        return self.exercise.options
+
+    @property
+    def solution(self):
+        return self.exercise.solution
+
+    @property
+    def sample_selector(self):
+        return self.exercise.sample_selector
+
+    def _make_choice_buttons(self) -> list:
+        import ipywidgets as widgets
+        buttons = [widgets.Button(description=option['label']) for option in self.options]
+        for button in buttons:
+            button.on_click(self.evaluate_choice)
+        return buttons
 
-    def evaluate_choice(self, button:widgets.Button):
+    def evaluate_choice(self, button:"widgets.Button"):
         idx = self.choice_buttons.index(button)
-        if self.options[idx] == self.solution:
+        if self.exercise.answer(idx):
             button.button_style = "success"
         else:
             button.button_style = "danger"
         
     def reset_choice_buttons(self):
-        buttons = self.choice_buttons
         options = self.options
+        if len(self.choice_buttons) != len(options):
+            # the number of options depends on the difficulty level
+            self.choice_buttons = self._make_choice_buttons()
+            self.button_box.children = self.choice_buttons
+        buttons = self.choice_buttons
         for idx, button in enumerate(buttons):
             # reset color
             button.button_style = ""
@@ -88,12 +85,11 @@ class OptionButtonExercise():
         # stop plaback
         self.player.stop()
         sleep(0.25)
-        # get new sample
-        self.player.sample = self.get_sample()
-        # get new gain options
-        self.options = self.get_options()
-        self.solution = self.get_solution()
-        self.player.fxs = self.get_fx_chain()
+        # get the next (prepared) round
+        next_round = self.exercise.next_round()
+        self.player.sample = next_round.sample
+        self.player.fxs = next_round.fxs
+        self.player.wet = next_round.wet
         # reset choice buttons
         self.reset_choice_buttons()
         # restart playback
@@ -104,14 +100,21 @@ class OptionButtonExercise():
 
     @property
     def title_widget(self):
+        import ipywidgets as widgets
         return widgets.HTML(value=f"<h1>{self.name}</h1>")
 
+    def close(self):
+        """Stops playback and cancels preparing rounds and loading 
+        samples in the background."""
+        self.player.stop()
+        self.exercise.close()
+
     def run(self):
+        from IPython.display import display
         # display title
         display(self.title_widget)
         # start player
         self.player.run()
         # display the options
-        button_box = widgets.HBox(self.choice_buttons)
-        display(button_box)
+        display(self.button_box)
         display(self.restart_button)
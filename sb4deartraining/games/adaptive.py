@@ -0,0 +1,145 @@
+"""Adaptive difficulty of exercises.
+
+Exercises define a ladder of difficulty levels (parameter settings from
+easy to hard, see `Exercise.difficulty_levels`). A scheduler picks the
+level of the next round from the answers so far. Each answer updates the
+scheduler in constant time (no history is kept or re-scanned), so one
+scheduler per user and exercise can be updated on every request of a
+server. The state of a scheduler is a small dictionary (see `.as_dict()`)
+that can be stored and restored between sessions."""
+
+# external imports
+import math
+# internal/relative imports
+from ..config import _ADAPTIVE_TARGET
+
+
+class DifficultyScheduler:
+    """Base class of the schedulers. Subclasses override `.difficulty`
+    (the level of the next round) and `.update()`."""
+
+    def __init__(self, num_levels:int):
+        if num_levels < 1:
+            raise ValueError("At least one difficulty level expected.")
+        self.num_levels = num_levels
+
+    @property
+    def difficulty(self) -> int:
+        """Difficulty level of the next round (0 is the easiest)."""
+        return 0
+
+    def update(self, is_correct:bool, difficulty:int=None):
+        """Adds an answer given to a round of the given difficulty level
+        (by default the current level)."""
+
+    def as_dict(self) -> dict:
+        """State of the scheduler (see `.from_dict()`)."""
+        return {"type": type(self).__name__, **vars(self)}
+
+    @classmethod
+    def from_dict(cls, state:dict) -> "DifficultyScheduler":
+        """Restores a scheduler from its state (see `.as_dict()`)."""
+        state = dict(state)
+        name = state.pop("type", cls.__name__)
+        scheduler_class = next((c for c in [cls, *_all_subclasses(cls)] if c.__name__ == name), None)
+        if scheduler_class is None:
+            raise ValueError(f"Unknown scheduler '{name}'.")
+        scheduler = scheduler_class.__new__(scheduler_class)
+        vars(scheduler).update(state)
+        return scheduler
+
+
+def _all_subclasses(cls:type) -> list[type]:
+    subclasses = cls.__subclasses__()
+    return subclasses + [c for sub in subclasses for c in _all_subclasses(sub)]
+
+
+class StaircaseScheduler(DifficultyScheduler):
+    """Transformed up-down staircase: the level increases after `down`
+    consecutive correct answers and decreases after `up` consecutive
+    wrong ones. A 2-down/1-up staircase settles at about 71% correct
+    answers, 3-down/1-up at about 79%."""
+
+    def __init__(self, num_levels:int, start:int=0, down:int=2, up:int=1):
+        """Arguments:
+        - num_levels: number of difficulty levels
+        - start: initial level
+        - down: correct answers in a row making rounds harder
+        - up: wrong answers in a row making rounds easier
+        """
+        super().__init__(num_levels)
+        self.level = min(max(start, 0), num_levels - 1)
+        self.down = down
+        self.up = up
+        self.num_correct = 0
+        self.num_wrong = 0
+
+    @property
+    def difficulty(self) -> int:
+        return self.level
+
+    def update(self, is_correct:bool, difficulty:int=None):
+        if is_correct:
+            self.num_correct += 1
+            self.num_wrong = 0
+            if self.num_correct >= self.down:
+                self.level = min(self.level + 1, self.num_levels - 1)
+                self.num_correct = 0
+        else:
+            self.num_wrong += 1
+            self.num_correct = 0
+            if self.num_wrong >= self.up:
+                self.level = max(self.level - 1, 0)
+                self.num_wrong = 0
+
+
+class EloScheduler(DifficultyScheduler):
+    """Elo-style rating of the user against difficulty levels with fixed,
+    evenly spaced ratings. The probability of a correct answer is
+    expected to be 1 / (1 + 10 ** ((level rating - user rating) / 400)),
+    the level of the next round is the hardest one at which the user is
+    expected to answer correctly with the target probability."""
+
+    def __init__(self, num_levels:int, rating:float=None, k:float=64,
+                 spacing:float=100, target:float=_ADAPTIVE_TARGET):
+        """Arguments:
+        - num_levels: number of difficulty levels
+        - rating: initial rating of the user (by default matching the
+        easiest level at the target probability)
+        - k: max. change of the rating per answer
+        - spacing: rating difference of adjacent levels
+        - target: probability of a correct answer at the chosen level
+        """
+        super().__init__(num_levels)
+        if not 0 < target < 1:
+            raise ValueError("Target probability between 0 and 1 expected.")
+        self.k = k
+        self.spacing = spacing
+        self.target = target
+        # rating advantage giving the target probability
+        self.margin = 400 * math.log10(target / (1 - target))
+        self.rating = self.margin if rating is None else rating
+
+    def get_level_rating(self, difficulty:int) -> float:
+        return difficulty * self.spacing
+
+    def expected(self, difficulty:int) -> float:
+        """Expected probability of a correct answer at a level."""
+        return 1 / (1 + 10 ** ((self.get_level_rating(difficulty) - self.rating) / 400))
+
+    @property
+    def difficulty(self) -> int:
+        level = math.floor((self.rating - self.margin) / self.spacing)
+        return min(max(level, 0), self.num_levels - 1)
+
+    def update(self, is_correct:bool, difficulty:int=None):
+        if difficulty is None:
+            difficulty = self.difficulty
+        self.rating += self.k * (float(is_correct) - self.expected(difficulty))
+
+
+# schedulers by name (e.g. for the server)
+SCHEDULERS = {
+    "staircase": StaircaseScheduler,
+    "elo": EloScheduler,
+}
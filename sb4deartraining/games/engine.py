@@ -0,0 +1,283 @@
+"""Headless core of the ear training exercises.
+
+An exercise generates rounds (options, solution, sample and effects
+chain), renders the processed version of the sample on request and
+evaluates and scores answers. Nothing here depends on a user interface
+or an audio device, so exercises can be driven by the Jupyter widgets
+(see `_templates.OptionButtonExercise`), a server or a load test.
+Answers can be recorded to a results store (see `results`) and the
+difficulty can adapt to the answers (see `adaptive`)."""
+
+# external imports
+import uuid
+import random
+# internal/relative imports
+from ..config import _PRERENDER_DEPTH
+from ..playback.samples import SampleSelector
+from ..playback.rendering import RenderedSample
+from ..utilities.randomness import get_rng
+from ..effects.basic import AudioEffect
+from ..effects.basic import AudioFxChain
+from ._rounds import Round, RoundPipeline
+from .results import ResultsStore
+from .adaptive import DifficultyScheduler
+from .evaluators import Evaluator, Grades
+
+
+class Score:
+    """Running score of an exercise (first answer per round counts)."""
+
+    def __init__(self):
+        self.num_rounds = 0
+        self.num_correct = 0
+        self.streak = 0
+        self.best_streak = 0
+
+    def update(self, is_correct:bool):
+        """Adds the result of a round."""
+        self.num_rounds += 1
+        if is_correct:
+            self.num_correct += 1
+            self.streak += 1
+            self.best_streak = max(self.best_streak, self.streak)
+        else:
+            self.streak = 0
+
+    @property
+    def accuracy(self) -> float:
+        """Share of correctly answered rounds (0 if none was played)."""
+        return self.num_correct / self.num_rounds if self.num_rounds else 0.
+
+    def as_dict(self) -> dict:
+        return {
+            "num_rounds": self.num_rounds,
+            "num_correct": self.num_correct,
+            "accuracy": self.accuracy,
+            "streak": self.streak,
+            "best_streak": self.best_streak,
+        }
+
+    def __str__(self):
+        return f"SCORE: {self.num_correct}/{self.num_rounds} (best streak: {self.best_streak})"
+
+
+class Exercise:
+    """Base class for exercises offering a finite number of choices one
+    of which is the solution. Subclasses define the options (a list of
+    dictionaries with a 'label' and a 'value') and the effects chain
+    for a solution by overriding `.get_options()` and `.get_fx_chain()`.
+
+    Rounds are played one after another: `.next_round()` starts a new
+    round and `.answer()` evaluates a choice and updates the score.
+    The effects are fixed within a round, so the processed (wet) sample
+    can be rendered ahead of time (see `.render()` and `RoundPipeline`).
+
+    Subclasses can define difficulty levels (`.difficulty_levels`), which
+    a scheduler picks from for each round (see `adaptive`). The settings
+    of the level are passed to `.get_round()`, `.get_options()` and
+    `.get_fx_chain()` of the round (see `.get_settings()`), the exercise
+    itself is not changed. Prepared rounds keep the level they were made
+    with, so with pre-rendering a change of the level takes effect a few
+    rounds later.
+    """
+
+    name = "Dummy Exercise"
+    # restrictions for the sample selection (see `SampleLibrary.filter`)
+    sample_filters:dict = {}
+    # loudness of the samples (LUFS), None plays them unchanged
+    loudness_target:float = None
+    # attribute values from the easiest to the hardest level
+    difficulty_levels:list[dict] = [{}]
+    # grades the values of the options (see `evaluators`)
+    evaluator_class:type = Evaluator
+
+    def __init__(self, num_choices:int=3, mode='native',
+                 sample_selector:SampleSelector=None, render:bool=True,
+                 prerender_depth:int=_PRERENDER_DEPTH,
+                 results:ResultsStore=None, user:str=None,
+                 scheduler:DifficultyScheduler=None,
+                 rng:random.Random | int=None):
+        """Creates an exercise.
+
+        Arguments:
+        - num_choices: number of options
+        - mode: load mode of the samples (see `AudioSignal.load`)
+        - sample_selector: source of the samples (can be shared by
+        several exercises), by default a new one is created
+        - render: render the wet sample of each round (disable if the
+        effects are applied live or rendering is requested separately)
+        - prerender_depth: number of rounds prepared in the background
+        (0 prepares rounds on demand)
+        - results: store recording the answers (None records nothing)
+        - user: user the answers are recorded for
+        - scheduler: chooses the difficulty level of the rounds (None
+        keeps the given settings), e.g. `StaircaseScheduler(len(
+        exercise_class.difficulty_levels))`
+        - rng: random number generator (or seed) for the rounds (sample
+        selection, options, solution), seeding it makes the sequence
+        of rounds reproducible
+        """
+        self.num_choices = num_choices
+        self.mode = mode
+        self.rng = get_rng(rng)
+        self.evaluator:Evaluator = self.evaluator_class()
+        self.render_rounds = render
+        self.results = results
+        self.user = user
+        self.session_id = uuid.uuid4().hex
+        self.round_number = 0
+        if scheduler is not None and scheduler.num_levels != len(self.difficulty_levels):
+            raise ValueError(f"Scheduler for {len(self.difficulty_levels)} difficulty levels expected.")
+        self.scheduler = scheduler
+        self._owns_selector = sample_selector is None
+        if sample_selector is None:
+            sample_selector = SampleSelector(
+                auto_prefetch=True, loudness_target=self.loudness_target)
+        self.sample_selector:SampleSelector = sample_selector
+        self.score = Score()
+        self.round:Round = None
+        self._answered = False
+        self.rounds = RoundPipeline(self.make_round, depth=prerender_depth)
+
+    # --- Round Generation ---
+    def get_settings(self, difficulty:int=None) -> dict:
+        """Settings of a round: the number of options and the attributes
+        set by the difficulty levels, as set on the exercise or, if given,
+        by a difficulty level."""
+        names = {"num_choices"}.union(*self.difficulty_levels)
+        settings = {name: getattr(self, name) for name in names}
+        if difficulty is not None:
+            settings.update(self.difficulty_levels[difficulty])
+        return settings
+
+    def get_options(self, settings:dict=None) -> list[dict]:
+        settings = self.get_settings() if settings is None else settings
+        dummy_options = []
+        # distinct values (options with equal values are graded alike)
+        vals = self.rng.sample(range(100, 501), settings["num_choices"])
+        for i, val in enumerate(vals):
+            button_label = f"Option {i + 1}"
+            option = {
+                "label":button_label,
+                "value":val
+            }
+            dummy_options.append(option)
+        return dummy_options
+
+    def get_solution(self, options:list):
+        solution = self.rng.choice(options)
+        return solution
+
+    def get_sample(self):
+        sample = self.sample_selector.get_random_sample(
+            mode=self.mode, rng=self.rng, **self.sample_filters)
+        if self.loudness_target is not None:
+            # the selector might be shared by exercises with other targets
+            sample.gain_db = self.sample_selector.get_normalization_gain(sample.name, self.loudness_target)
+        return sample
+
+    def get_fx_chain(self, solution, settings:dict=None) -> AudioFxChain:
+        fx = AudioEffect()
+        fx_chain = AudioFxChain([fx])
+        return fx_chain
+
+    def get_round(self, settings:dict=None) -> tuple:
+        """Draws the options, the solution and the sample of a round (see
+        `.get_settings()` for the settings)."""
+        options = self.get_options(settings)
+        solution = self.get_solution(options)
+        sample = self.get_sample()
+        return options, solution, sample
+
+    def set_difficulty(self, difficulty:int):
+        """Applies the settings of a difficulty level to the exercise (e.g.
+        to play a fixed level without a scheduler). Rounds chosen by a
+        scheduler get the settings of their level instead."""
+        for name, val in self.difficulty_levels[difficulty].items():
+            setattr(self, name, val)
+
+    def new_round(self) -> Round:
+        """Generates a round (at the level chosen by the scheduler)
+        without rendering it."""
+        difficulty = None
+        if self.scheduler is not None:
+            difficulty = self.scheduler.difficulty
+        # passed on instead of set on the exercise (rounds can be made
+        # concurrently by several workers)
+        settings = self.get_settings(difficulty)
+        options, solution, sample = self.get_round(settings)
+        fxs = self.get_fx_chain(solution, settings)
+        return Round(options, solution, sample, fxs, None, difficulty)
+
+    def render(self, round:Round) -> Round:
+        """Returns the round with the wet sample rendered."""
+        return round._replace(wet=RenderedSample(round.sample, round.fxs))
+
+    def make_round(self) -> Round:
+        """Generates a round and renders it if enabled (runs in a
+        worker thread, see `RoundPipeline`)."""
+        round = self.new_round()
+        return self.render(round) if self.render_rounds else round
+
+    # --- Playing ---
+    def next_round(self) -> Round:
+        """Starts the next (prepared) round and returns it."""
+        return self.start_round(self.rounds.get())
+
+    def start_round(self, round:Round) -> Round:
+        """Starts a given round (e.g. prepared by `.make_round()` 
+        elsewhere) and returns it."""
+        self.round = round
+        self.round_number += 1
+        self._answered = False
+        return round
+
+    @property
+    def options(self) -> list:
+        return self.round.options
+
+    @property
+    def solution(self):
+        return self.round.solution
+
+    def evaluate(self, choice:int) -> bool:
+        """Checks whether the option with the given index is correct 
+        (without a tolerance, only the solution itself is, even if other 
+        options have the same value)."""
+        round = self.round
+        if self.evaluator.tolerance == 0:
+            return round.options[choice] == round.solution
+        return self.evaluator.evaluate_one(round.solution["value"], round.options[choice]["value"])
+
+    def grade(self, solutions, choices, tolerance=None) -> Grades:
+        """Grades answers in bulk (e.g. recorded ones), see 
+        `Evaluator.evaluate`."""
+        return self.evaluator.evaluate(solutions, choices, tolerance)
+
+    def answer(self, choice:int) -> bool:
+        """Evaluates a choice (option index). Only the first answer of
+        each round is added to the score (and recorded)."""
+        is_correct = self.evaluate(choice)
+        if not self._answered:
+            self.score.update(is_correct)
+            self._answered = True
+            if self.scheduler is not None:
+                self.scheduler.update(is_correct, self.round.difficulty)
+            if self.results is not None:
+                self.record(choice, is_correct)
+        return is_correct
+
+    def record(self, choice:int, is_correct:bool):
+        """Queues the answer of the current round for recording."""
+        round = self.round
+        self.results.record_answer(
+            self.name, self.session_id, self.round_number, round.sample.name,
+            len(round.options), round.solution["value"], round.options[choice]["value"],
+            is_correct, user=self.user)
+
+    def close(self):
+        """Cancels preparing rounds and loading samples in the background
+        (a shared sample selector is left open)."""
+        self.rounds.close()
+        if self._owns_selector:
+            self.sample_selector.close()
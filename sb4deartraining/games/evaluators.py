@@ -0,0 +1,97 @@
+"""Grading of answers in bulk.
+
+An evaluator compares chosen values with solutions (frequencies, gains,
+pan positions, ...) and returns whether each answer is correct together
+with its error, for single answers as well as for arrays of them (e.g.
+all answers of a server or recorded results, see `Results.solution` and
+`Results.choice`). Answers are correct if the error does not exceed the
+tolerance of the evaluator (0, i.e. the exact option, by default)."""
+
+# external imports
+import numpy as np
+from typing import NamedTuple
+# internal/relative imports
+from ..utilities.frequencies import add_semi_tones
+
+
+class Grades(NamedTuple):
+    """Result of grading answers (arrays, or scalars for single answers)."""
+    correct:np.ndarray      # whether the answers are correct
+    error:np.ndarray        # signed error of the choices (in the unit of the evaluator)
+
+
+class Evaluator:
+    """Grades numeric answers by their difference from the solutions.
+    Subclasses measure the error in other units by overriding
+    `.get_error()` (and `.is_correct()` if the tolerance is not
+    compared to the error directly)."""
+
+    # unit of errors and tolerances
+    unit = ""
+
+    def __init__(self, tolerance:float=0):
+        """Creates an evaluator accepting answers off by up to `tolerance`
+        (in the unit of the evaluator)."""
+        self.tolerance = tolerance
+
+    def get_error(self, solutions:np.ndarray, choices:np.ndarray) -> np.ndarray:
+        """Signed errors of the choices."""
+        return choices - solutions
+
+    def is_correct(self, solutions:np.ndarray, choices:np.ndarray,
+                   tolerance:np.ndarray) -> np.ndarray:
+        return np.abs(self.get_error(solutions, choices)) <= tolerance
+
+    def evaluate(self, solutions:np.ndarray, choices:np.ndarray,
+                 tolerance:np.ndarray=None) -> Grades:
+        """Grades answers (all arguments are broadcast against each other).
+
+        Arguments:
+        - solutions: values of the correct options
+        - choices: values of the chosen options
+        - tolerance: accepted error, per answer or for all of them (by
+        default the one of the evaluator)
+        """
+        solutions = np.asarray(solutions, dtype=float)
+        choices = np.asarray(choices, dtype=float)
+        tolerance = np.asarray(self.tolerance if tolerance is None else tolerance)
+        return Grades(self.is_correct(solutions, choices, tolerance),
+                      self.get_error(solutions, choices))
+
+    def evaluate_one(self, solution:float, choice:float) -> bool:
+        """Grades a single answer."""
+        return bool(self.evaluate(solution, choice).correct)
+
+
+class GainEvaluator(Evaluator):
+    """Grades gains (errors in dB)."""
+
+    unit = "dB"
+
+
+class PanEvaluator(Evaluator):
+    """Grades pan positions (-1 is left, 1 is right)."""
+
+    unit = "pan"
+
+
+class WidthEvaluator(Evaluator):
+    """Grades stereo widths (0 is mono, 1 is the original width)."""
+
+    unit = "width"
+
+
+class FrequencyEvaluator(Evaluator):
+    """Grades frequencies (errors in semi-tones). A choice is correct
+    within the same bounds as with `FrequencyChoiceEvaluator`."""
+
+    unit = "st"
+
+    def get_error(self, solutions:np.ndarray, choices:np.ndarray) -> np.ndarray:
+        return 12 * np.log2(choices / solutions)
+
+    def is_correct(self, solutions:np.ndarray, choices:np.ndarray,
+                   tolerance:np.ndarray) -> np.ndarray:
+        f_min = add_semi_tones(solutions, -tolerance)
+        f_max = add_semi_tones(solutions, tolerance)
+        return (f_min <= choices) & (choices <= f_max)
@@ -0,0 +1,341 @@
+"""Recording of answers and statistics over the recorded results.
+
+Answers are written to a local SQLite database. Recording only puts the
+answer into a queue, a background thread writes the queued answers in
+batches (one transaction each), so answering never waits for the disk.
+Queries load the requested columns into NumPy arrays (see `Results`)
+and aggregate them vectorized (accuracy per frequency band, per gain or
+pan position, learning curves, ...). Besides, the store keeps the state
+of the difficulty schedulers of the users (see `adaptive`)."""
+
+# external imports
+import os
+import json
+import time
+import queue
+import sqlite3
+import warnings
+import threading
+import numpy as np
+from typing import NamedTuple
+# internal/relative imports
+from ..config import _RESULTS_PATH, _RESULTS_BATCH_SIZE, _RESULTS_FLUSH_INTERVAL, _RESULTS_RETRIES
+
+
+class Answer(NamedTuple):
+    """A recorded answer (the first answer of a round)."""
+    time:float              # time of the answer (UNIX timestamp)
+    user:str                # user (or None)
+    session:str             # session of the exercise
+    exercise:str            # name of the exercise
+    round:int               # number of the round within the session
+    sample:str              # name of the sample
+    num_choices:int         # number of options
+    solution:float          # value of the correct option (e.g. frequency, dB, pan position)
+    choice:float            # value of the chosen option
+    correct:bool            # whether the answer was correct
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    user TEXT,
+    session TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    sample TEXT,
+    num_choices INTEGER NOT NULL,
+    solution REAL NOT NULL,
+    choice REAL NOT NULL,
+    correct INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_exercise ON answers (exercise, user);
+CREATE TABLE IF NOT EXISTS states (
+    user TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    time REAL NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (user, exercise, kind)
+);
+"""
+_INSERT = f"INSERT INTO answers ({', '.join(Answer._fields)}) VALUES ({', '.join('?' * len(Answer._fields))})"
+
+
+class Results:
+    """Recorded answers as NumPy arrays (one per column, in the order of
+    recording) with vectorized aggregations."""
+
+    def __init__(self, columns:dict[str, np.ndarray]):
+        self.columns = columns
+        self.time:np.ndarray = columns["time"]
+        self.solution:np.ndarray = columns["solution"]
+        self.choice:np.ndarray = columns["choice"]
+        self.correct:np.ndarray = columns["correct"]
+
+    def __len__(self) -> int:
+        return len(self.correct)
+
+    @property
+    def accuracy(self) -> float:
+        """Share of correct answers (0 if there are none)."""
+        return float(self.correct.mean()) if len(self) else 0.
+
+    @property
+    def error(self) -> np.ndarray:
+        """Signed distance of the choices from the solutions."""
+        return self.choice - self.solution
+
+    def accuracy_by(self, groups:np.ndarray) -> tuple[np.ndarray]:
+        """Accuracy per group.
+
+        Arguments:
+        - groups: group of each answer (e.g. the solution values)
+
+        Returns the sorted groups, the accuracy and the number of answers
+        per group.
+        """
+        keys, inverse = np.unique(groups, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        num_correct = np.bincount(inverse, weights=self.correct, minlength=len(keys))
+        return keys, num_correct / np.maximum(counts, 1), counts
+
+    def accuracy_per_value(self, decimals:int=3) -> tuple[np.ndarray]:
+        """Accuracy per solution value (e.g. gain or pan position), see
+        `.accuracy_by()`."""
+        return self.accuracy_by(np.round(self.solution, decimals))
+
+    def accuracy_per_band(self, base:float=1000, bands_per_octave:int=1) -> tuple[np.ndarray]:
+        """Accuracy per frequency band (octave bands by default) of the
+        solutions, the groups are the center frequencies of the bands.
+        See `.accuracy_by()`."""
+        band = np.round(bands_per_octave * np.log2(self.solution / base))
+        keys, accuracy, counts = self.accuracy_by(band)
+        return base * 2 ** (keys / bands_per_octave), accuracy, counts
+
+    def accuracy_per_distance(self, log:bool=False, decimals:int=3) -> tuple[np.ndarray]:
+        """Number of answers per distance of the choice from the solution
+        (e.g. dB or octaves with `log=True`). The share of answers at
+        distance 0 is the accuracy.
+
+        Returns the distances, their share and count.
+        """
+        if log:
+            distance = np.abs(np.log2(self.choice / self.solution))
+        else:
+            distance = np.abs(self.error)
+        keys, counts = np.unique(np.round(distance, decimals), return_counts=True)
+        return keys, counts / max(len(self), 1), counts
+
+    def grade(self, evaluator, tolerance=None):
+        """Grades the recorded answers again (e.g. with a tolerance),
+        see `Evaluator.evaluate`."""
+        return evaluator.evaluate(self.solution, self.choice, tolerance)
+
+    def learning_curve(self, window:int=20) -> np.ndarray:
+        """Moving accuracy over the last `window` answers (fewer at the
+        beginning) for each recorded answer."""
+        correct = np.concatenate([[0], np.cumsum(self.correct)])
+        idx = np.arange(1, len(self) + 1)
+        start = np.maximum(idx - window, 0)
+        return (correct[idx] - correct[start]) / (idx - start)
+
+
+class ResultsStore:
+    """Persistent store of answers (SQLite database) with a background
+    writer. The store can be shared by exercises in several threads.
+    A batch which cannot be written (e.g. the database is locked for too
+    long or the disk is full) is retried and eventually dropped with a
+    warning (see `.num_dropped`), the writer keeps running."""
+
+    def __init__(self, path:str=_RESULTS_PATH, batch_size:int=_RESULTS_BATCH_SIZE,
+                 flush_interval:float=_RESULTS_FLUSH_INTERVAL, retries:int=_RESULTS_RETRIES):
+        """Opens (or creates) a results database.
+
+        Arguments:
+        - path: database file
+        - batch_size: max. number of answers written per transaction
+        - flush_interval: max. time (s) answers wait before being written
+        (and between attempts to write a batch)
+        - retries: attempts to write a batch before it is dropped
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        # number of answers which could not be written
+        self.num_dropped = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        con = self._connect()
+        try:
+            con.executescript(_SCHEMA)
+        finally:
+            con.close()
+        self._queue:queue.Queue[Answer] = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write, daemon=True, name="results-writer")
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        # readers do not block the writer (and vice versa)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def _write(self):
+        """Writes queued answers in batches (runs in the writer thread)."""
+        con = self._connect()
+        try:
+            while True:
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                answers = [answer for answer in batch if answer is not None]
+                try:
+                    if answers:
+                        self._write_batch(con, answers)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if len(answers) < len(batch):
+                    break
+        finally:
+            con.close()
+
+    def _write_batch(self, con:sqlite3.Connection, answers:list[Answer]):
+        """Writes a batch in one transaction (dropped after `retries`
+        failed attempts)."""
+        for attempt in range(1, self.retries + 1):
+            try:
+                with con:
+                    con.executemany(_INSERT, answers)
+                return
+            except sqlite3.Error as e:
+                error = e
+                if attempt < self.retries:
+                    time.sleep(self.flush_interval)
+        self.num_dropped += len(answers)
+        warnings.warn(f"Dropped {len(answers)} answers (results store '{self.path}'): {error}")
+
+    def _check_writer(self):
+        if not self._writer.is_alive():
+            raise RuntimeError("The writer of the results store stopped.")
+
+    def record(self, answer:Answer):
+        """Queues an answer for writing (returns immediately)."""
+        if self._closed:
+            raise RuntimeError("The results store is closed.")
+        self._check_writer()
+        self._queue.put(answer)
+
+    def record_answer(self, exercise:str, session:str, round:int, sample:str,
+                      num_choices:int, solution:float, choice:float, correct:bool,
+                      user:str=None):
+        """Queues an answer given by its fields (see `Answer`)."""
+        self.record(Answer(time.time(), user, session, exercise, int(round), sample,
+                           int(num_choices), float(solution), float(choice), bool(correct)))
+
+    def flush(self):
+        """Waits until all queued answers are written (or dropped). Raises
+        a RuntimeError if the writer stopped with answers left."""
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks:
+                self._check_writer()
+                done.wait(0.1)
+
+    def close(self):
+        """Writes the queued answers and stops the writer."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+
+    def query(self, exercise:str=None, user:str=None, session:str=None,
+              since:float=None, limit:int=None) -> Results:
+        """Loads recorded answers (in the order of recording, optionally
+        only the last `limit` ones). Queued answers are written first.
+
+        Arguments:
+        - exercise, user, session: restrict to answers with these values
+        - since: restrict to answers after this time (UNIX timestamp)
+        - limit: max. number of (most recent) answers
+        """
+        if not self._closed:
+            self.flush()
+        conditions, params = [], []
+        for column, value in [("exercise", exercise), ("user", user), ("session", session)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("time > ?")
+            params.append(since)
+        sql = "SELECT time, solution, choice, correct FROM answers"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        con = self._connect()
+        try:
+            rows = con.execute(sql, params).fetchall()
+        finally:
+            con.close()
+        data = np.array(rows, dtype=np.float64).reshape(-1, 4)[::-1]
+        return Results({
+            "time": data[:, 0],
+            "solution": data[:, 1],
+            "choice": data[:, 2],
+            "correct": data[:, 3].astype(bool),
+        })
+
+    def save_state(self, user:str, exercise:str, kind:str, state:dict, timestamp:float=None):
+        """Stores a state of a user, e.g. of a difficulty scheduler (see
+        `DifficultyScheduler.as_dict()`), unless a newer one is stored
+        already (states saved from several threads can arrive out of
+        order). States are written right away (not queued like answers).
+
+        Arguments:
+        - user, exercise: user and exercise the state belongs to
+        - kind: kind of the state (e.g. the type of scheduler)
+        - state: JSON serializable dictionary
+        - timestamp: time the state was taken (UNIX timestamp, default: now)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        con = self._connect()
+        try:
+            with con:
+                con.execute("INSERT INTO states VALUES (?, ?, ?, ?, ?) "
+                            "ON CONFLICT (user, exercise, kind) DO UPDATE "
+                            "SET time = excluded.time, state = excluded.state "
+                            "WHERE excluded.time >= states.time",
+                            (user, exercise, kind, timestamp, json.dumps(state)))
+        finally:
+            con.close()
+
+    def load_state(self, user:str, exercise:str, kind:str) -> dict:
+        """Returns a stored state (see `.save_state()`) or None."""
+        con = self._connect()
+        try:
+            row = con.execute("SELECT state FROM states WHERE user = ? AND exercise = ? AND kind = ?",
+                              (user, exercise, kind)).fetchone()
+        finally:
+            con.close()
+        return None if row is None else json.loads(row[0])
+
+    def __len__(self) -> int:
+        self.flush()
+        con = self._connect()
+        try:
+            return con.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        finally:
+            con.close()
@@ -5,20 +5,26 @@ import random
 import numpy as np
 # internal/relative importsfrom .templates import OptionButtonExercise
 from ._templates import OptionButtonExercise
+from .engine import Exercise
+from .evaluators import PanEvaluator, WidthEvaluator
 from ..effects.stereo import StereoControl
 
 
-class GuessWhere(OptionButtonExercise):
+class PanningExercise(Exercise):
 
     name = "Guess Where!"
+    evaluator_class = PanEvaluator
+    # finer pan resolution (more positions)
+    difficulty_levels = [{"num_choices": 2 * level + 1} for level in range(1, 5)]
 
-    def __init__(self, level=1):
+    def __init__(self, level=1, **kwargs):
         if not (type(level) == int and level > 0):
             raise ValueError("Positive integer expected for 'level'.")
         num_choices = 2 * level + 1
-        super().__init__(num_choices, mode='center')
+        super().__init__(num_choices, mode='center', **kwargs)
 
-    def get_options(self):
+    def get_options(self, settings:dict=None):
+        settings = self.get_settings() if settings is None else settings
         def get_label(val):
             if val == 0:
                 return "C"
@@ -26,30 +32,46 @@ class GuessWhere(OptionButtonExercise):
                 return f"{100*val:0.0f}% R"
             elif val < 0:
                 return f"{-100*val:0.0f}% L"
-        M = self.num_choices
+        M = settings["num_choices"]
         # if M % 2 == 0:
         #     M += 1
         vals = np.linspace(-1, 1, M)
         options = [{'label':get_label(val), "value":val} for val in vals]
         return options
 
-    def get_fx_chain(self):
-        solution = self.solution['value']
-        fx_chain = StereoControl(pos=solution).make_fx_chain()
+    def get_fx_chain(self, solution, settings:dict=None):
+        pos = solution['value']
+        fx_chain = StereoControl(pos=pos).make_fx_chain()
         return fx_chain
     
 
-class GuessTheWidth(OptionButtonExercise):
+class WidthExercise(Exercise):
 
     name = "Guess How Wide!"
+    evaluator_class = WidthEvaluator
+    # finer width resolution
+    difficulty_levels = [{"num_choices": num_choices} for num_choices in range(2, 7)]
+    # width changes are only audible on stereo material
+    sample_filters = {"num_channels": 2}
 
-    def get_options(self):
-        N = self.num_choices
+    def get_options(self, settings:dict=None):
+        settings = self.get_settings() if settings is None else settings
+        N = settings["num_choices"]
         vals = np.linspace(0, 1, N)
         options = [{'label':f"{100 * val:0.0f}%", "value":val} for val in vals]
         return options
 
-    def get_fx_chain(self):
-        solution = self.solution['value']
-        fx_chain = StereoControl(width=solution).make_fx_chain()
+    def get_fx_chain(self, solution, settings:dict=None):
+        width = solution['value']
+        fx_chain = StereoControl(width=width).make_fx_chain()
         return fx_chain
+
+
+class GuessWhere(OptionButtonExercise):
+
+    exercise_class = PanningExercise
+
+
+class GuessTheWidth(OptionButtonExercise):
+
+    exercise_class = WidthExercise
@@ -3,116 +3,85 @@
 # external imports
 import numpy as np
 import random
-import ipywidgets as widgets
-from IPython.display import display
-from time import sleep
 # internal/relative imports
-from ..playback.samples import SampleSelector
-from ..playback.player import SamplePlayer
+from ..config import _LOUDNESS_TARGET
+from ..utilities.randomness import get_rng
 from ..effects.volume import Amplifier
 from ..effects.basic import AudioFxChain
+from ._templates import OptionButtonExercise
+from .engine import Exercise
+from .evaluators import GainEvaluator
 
 #TODO Review and clean up the code.
 
 
 class RandomGainSelector():
 
-    def __init__(self, db_range=(-24,6), step=1):
+    def __init__(self, db_range=(-24,6), step=1, rng:random.Random | int=None):
         self.db_range = db_range
         self.step = step
+        self.rng = get_rng(rng)
     
     @property
     def db_vals(self):
+        return self.get_db_vals()
+
+    def get_db_vals(self, step=None):
+        """Gain values in the range (with the given or the default step)."""
         db_min, db_max = self.db_range
-        return np.arange(db_min, db_max+1, self.step)
+        return np.arange(db_min, db_max+1, self.step if step is None else step)
     
-    def get_options(self, options:int=3):
-        db_vals = [val for val in self.db_vals]
-        options = random.sample(db_vals, options)
-        correct_option = random.choice(options)
+    def get_options(self, options:int=3, step=None):
+        db_vals = [val for val in self.get_db_vals(step)]
+        options = self.rng.sample(db_vals, options)
+        correct_option = self.rng.choice(options)
         return sorted(options), correct_option
 
 
-#TODO Refactor using the OptionButtonExercise template class
-class GuessTheGain:
-
-    def __init__(self,db_range=(-12,6), step=1, num_choices=3):
-        self.name = "Guess The Gain!"
-        # build effect with random parameter selection
-        self.gain_selector = RandomGainSelector(db_range, step)
-        self.num_choices = num_choices
-        self.options, self.solution = self.get_options(num_choices)
-        fxs = self.build_fx_chain()
-        # get random sample
-        self.sample_selector = SampleSelector()
-        sample = self.get_sample()
-        # initialize player with sample and fx
-        self.player:SamplePlayer = SamplePlayer(sample, fxs)
-        # add UI elements
-        self.choice_buttons:list[widgets.Button] = \
-            [widgets.Button(description=f"{option} dB") for option in self.options]
-        for button in self.choice_buttons:
-            button.on_click(self.evaluate_choice)
-        self.restart_button:widgets.Button = \
-            widgets.Button(description="Start over!", button_style="warning")
-        self.restart_button.on_click(self._restart_button_click)
-    
-    def evaluate_choice(self, button:widgets.Button):
-        idx = self.choice_buttons.index(button)
-        if self.options[idx] == self.solution:
-            button.button_style = "success"
-        else:
-            button.button_style = "danger"
-        
-    def reset_choice_buttons(self):
-        buttons = self.choice_buttons
-        options = self.options
-        for idx, button in enumerate(buttons):
-            # reset color
-            button.button_style = ""
-            # reset label
-            button.description = f"{options[idx]} dB"
-    
-    def _restart_button_click(self, button):
-        # stop plaback
-        self.player.stop()
-        sleep(0.25)
-        # get new sample
-        self.player.sample = self.get_sample()
-        # get new gain options
-        self.options, self.solution = self.get_options(self.num_choices)
-        self.player.fxs = self.build_fx_chain()
-        # reset choice buttons
-        self.reset_choice_buttons()
-        # restart playback
-        self.player.start()
-        # reset effects and effects toggle
-        self.player.fx_toggle_box.value = False
-        self.player.fxs_on = False
+class GainExercise(Exercise):
 
+    name = "Guess The Gain!"
+    # level-matched samples make gain changes comparable across rounds
+    loudness_target = _LOUDNESS_TARGET
+    evaluator_class = GainEvaluator
+    # smaller gain steps between more options are harder to tell apart
+    difficulty_levels = [
+        {"step": 6, "num_choices": 3},
+        {"step": 4, "num_choices": 3},
+        {"step": 3, "num_choices": 4},
+        {"step": 2, "num_choices": 4},
+        {"step": 1, "num_choices": 5},
+    ]
+
+    def __init__(self,db_range=(-12,6), step=1, num_choices=3, rng=None, **kwargs):
+        rng = get_rng(rng)
+        self.gain_selector = RandomGainSelector(db_range, step, rng)
+        super().__init__(num_choices, rng=rng, **kwargs)
 
     @property
-    def title_widget(self):
-        return widgets.HTML(value=f"<h1>{self.name}</h1>")
-    
-    def get_sample(self):
-        return self.sample_selector.get_random_sample()
-    
-    def get_options(self,options:int):
-        return self.gain_selector.get_options(options=options)
+    def step(self):
+        """Gain step between the options (dB)."""
+        return self.gain_selector.step
+
+    @step.setter
+    def step(self, step):
+        self.gain_selector.step = step
+
+    def get_options(self, settings:dict=None):
+        settings = self.get_settings() if settings is None else settings
+        step = settings["step"]
+        num_choices = min(settings["num_choices"], len(self.gain_selector.get_db_vals(step)))
+        db_vals, _ = self.gain_selector.get_options(options=num_choices, step=step)
+        options = [{'label':f"{val} dB", "value":val} for val in db_vals]
+        return options
     
-    def build_fx_chain(self):
-        gain = self.solution
+    def get_fx_chain(self, solution, settings:dict=None):
+        gain = solution['value']
         amp = Amplifier(gain)
         fx_chain = AudioFxChain([amp])
         return fx_chain
 
-    def run(self):
-        # display title
-        display(self.title_widget)
-        # start player
-        self.player.run()
-        # display the options
-        button_box = widgets.HBox(self.choice_buttons)
-        display(button_box)
-        display(self.restart_button)
+
+class GuessTheGain(OptionButtonExercise):
+
+    exercise_class = GainExercise
@@ -0,0 +1,32 @@
+"""Playback functionality and sample management.
+
+The classes below are imported lazily on first access (PEP 562), so
+importing a submodule (e.g. `playback.decoding`) stays cheap."""
+
+import importlib
+
+# maps public names to the submodules defining them
+_LAZY_ATTRIBUTES = {
+    "AudioSignal": ".samples",
+    "Sample": ".samples",
+    "SampleSelector": ".samples",
+    "SampleStore": ".samples",
+    "SharedSampleStore": ".samples",
+    "SampleCache": ".cache",
+    "SamplePlayer": ".player",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name:str):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
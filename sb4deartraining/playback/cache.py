@@ -0,0 +1,117 @@
+"""Caching of decoded audio samples."""
+
+# external imports
+import os
+import hashlib
+import threading
+import contextlib
+import numpy as np
+from typing import Callable
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows (concurrent misses decode twice)
+    fcntl = None
+# internal/relative imports
+from ..config import _SAMPLE_CACHE_PATH
+
+
+class SampleCache:
+    """Persistent on-disk cache for decoded and resampled audio data. 
+    Arrays are stored as `.npy` files keyed by the audio file's path, 
+    modification time and size as well as the target sample rate and
+    load mode, so stale entries are never returned. 
+    
+    Cached arrays are loaded as read-only memory maps. Repeated loads 
+    are thus almost free and processes sharing a cache directory also
+    share the pages in memory. A file is decoded only once, also if 
+    several processes request it at the same time."""
+
+    def __init__(self, path:str=_SAMPLE_CACHE_PATH):
+        """Creates a cache in the given directory (created on demand)."""
+        self.path = path
+
+    def get_key(self, file:str, mode:str, sr:int) -> str:
+        """Hash identifying the decoded version of an audio file."""
+        stat = os.stat(file)
+        ident = "|".join([
+            os.path.abspath(file),
+            str(stat.st_mtime_ns),
+            str(stat.st_size),
+            str(sr),
+            mode,
+        ])
+        return hashlib.sha1(ident.encode()).hexdigest()
+
+    def get_cache_file(self, file:str, mode:str, sr:int) -> str:
+        """Path of the cache file for an audio file."""
+        key = self.get_key(file, mode, sr)
+        return os.path.join(self.path, key + ".npy")
+
+    def load(self, file:str, mode:str, sr:int, decode:Callable[[], np.ndarray]) -> np.ndarray:
+        """Returns the cached audio data for an audio file. On a cache 
+        miss, the data is obtained by calling `decode()` and written 
+        to the cache first.
+        
+        Arguments:
+        - file: audio file path
+        - mode: load mode (see `AudioSignal.load`)
+        - sr: target sample rate
+        - decode: function without arguments returning the audio data
+        """
+        cache_file = self.get_cache_file(file, mode, sr)
+        try:
+            return self._load_cache_file(cache_file)
+        except (OSError, ValueError, EOFError):
+            # missing or damaged cache file
+            pass
+        with self._lock_file(cache_file):
+            # another process might have decoded the file in the meantime
+            try:
+                return self._load_cache_file(cache_file)
+            except (OSError, ValueError, EOFError):
+                pass
+            audiodata = decode()
+            self._write_cache_file(cache_file, audiodata)
+        return self._load_cache_file(cache_file)
+
+    @contextlib.contextmanager
+    def _lock_file(self, cache_file:str):
+        """Exclusive lock for writing a cache file (across processes)."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(f"{cache_file}.lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def contains(self, file:str, mode:str, sr:int) -> bool:
+        """Checks whether decoded data for an audio file is cached."""
+        return os.path.isfile(self.get_cache_file(file, mode, sr))
+
+    def clear(self):
+        """Removes all cache files."""
+        if not os.path.isdir(self.path):
+            return
+        for f in os.listdir(self.path):
+            if f.endswith((".npy", ".lock")):
+                os.remove(os.path.join(self.path, f))
+
+    @staticmethod
+    def _load_cache_file(cache_file:str) -> np.ndarray:
+        # NOTE: `np.asarray` drops the `np.memmap` subclass without copying
+        # so slices of the data are plain (read-only) ndarrays
+        return np.asarray(np.load(cache_file, mmap_mode='r'))
+
+    def _write_cache_file(self, cache_file:str, audiodata:np.ndarray):
+        os.makedirs(self.path, exist_ok=True)
+        # write to a temporary file first and move it in place atomically
+        # so concurrent readers never see incomplete files
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, "wb") as f:
+            np.save(f, np.ascontiguousarray(audiodata, dtype=np.float32))
+        os.replace(tmp_file, cache_file)
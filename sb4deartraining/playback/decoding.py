@@ -0,0 +1,197 @@
+"""Decoding of audio files.
+
+Uncompressed WAV files (integer PCM with 8/16/24/32 bits or floating
+point data) are read directly with NumPy, which is much faster than
+going through `librosa` and avoids its heavy import chain. Resampling
+only happens if the sample rate of the file differs from the target
+sample rate. All other file formats fall back to `librosa` (imported
+on demand)."""
+
+# external imports
+import os
+import numpy as np
+from math import gcd
+from typing import NamedTuple
+# internal imports
+from ..config import _SR
+
+# format tags used in the 'fmt ' chunk of WAV files
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo(NamedTuple):
+    """Format information and location of the sample data of a WAV file."""
+    format_tag:int      # WAVE_FORMAT_PCM or WAVE_FORMAT_IEEE_FLOAT
+    num_channels:int    # number of channels
+    sr:int              # sample rate
+    sampwidth:int       # bytes per sample (and channel)
+    offset:int          # position of the sample data in the file (bytes)
+    num_frames:int      # number of samples per channel
+
+    @property
+    def dtype(self) -> np.dtype:
+        """NumPy data type of the raw samples (None for 24 bit data)."""
+        if self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            return np.dtype({4: '<f4', 8: '<f8'}[self.sampwidth])
+        return {1: np.dtype('u1'), 2: np.dtype('<i2'), 4: np.dtype('<i4')}.get(self.sampwidth)
+
+
+def read_wav_info(file:str) -> WavInfo:
+    """Parses the header of a WAV file. Raises a ValueError if the file
+    is not a WAV file or uses an unsupported sample format."""
+    with open(file, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError(f"Not a WAV file: {file}")
+        fmt = None
+        # walk through the chunks until the data chunk is found
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk found: {file}")
+            chunk_id = header[:4]
+            chunk_size = int.from_bytes(header[4:], "little")
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+            elif chunk_id == b"data":
+                offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size, 1)
+            # chunks are padded to an even number of bytes
+            if chunk_size % 2:
+                f.seek(1, 1)
+    if fmt is None or len(fmt) < 16:
+        raise ValueError(f"Missing or invalid format chunk: {file}")
+    format_tag = int.from_bytes(fmt[0:2], "little")
+    num_channels = int.from_bytes(fmt[2:4], "little")
+    sr = int.from_bytes(fmt[4:8], "little")
+    sampwidth = int.from_bytes(fmt[14:16], "little") // 8
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # the actual format tag is the beginning of the sub-format GUID
+        format_tag = int.from_bytes(fmt[24:26], "little")
+    supported = (
+        (format_tag == WAVE_FORMAT_PCM and sampwidth in {1, 2, 3, 4}) or
+        (format_tag == WAVE_FORMAT_IEEE_FLOAT and sampwidth in {4, 8}))
+    if not supported or num_channels < 1:
+        raise ValueError(f"Unsupported WAV format (tag {format_tag}, {8 * sampwidth} bit): {file}")
+    # NOTE: the data chunk size is not always reliable (e.g. for 
+    # truncated files or files written while recording)
+    num_bytes = min(chunk_size, os.path.getsize(file) - offset)
+    num_frames = num_bytes // (sampwidth * num_channels)
+    return WavInfo(format_tag, num_channels, sr, sampwidth, offset, num_frames)
+
+
+def pcm_to_float(samples:np.ndarray, info:WavInfo, mono:bool=False) -> np.ndarray:
+    """Converts raw interleaved samples of shape (num_frames, num_channels)
+    to float32 audio data in [-1, 1). The result is a 1d array if `mono`
+    is set (average of the channels) and a (num_channels, num_frames)
+    array otherwise. Conversion, scaling and de-interleaving are done
+    in a single pass without intermediate arrays."""
+    # scaling factor and offset of the integer formats
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        scale, shift = 1., 0.
+    elif info.sampwidth == 1:
+        scale, shift = 1 / 2 ** 7, -1.  # 8 bit data is unsigned
+    else:
+        scale, shift = 1 / 2 ** (8 * samples.dtype.itemsize - 1), 0.
+    if mono:
+        audio = np.mean(samples, axis=1, dtype=np.float32)
+    else:
+        audio = np.empty((info.num_channels, len(samples)), dtype=np.float32)
+        np.copyto(audio, samples.T, casting='unsafe')
+    audio *= np.float32(scale)
+    if shift:
+        audio += np.float32(shift)
+    return audio
+
+
+def unpack_int24(raw:np.ndarray) -> np.ndarray:
+    """Converts 24 bit samples given as uint8 array of shape (..., 3) 
+    to int32 samples (scaled by 2 ** 8)."""
+    padded = np.zeros(raw.shape[:-1] + (4,), dtype=np.uint8)
+    padded[..., 1:] = raw
+    return padded.view('<i4')[..., 0]
+
+
+def read_wav(file:str, mono:bool=False) -> tuple[np.ndarray, int]:
+    """Reads a WAV file at its native sample rate. Returns float32 audio
+    data (1d if `mono` is set, else (num_channels, num_frames)) and the
+    sample rate."""
+    info = read_wav_info(file)
+    num_bytes = info.num_frames * info.num_channels * info.sampwidth
+    with open(file, "rb") as f:
+        f.seek(info.offset)
+        raw = f.read(num_bytes)
+    if info.sampwidth == 3:
+        raw = np.frombuffer(raw, dtype=np.uint8).reshape(-1, info.num_channels, 3)
+        samples = unpack_int24(raw)
+    else:
+        # zero-copy view of the file content
+        samples = np.frombuffer(raw, dtype=info.dtype)
+    samples = samples.reshape(info.num_frames, info.num_channels)
+    return pcm_to_float(samples, info, mono), info.sr
+
+
+def map_wav(file:str) -> tuple[np.memmap, WavInfo]:
+    """Memory-maps the sample data of a WAV file without reading it.
+    Returns the raw frames of shape (num_frames, num_channels) (with an
+    additional axis of length 3 for 24 bit data, see `unpack_int24`) 
+    and the format information."""
+    info = read_wav_info(file)
+    if info.sampwidth == 3:
+        dtype, shape = np.uint8, (info.num_frames, info.num_channels, 3)
+    else:
+        dtype, shape = info.dtype, (info.num_frames, info.num_channels)
+    frames = np.memmap(file, dtype=dtype, mode='r', offset=info.offset, shape=shape)
+    return frames, info
+
+
+def resample(audio:np.ndarray, sr_in:int, sr_out:int) -> np.ndarray:
+    """Resamples audio data along the last axis. Uses `soxr` (the default
+    resampler of `librosa`) if available and SciPy otherwise. The output
+    has ceil(num_samples * sr_out / sr_in) samples like in `librosa`."""
+    if sr_in == sr_out:
+        return audio
+    num_samples = int(np.ceil(audio.shape[-1] * sr_out / sr_in))
+    try:
+        import soxr
+        channels = audio.reshape(-1, audio.shape[-1])
+        resampled = np.stack([soxr.resample(ch, sr_in, sr_out, quality='soxr_hq') for ch in channels])
+        resampled = resampled.reshape(audio.shape[:-1] + resampled.shape[-1:])
+    except ImportError:
+        from scipy.signal import resample_poly
+        divisor = gcd(sr_in, sr_out)
+        resampled = resample_poly(audio, sr_out // divisor, sr_in // divisor, axis=-1)
+    # fix length
+    if resampled.shape[-1] >= num_samples:
+        resampled = resampled[..., :num_samples]
+    else:
+        padding = [(0, 0)] * (resampled.ndim - 1) + [(0, num_samples - resampled.shape[-1])]
+        resampled = np.pad(resampled, padding)
+    return np.ascontiguousarray(resampled, dtype=np.float32)
+
+
+def decode(file:str, sr:int=_SR, mono:bool=False) -> np.ndarray:
+    """Decodes an audio file to float32 audio data at the sample rate `sr`.
+    Mono data is returned as 1d array, multi-channel data as array of
+    shape (num_channels, num_samples). Single channel files are always
+    returned as 1d arrays (as in `librosa`).
+
+    Arguments:
+    - file: audio file path
+    - sr: target sample rate
+    - mono: mix down to mono
+    """
+    try:
+        audio, file_sr = read_wav(file, mono=mono)
+    except ValueError:
+        # exotic formats are decoded by librosa
+        import librosa
+        audio, _ = librosa.load(file, sr=sr, mono=mono)
+        return audio
+    if audio.ndim == 2 and audio.shape[0] == 1:
+        audio = audio[0]
+    return resample(audio, file_sr, sr)
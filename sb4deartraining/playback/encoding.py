@@ -0,0 +1,203 @@
+"""Encoding of audio data for delivery (e.g. streaming to a browser).
+
+Audio is converted to 16 bit PCM (WAV) block by block as it is sent,
+or to FLAC (requires the optional `soundfile` package). Encoded renders
+can be kept in an LRU cache keyed by the sample and the settings of
+the effect chain (see `RenderCache`), so repeated requests for the same
+round audio are served without rendering or encoding."""
+
+# external imports
+import os
+import io
+import struct
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Iterator
+# internal/relative imports
+from ..config import _RENDER_CACHE_SIZE, _STREAM_CHUNK_SIZE
+from ..effects.basic import AudioFxChain
+from .decoding import WAVE_FORMAT_PCM
+
+# supported formats and their MIME types
+FORMATS = {"wav": "audio/wav", "flac": "audio/flac"}
+
+
+def wav_header(num_frames:int, num_channels:int, sr:int, sampwidth:int=2) -> bytes:
+    """Returns the header of a PCM WAV file (RIFF, format and data chunk
+    header), followed by `num_frames` frames of sample data."""
+    block_align = num_channels * sampwidth
+    data_size = num_frames * block_align
+    return b"".join([
+        b"RIFF", struct.pack("<I", 36 + data_size), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, WAVE_FORMAT_PCM, num_channels,
+                             sr, sr * block_align, block_align, 8 * sampwidth),
+        b"data", struct.pack("<I", data_size),
+    ])
+
+
+class PCM16Encoder:
+    """Converts float audio blocks to interleaved 16 bit PCM samples.
+    Scaling, dithering (triangular, ±1 LSB), rounding and clipping are
+    done in place in a scratch buffer that is reused across blocks, the
+    final cast writes directly into the returned byte buffer."""
+
+    def __init__(self, dither:bool=True, seed:int=None):
+        """Arguments:
+        - dither: add triangular dither before rounding
+        - seed: seed of the dither noise (for reproducible output)
+        """
+        self.dither = dither
+        self.rng = np.random.default_rng(seed)
+        self._scratch:np.ndarray = None
+        self._noise:np.ndarray = None
+
+    def _get_buffers(self, shape:tuple) -> tuple[np.ndarray]:
+        size = int(np.prod(shape))
+        if self._scratch is None or self._scratch.size < size:
+            self._scratch = np.empty(size, dtype=np.float32)
+            self._noise = np.empty(size, dtype=np.float32) if self.dither else None
+        scratch = self._scratch[:size].reshape(shape)
+        noise = self._noise[:size].reshape(shape) if self.dither else None
+        return scratch, noise
+
+    def encode(self, audiodata:np.ndarray) -> bytearray:
+        """Encodes audio data (1d or (num_channels, num_samples)) and
+        returns the interleaved little-endian samples."""
+        frames = audiodata if audiodata.ndim == 1 else audiodata.T
+        scratch, noise = self._get_buffers(frames.shape)
+        # NOTE: interleaving happens while scaling (strided read)
+        np.multiply(frames, np.float32(2 ** 15), out=scratch, casting='unsafe')
+        if self.dither:
+            scratch += self.rng.random(dtype=np.float32, out=noise)
+            scratch -= self.rng.random(dtype=np.float32, out=noise)
+        np.rint(scratch, out=scratch)
+        np.clip(scratch, -2 ** 15, 2 ** 15 - 1, out=scratch)
+        buffer = bytearray(2 * scratch.size)
+        pcm = np.frombuffer(buffer, dtype='<i2').reshape(frames.shape)
+        np.copyto(pcm, scratch, casting='unsafe')
+        return buffer
+
+
+def encode_pcm16(audiodata:np.ndarray, dither:bool=True, seed:int=None) -> bytearray:
+    """Converts float audio data to interleaved 16 bit PCM samples (see
+    `PCM16Encoder`)."""
+    return PCM16Encoder(dither, seed).encode(audiodata)
+
+
+def iter_encoded(sample, fmt:str="wav", chunk_size:int=_STREAM_CHUNK_SIZE,
+                 dither:bool=True, seed:int=None) -> Iterator[bytes]:
+    """Encodes one pass of a (looped) sample, i.e. the audio up to its
+    loop end, and yields the encoded file in chunks.
+
+    WAV data is encoded block by block while it is consumed. FLAC data
+    is encoded as a whole (the header is only complete at the end) and
+    requires the `soundfile` package.
+
+    Arguments:
+    - sample: a `Sample` (or `RenderedSample`)
+    - fmt: 'wav' or 'flac'
+    - chunk_size: samples per encoded block
+    - dither, seed: see `PCM16Encoder`
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', available: {', '.join(FORMATS)}.")
+    num_frames = sample.loop_end
+    sr = sample.audio.sr
+    encoder = PCM16Encoder(dither, seed)
+    if fmt == "wav":
+        yield wav_header(num_frames, sample.num_channels, sr)
+        for start_idx in range(0, num_frames, chunk_size):
+            size = min(chunk_size, num_frames - start_idx)
+            yield encoder.encode(sample.get_chunk(start_idx, size))
+        return
+    import soundfile as sf
+    pcm = np.frombuffer(encoder.encode(sample.get_chunk(0, num_frames)), dtype='<i2')
+    pcm = pcm.reshape(num_frames, -1)
+    f = io.BytesIO()
+    sf.write(f, pcm, sr, format="FLAC", subtype="PCM_16")
+    data = f.getbuffer()
+    for start_idx in range(0, len(data), 2 * chunk_size):
+        yield bytes(data[start_idx:start_idx + 2 * chunk_size])
+
+
+class RenderCache:
+    """LRU cache for encoded audio (e.g. renders of exercise rounds) with
+    a memory budget. Entries are keyed by the sample (file, mode, gain,
+    loop points), the settings of the effect chain and the format. The
+    cache is thread-safe."""
+
+    def __init__(self, max_bytes:int=_RENDER_CACHE_SIZE):
+        """Creates a cache evicting the least recently used entries once
+        `max_bytes` are exceeded."""
+        self.max_bytes = max_bytes
+        self._entries:OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def get_key(sample, fxs:AudioFxChain=None, fmt:str="wav") -> tuple:
+        """Cache key of a sample rendered through an effect chain (None
+        for the dry sample)."""
+        sample_key = (os.path.abspath(sample.path), sample.mode, float(sample.gain_db),
+                      sample.loop_start, sample.loop_end)
+        return (sample_key, fxs.key if fxs is not None else None, fmt)
+
+    def __contains__(self, key:tuple) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key:tuple) -> bytes:
+        """Returns the encoded data (None if not cached)."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return data
+
+    def put(self, key:tuple, data:bytes):
+        """Adds encoded data (evicting the least recently used entries)."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.resident_bytes -= len(old)
+            self._entries[key] = data
+            self.resident_bytes += len(data)
+            while self.resident_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.resident_bytes -= len(evicted)
+                self.evictions += 1
+
+    def stream(self, key:tuple, encode:Callable[[], Iterator[bytes]],
+               chunk_size:int=2 * _STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yields the cached data in chunks (of `chunk_size` bytes) or,
+        on a miss, the chunks produced by `encode()` as they come. The
+        data is cached once it was produced completely."""
+        data = self.get(key)
+        if data is not None:
+            view = memoryview(data)
+            for start_idx in range(0, len(view), chunk_size):
+                yield view[start_idx:start_idx + chunk_size]
+            return
+        chunks = []
+        for chunk in encode():
+            chunks.append(chunk)
+            yield chunk
+        self.put(key, b"".join(chunks))
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.resident_bytes = 0
@@ -1,9 +1,15 @@
-"""A collection of tone generators (sine, saw, square, noise, etc)"""
+"""A collection of tone generators (sine, saw, square, noise, etc)
+and test signals (sweeps, multitones, impulse trains). Signals are
+generated in the precision of the effects (`AudioEffect.dtype`)."""
 
 # external imports
 import numpy as np
 # internal imports
-from ..config import _SR, _BLOCKSIZE
+from ..config import _SR, _BLOCKSIZE, _JUST_BELOW_NYQUIST
+from ..effects.basic import AudioEffect
+from ..utilities.frequencies import get_third_freqs
+from ..utilities.randomness import get_np_rng
+from .samples import AudioSignal
 
 
 class SawOscillator:
@@ -20,17 +26,155 @@ class SawOscillator:
         self.phase = (self.phase + self.blocksize) % self.sr
         if 0 <= vol < 1:
             signal *= vol
-        return signal
+        return signal.astype(AudioEffect.dtype)
 
 class NoiseGenerator:
     """White Noise Generator"""
 
-    def __init__(self, sr=_SR, blocksize=_BLOCKSIZE):
+    def __init__(self, sr=_SR, blocksize=_BLOCKSIZE, rng:np.random.Generator | int=None):
+        """Creates a noise generator drawing from `rng` (a NumPy 
+        generator or a seed, None seeds from the operating system)."""
         self.sr = sr
         self.blocksize = blocksize
+        self.rng = get_np_rng(rng)
   
     def generate(self, freq=1000, vol=1):
-        signal = np.random.randn(self.blocksize)
+        signal = self.rng.standard_normal(self.blocksize)
         if 0 <= vol < 1:
             signal *= vol
-        return signal
+        return signal.astype(AudioEffect.dtype)
+
+
+### TEST SIGNALS ###
+
+def _get_time_axis(duration:float, sr:int) -> np.ndarray:
+    """Time stamps (in seconds) of all samples of a signal."""
+    num_samples = int(duration * sr)
+    return np.arange(num_samples) / sr
+
+def exponential_sweep(f_start:float=20, 
+                      f_end:float=_JUST_BELOW_NYQUIST, 
+                      duration:float=5, 
+                      sr:int=_SR, 
+                      vol:float=1) -> AudioSignal:
+    """Generates an exponential (logarithmic) sine sweep as used for
+    impulse response measurements (Farina's method).
+    
+    Arguments:
+    - f_start: Start frequency (Hz)
+    - f_end: End frequency (Hz)
+    - duration: Length of the sweep in seconds
+    - sr: Sample rate
+    - vol: Peak amplitude
+    """
+    if not 0 < f_start < f_end <= sr / 2:
+        raise ValueError("Frequencies must satisfy 0 < f_start < f_end <= sr/2.")
+    t = _get_time_axis(duration, sr)
+    # time constant of the exponential frequency increase
+    L = duration / np.log(f_end / f_start)
+    sweep = vol * np.sin(2 * np.pi * f_start * L * np.expm1(t / L))
+    return AudioSignal(sweep.astype(AudioEffect.dtype), sr)
+
+def inverse_sweep_filter(f_start:float=20, 
+                         f_end:float=_JUST_BELOW_NYQUIST, 
+                         duration:float=5, 
+                         sr:int=_SR, 
+                         vol:float=1) -> AudioSignal:
+    """Generates the inverse filter matching `exponential_sweep` with 
+    the same arguments. Convolving the recorded response of a system to
+    the sweep with this filter yields the system's impulse response. 
+    (The linear part is located at index `num_samples - 1`.)
+
+    The inverse filter is the time-reversed sweep with an amplitude 
+    envelope decaying by 6 dB per octave. It is normalized such that 
+    sweep and inverse filter convolve to a unit impulse in the pass band.
+    """
+    sweep = exponential_sweep(f_start, f_end, duration, sr, vol).data
+    t = _get_time_axis(duration, sr)
+    L = duration / np.log(f_end / f_start)
+    inverse = sweep[::-1] * np.exp(-t / L)
+    # normalize to unit gain at the geometric mean frequency
+    n_fft = 2 ** int(np.ceil(np.log2(2 * len(sweep))))
+    response = np.fft.rfft(sweep, n_fft) * np.fft.rfft(inverse, n_fft)
+    f_mid = np.sqrt(f_start * f_end)
+    idx = int(round(f_mid * n_fft / sr))
+    inverse /= np.abs(response[idx])
+    return AudioSignal(inverse.astype(AudioEffect.dtype), sr)
+
+def multitone(freqs:list[float]=None, 
+              duration:float=1, 
+              sr:int=_SR, 
+              vol:float=1, 
+              phases:str="schroeder",
+              rng:np.random.Generator | int=None) -> AudioSignal:
+    """Generates a sum of sine tones, by default at the third-octave 
+    frequencies used by the frequency exercises (40 Hz to 20 kHz). 
+    All partials are computed at once as a (num_freqs, num_samples) 
+    array, so memory grows with the number of frequencies.
+
+    Arguments:
+    - freqs: Frequencies of the partials (Hz)
+    - duration: Length in seconds
+    - sr: Sample rate
+    - vol: Peak amplitude of the sum
+    - phases: 'schroeder' (low crest factor), 'zero' or 'random'
+    - rng: NumPy generator (or seed) for random phases
+    """
+    if freqs is None:
+        freqs = get_third_freqs(1000, 40, 20000)
+    freqs = np.asarray(freqs, dtype=float)
+    num_freqs = len(freqs)
+    # initial phases of the partials
+    if phases == "schroeder":
+        k = np.arange(1, num_freqs + 1)
+        phis = -np.pi * k * (k - 1) / num_freqs
+    elif phases == "zero":
+        phis = np.zeros(num_freqs)
+    elif phases == "random":
+        phis = get_np_rng(rng).uniform(0, 2 * np.pi, num_freqs)
+    else:
+        raise ValueError("The following options are available " \
+        "for 'phases': 'schroeder', 'zero', 'random'")
+    t = _get_time_axis(duration, sr)
+    partials = np.sin(2 * np.pi * freqs[:, np.newaxis] * t + phis[:, np.newaxis])
+    signal = partials.sum(axis=0)
+    # normalize peak amplitude
+    peak = np.max(np.abs(signal))
+    if peak > 0:
+        signal *= vol / peak
+    return AudioSignal(signal.astype(AudioEffect.dtype), sr)
+
+def impulse_train(period:float=0.5, 
+                  duration:float=1, 
+                  sr:int=_SR, 
+                  vol:float=1) -> AudioSignal:
+    """Generates a train of unit impulses (single-sample clicks).
+
+    Arguments:
+    - period: Time between impulses in seconds
+    - duration: Length in seconds
+    - sr: Sample rate
+    - vol: Impulse amplitude
+    """
+    period_samples = max(int(period * sr), 1)
+    signal = np.zeros(int(duration * sr), dtype=AudioEffect.dtype)
+    signal[::period_samples] = vol
+    return AudioSignal(signal, sr)
+
+def step_train(period:float=0.5, 
+               duration:float=1, 
+               sr:int=_SR, 
+               vol:float=1) -> AudioSignal:
+    """Generates a train of steps: the signal starts at zero and 
+    alternates between 0 and `vol` after every period.
+
+    Arguments:
+    - period: Time between steps in seconds
+    - duration: Length in seconds
+    - sr: Sample rate
+    - vol: Step height
+    """
+    period_samples = max(int(period * sr), 1)
+    idx = np.arange(int(duration * sr))
+    signal = vol * ((idx // period_samples) % 2).astype(AudioEffect.dtype)
+    return AudioSignal(signal, sr)
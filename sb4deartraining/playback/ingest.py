@@ -0,0 +1,107 @@
+"""Parallel ingestion of audio samples into the sample library.
+
+Decoding, resampling and analysing a file (see `library.analyse_file`)
+is CPU bound and independent of all other files, so new sample packs
+are processed on a pool of worker processes. Each worker writes the
+decoded audio to the shared sample cache; the metadata is sent back to
+the parent process, which owns the index file.
+
+Usage from the command line:
+
+    python -m sb4deartraining.playback.ingest [path] [--workers N] [--force]
+"""
+
+# external imports
+import os
+import time
+from typing import Iterator, NamedTuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# internal/relative imports
+from ..config import _AUDIO_SAMPLE_PATH, _SAMPLE_CACHE_PATH
+from .cache import SampleCache
+from .library import SampleLibrary, analyse_file
+
+
+class IngestResult(NamedTuple):
+    """Outcome of ingesting a single audio file."""
+    name:str            # file name within the sample directory
+    entry:dict          # metadata (see `analyse_file`), None on failure
+    seconds:float       # processing time in the worker
+    error:str           # error message, None on success
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def ingest_file(file:str, cache_path:str=None) -> IngestResult:
+    """Decodes and analyses a single audio file (runs in a worker process).
+    Errors are reported in the result instead of being raised."""
+    name = os.path.basename(file)
+    start = time.perf_counter()
+    try:
+        cache = SampleCache(cache_path) if cache_path else None
+        entry = analyse_file(file, cache)
+    except Exception as e:
+        return IngestResult(name, None, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+    return IngestResult(name, entry, time.perf_counter() - start, None)
+
+
+def ingest(library:SampleLibrary, max_workers:int=None, force:bool=False) -> Iterator[IngestResult]:
+    """Analyses all new or modified files of a sample library in parallel
+    and yields the results as they complete (in no particular order).
+    The index is updated when the iteration ends (also if it is stopped
+    early, pending files are then skipped).
+
+    Arguments:
+    - library: library to update (create it with `refresh=False` to
+    avoid analysing the files serially first)
+    - max_workers: number of worker processes (default: number of CPUs)
+    - force: re-analyse all files
+    """
+    names, stale = library.scan()
+    if force:
+        stale = names
+    entries = {name: library.get(name) for name in names if name not in stale}
+    cache_path = library.cache.path if library.cache else None
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(ingest_file, library.get_path(name), cache_path)
+                   for name in stale]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.ok:
+                entries[result.name] = result.entry
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        library.update(entries, replace=True)
+
+
+def main(argv:list[str]=None):
+    """Command line interface, prints a line per file and a summary."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Add audio samples to the sample library.")
+    parser.add_argument("path", nargs="?", default=_AUDIO_SAMPLE_PATH, help="sample directory")
+    parser.add_argument("--cache", default=_SAMPLE_CACHE_PATH, help="cache directory")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--force", action="store_true", help="re-analyse all files")
+    args = parser.parse_args(argv)
+    library = SampleLibrary(args.path, args.cache, refresh=False)
+    start = time.perf_counter()
+    num_files, failures = 0, []
+    for result in ingest(library, args.workers, args.force):
+        num_files += 1
+        if result.ok:
+            print(f"{result.seconds:7.2f} s  {result.name}")
+        else:
+            failures.append(result)
+            print(f"   FAILED  {result.name}: {result.error}")
+    elapsed = time.perf_counter() - start
+    print(f"Ingested {num_files - len(failures)} of {num_files} files in {elapsed:.2f} s "
+          f"({len(library)} samples in the library).")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,272 @@
+"""Persistent index of audio samples and their metadata."""
+
+# external imports
+import os
+import re
+import json
+import random
+import hashlib
+import warnings
+import threading
+import numpy as np
+# internal/relative imports
+from ..config import _AUDIO_SAMPLE_PATH, _SAMPLE_CACHE_PATH, _SR
+from ..config import _JUST_BELOW_NYQUIST, _MIN_BAND_ENERGY_DB
+from ..utilities.levels import convert_ratio_to_db
+from ..utilities.loudness import integrated_loudness
+from ..utilities.frequencies import get_third_freqs
+from ..utilities.spectrum import get_band_energies
+from .cache import SampleCache
+from .decoding import decode, read_wav_info
+
+# file types recognized as audio files
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".aif", ".aiff"}
+# version of the index file format (entries are recomputed on change)
+INDEX_VERSION = 3
+# center frequencies of the bands used for the spectral energy index
+BAND_FREQS = get_third_freqs(1000, 16, _JUST_BELOW_NYQUIST)
+
+
+def is_audio_file(file:str) -> bool:
+    """Checks whether a file name has the extension of an audio file."""
+    return os.path.splitext(file)[1].lower() in AUDIO_EXTENSIONS
+
+def get_tags(name:str) -> list[str]:
+    """Derives tags from a file name (e.g. 'Drum_Groove_01.wav' gives
+    'drum' and 'groove')."""
+    stem = os.path.splitext(name)[0]
+    words = re.split(r"[\s_\-.]+", stem.lower())
+    return [word for word in words if word and not word.isdigit()]
+
+def get_native_sr(file:str) -> int:
+    """Returns the sample rate of an audio file."""
+    try:
+        return read_wav_info(file).sr
+    except ValueError:
+        import librosa
+        return librosa.get_samplerate(file)
+
+def analyse_file(file:str, cache:SampleCache=None) -> dict:
+    """Computes the metadata of an audio file: duration, number of
+    channels, native sample rate, peak and RMS level (dBFS), integrated
+    loudness (LUFS, see `utilities.loudness`), energy per third-octave
+    band relative to the total energy (dB, see `BAND_FREQS`) and tags.
+    The file is decoded as in `AudioSignal.load` (using the cache if
+    given, which also speeds up loading the sample later on)."""
+    if cache is None:
+        audio = decode(file, sr=_SR)
+    else:
+        audio = cache.load(file, 'native', _SR, lambda: decode(file, sr=_SR))
+    num_channels = 1 if audio.ndim == 1 else audio.shape[0]
+    num_samples = audio.shape[-1]
+    peak = float(np.max(np.abs(audio))) if num_samples else 0.
+    rms = float(np.sqrt(np.mean(np.square(audio, dtype=np.float64)))) if num_samples else 0.
+    stat = os.stat(file)
+    tags = get_tags(os.path.basename(file))
+    tags.append("mono" if num_channels == 1 else "stereo")
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "duration": num_samples / _SR,
+        "num_samples": num_samples,
+        "num_channels": num_channels,
+        "sr": get_native_sr(file),
+        "peak_db": float(convert_ratio_to_db(peak)),
+        "rms_db": float(convert_ratio_to_db(rms)),
+        "loudness_lufs": integrated_loudness(audio, _SR),
+        "band_energy_db": get_band_energies(audio, _SR, BAND_FREQS).tolist(),
+        "tags": tags,
+    }
+
+
+class SampleLibrary:
+    """Index of the audio files in a sample directory with precomputed
+    metadata (see `analyse_file`). The index is stored as JSON file and
+    updated incrementally: only new or modified files (by modification
+    time and size) are analysed. Listing and filtering samples does not
+    touch the file system; call `.refresh()` to pick up changes."""
+
+    def __init__(self, path:str=_AUDIO_SAMPLE_PATH,
+                 cache_path:str=_SAMPLE_CACHE_PATH,
+                 index_file:str=None, refresh:bool=True):
+        """Loads (and updates) the index of a sample directory.
+
+        Arguments:
+        - path: directory containing the audio samples
+        - cache_path: directory for decoded samples and the index file,
+        `None` keeps the index in memory only
+        - index_file: custom location of the index file
+        - refresh: analyse new or modified files right away (disable to
+        analyse them in parallel, see `playback.ingest`)
+        """
+        self.path = path
+        self.cache = SampleCache(cache_path) if cache_path else None
+        if index_file is None and cache_path:
+            key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+            index_file = os.path.join(cache_path, f"library-{key}.json")
+        self.index_file = index_file
+        # files which could not be analysed by the last refresh (name -> error)
+        self.errors:dict[str, str] = {}
+        self._entries:dict[str, dict] = self._load_index()
+        self._queries:dict = {}
+        self._lock = threading.Lock()
+        if refresh:
+            self.refresh()
+
+    def _load_index(self) -> dict:
+        if self.index_file is None or not os.path.isfile(self.index_file):
+            return {}
+        try:
+            with open(self.index_file) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != INDEX_VERSION:
+            return {}
+        return index.get("samples", {})
+
+    def save(self):
+        """Writes the index file (atomically)."""
+        if self.index_file is None:
+            return
+        os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"version": INDEX_VERSION, "samples": self._entries}, f, indent=1)
+        os.replace(tmp_file, self.index_file)
+
+    def scan(self) -> tuple[list[str], list[str]]:
+        """Scans the sample directory once. Returns the names of all audio
+        files and of the new or modified ones (not analysed yet)."""
+        names, stale = [], []
+        for name in sorted(f for f in os.listdir(self.path) if is_audio_file(f)):
+            file = os.path.join(self.path, name)
+            if not os.path.isfile(file):
+                continue
+            names.append(name)
+            stat = os.stat(file)
+            entry = self._entries.get(name)
+            if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                stale.append(name)
+        return names, stale
+
+    def refresh(self) -> bool:
+        """Scans the sample directory once and analyses new or modified
+        audio files. Files which cannot be analysed (e.g. corrupt ones)
+        are left out with a warning, see `.errors`, and tried again by
+        the next refresh. Returns True if the index changed."""
+        names, stale = self.scan()
+        entries = {name: self._entries[name] for name in names if name not in stale}
+        errors = {}
+        for name in stale:
+            try:
+                entries[name] = analyse_file(self.get_path(name), self.cache)
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+                warnings.warn(f"Skipped sample '{name}': {errors[name]}")
+        self.errors = errors
+        changed = bool(stale) or set(entries) != set(self._entries)
+        if changed:
+            self.update(entries, replace=True)
+        return changed
+
+    def update(self, entries:dict[str, dict], replace:bool=False):
+        """Adds precomputed metadata to the index and saves it.
+
+        Arguments:
+        - entries: maps file names to metadata (see `analyse_file`)
+        - replace: drop all other entries
+        """
+        with self._lock:
+            if replace:
+                self._entries = dict(entries)
+            else:
+                self._entries.update(entries)
+            self._queries.clear()
+        self.save()
+
+    @property
+    def names(self) -> list[str]:
+        """Names of all indexed audio files (sorted)."""
+        return self.filter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name:str) -> bool:
+        return name in self._entries
+
+    def get(self, name:str) -> dict:
+        """Returns the metadata of a sample."""
+        return self._entries[name]
+
+    def get_path(self, name:str) -> str:
+        """Returns the file path of a sample."""
+        return os.path.join(self.path, name)
+
+    def filter(self, num_channels:int=None, tags:list[str]=None,
+               min_duration:float=None, max_duration:float=None) -> list[str]:
+        """Returns the names of all samples matching the given criteria
+        (sorted). Results are memoized until the index changes.
+
+        Arguments:
+        - num_channels: required number of channels (e.g. 2 for stereo)
+        - tags: required tags (all of them)
+        - min_duration, max_duration: duration range in seconds
+        """
+        tags = tuple(sorted(tags)) if tags else ()
+        key = (num_channels, tags, min_duration, max_duration)
+        names = self._queries.get(key)
+        if names is None:
+            names = sorted(
+                name for name, entry in self._entries.items()
+                if (num_channels is None or entry["num_channels"] == num_channels)
+                and all(tag in entry["tags"] for tag in tags)
+                and (min_duration is None or entry["duration"] >= min_duration)
+                and (max_duration is None or entry["duration"] <= max_duration))
+            self._queries[key] = names
+        return names
+
+    def choice(self, rng:random.Random=None, **filters) -> str:
+        """Returns the name of a random sample matching the filters
+        (see `.filter()`), drawn with `rng` (by default the global
+        generator of `random`)."""
+        names = self.filter(**filters)
+        if not names:
+            raise LookupError(f"No sample matches the filters {filters}.")
+        return (rng or random).choice(names)
+
+    def get_band_energies(self, names:list[str]) -> np.ndarray:
+        """Returns the band energies (dB) of the given samples as array of 
+        shape (num_samples, num_bands), see `BAND_FREQS`. Memoized until
+        the index changes."""
+        key = ("band_energies", tuple(names))
+        energies = self._queries.get(key)
+        if energies is None:
+            energies = np.array([self._entries[name]["band_energy_db"] for name in names])
+            energies = energies.reshape(len(names), len(BAND_FREQS))
+            self._queries[key] = energies
+        return energies
+
+    def choice_by_band(self, freqs:list[float], min_db:float=_MIN_BAND_ENERGY_DB, 
+                       rng:random.Random=None, **filters) -> tuple[str, float]:
+        """Returns a random pair of a sample name and a frequency such that
+        the sample has sufficient energy in the third-octave band around 
+        the frequency (looked up in the index, no audio is processed).
+
+        Arguments:
+        - freqs: candidate frequencies (Hz), matched to the nearest band
+        - min_db: minimal band energy relative to the total energy (dB)
+        - rng: random number generator (by default the global one)
+        - filters: restrictions for the samples (see `.filter()`)
+        """
+        names = self.filter(**filters)
+        freqs = np.asarray(freqs, dtype=float)
+        # nearest bands (on a logarithmic scale)
+        bands = np.argmin(np.abs(np.log2(freqs[:, np.newaxis] / np.array(BAND_FREQS))), axis=1)
+        energies = self.get_band_energies(names)[:, bands]
+        sample_idxs, freq_idxs = np.nonzero(energies >= min_db)
+        if len(sample_idxs) == 0:
+            raise LookupError(f"No sample has {min_db} dB of energy in any of the bands.")
+        k = (rng or random).randrange(len(sample_idxs))
+        return names[sample_idxs[k]], float(freqs[freq_idxs[k]])
@@ -1,11 +1,12 @@
-"""Audio playback functionality."""
+"""Audio playback functionality.
+
+NOTE: `sounddevice`, `ipywidgets` and `IPython` are imported where 
+needed so that importing this module is cheap and works without an
+audio device (e.g. for headless use of the games)."""
 
 # external imports
-import sounddevice as sd
 from threading import Thread
 from time import sleep
-import ipywidgets as widgets
-from IPython.display import display
 # internal/relative imports
 from .samples import Sample
 from ..effects.basic import AudioFxChain
@@ -21,7 +22,8 @@ class SamplePlayer:
                  fx_chain:AudioFxChain=None, 
                  play_on_start=False,
                  fxs_on=False, 
-                 buffer=1024):
+                 buffer=1024,
+                 wet:Sample=None):
         """Loads a sample and effects chain into an audio 
         player for use in Jupyter Notebooks. The player 
         uses the `sounddevice` module for streaming audio.
@@ -32,7 +34,11 @@ class SamplePlayer:
         - play_on_start: playback state on player start
         - play_on_start: effects stats on player start
         - buffer: buffer length for audio stream callback
+        - wet: pre-rendered version of the sample with effects (see 
+        `rendering.RenderedSample`), played instead of applying the
+        effects chain in the audio callback
         """
+        import ipywidgets as widgets
         # load sample
         self.sample = sample
         # needed for playback functionality
@@ -40,6 +46,8 @@ class SamplePlayer:
         self.stop_flag = not play_on_start
         self.buffer = buffer
         self._audio_thread:Thread = None
+        # exception stopping the stream (`sd.CallbackStop`, bound in `_play_audio`)
+        self._callback_stop:type[Exception] = None
         # transport control
         self.start_button:widgets.Button = \
             widgets.Button(description="▶ Play / Loop", button_style="success")
@@ -49,6 +57,7 @@ class SamplePlayer:
         self.stop_button.on_click(self._stop_button_click)
         # load audio effect
         self.fxs:AudioFxChain = fx_chain
+        self.wet:Sample = wet
         self.fxs_on = fxs_on
         # effects toggle
         self.fx_toggle_box:widgets.ToggleButton = \
@@ -60,6 +69,9 @@ class SamplePlayer:
         self._audio_thread = Thread(target=self._play_audio, daemon=True)
 
     def _play_audio(self):
+        import sounddevice as sd
+        # no imports in the realtime callback
+        self._callback_stop = sd.CallbackStop
         with sd.OutputStream(
             samplerate=self.sample.audio.sr, 
             channels=self.sample.audio.num_channels, 
@@ -76,19 +88,19 @@ class SamplePlayer:
         stop_flag = self.stop_flag
         if stop_flag:
             outdata.fill(0)
-            raise sd.CallbackStop()
+            raise self._callback_stop()
         # get current signal chunk
         start_idx = self.idx
-        audio_chunk = self.sample.get_chunk(start_idx, frames)
-        # update index attribute
-        end_idx = start_idx + frames
-        num_samples = self.sample.num_samples
-        if end_idx <= num_samples:
-            self.idx = end_idx
+        wet = self.wet
+        if wet is not None and self.fxs_on:
+            # pre-rendered effects, no processing needed
+            audio_chunk = wet.get_chunk(start_idx, frames)
         else:
-            self.idx = end_idx - num_samples
+            audio_chunk = self.sample.get_chunk(start_idx, frames)
+        # update index attribute (wraps around at the loop end)
+        self.idx = self.sample.get_next_idx(start_idx, frames)
         # apply effects to current signal chunk
-        if self.fxs and self.fxs_on:
+        if self.fxs and self.fxs_on and wet is None:
             # print(f"DEBUGGING: outdata.shape={outdata.shape}")
             # print(f"DEBUGGING: audio_chunk.shape={audio_chunk.shape}")
             audio_chunk = self.fxs(audio_chunk)
@@ -100,6 +112,8 @@ class SamplePlayer:
     
     # --- User Interface ---
     def _build_ui(self):
+        import ipywidgets as widgets
+        from IPython.display import display
         elements = [
             self.start_button,
             self.stop_button,
@@ -0,0 +1,49 @@
+"""Offline rendering of samples through effect chains.
+
+Rendering the processed (wet) version of a sample ahead of time turns
+playback into a plain buffer read: no effects are computed in the audio
+callback. This is possible whenever the effect parameters are fixed
+while the sample is played (e.g. within a round of an exercise)."""
+
+# external imports
+import numpy as np
+# internal/relative imports
+from ..effects.basic import AudioFxChain
+from .samples import AudioSignal, Sample
+
+
+def render_loop(sample:Sample, fxs:AudioFxChain) -> np.ndarray:
+    """Renders a looped sample through an effect chain. The result has
+    the length of the sample's loop end and loops at the same points
+    (see `Sample.prepare_loop`). The loop is rendered twice and the
+    second pass is kept, so the effect state (e.g. filter memory) at
+    the loop start matches the audio preceding it when looping."""
+    loop_start, loop_end = sample.loop_start, sample.loop_end
+    # read as played: first pass from the start, second pass of the loop
+    num_samples = loop_end + (loop_end - loop_start)
+    chunks, idx = [], 0
+    while num_samples > 0:
+        size = min(num_samples, sample.num_samples)
+        chunks.append(sample.get_chunk(idx, size))
+        idx = sample.get_next_idx(idx, size)
+        num_samples -= size
+    wet = fxs(np.concatenate(chunks, axis=-1))
+    return np.concatenate([wet[..., :loop_start], wet[..., loop_end:]], axis=-1)
+
+
+class RenderedSample(Sample):
+    """Pre-rendered (wet) version of a sample, see `render_loop`. It is
+    played like the original sample (same length and loop points) and
+    the gain of the original sample is already applied."""
+
+    def __init__(self, sample:Sample, fxs:AudioFxChain):
+        """Renders a sample through an effect chain."""
+        self.name = sample.name
+        self.path = sample.path
+        self.mode = sample.mode
+        self.gain_db = 0
+        self.audio = AudioSignal(render_loop(sample, fxs), sample.audio.sr)
+        self.loop_start = sample.loop_start
+        self.loop_end = sample.loop_end
+        # the seam is part of the rendered audio
+        self.seam = self.audio.data[..., :0]
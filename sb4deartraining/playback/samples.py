@@ -3,12 +3,23 @@
 # external imports
 import os
 import random
-import librosa
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
 import numpy as np
-import sounddevice as sd
 # internal/relative imports
-from ..config import _AUDIO_SAMPLE_PATH, _SR
+from ..config import _AUDIO_SAMPLE_PATH, _SAMPLE_CACHE_PATH, _SAMPLE_STORE_SIZE, _SR
+from ..config import _PREFETCH_WORKERS, _DTYPE, _MIN_BAND_ENERGY_DB
+from ..config import _LOOP_CROSSFADE, _LOOP_SEARCH
 from ..constants import SQRT12
+from ..utilities.levels import convert_db_to_ratio
+from ..utilities.loudness import get_normalization_gain
+from ..utilities.randomness import get_rng
+from .cache import SampleCache
+from .decoding import decode, map_wav, pcm_to_float, unpack_int24
+from .library import SampleLibrary
 
 
 class AudioSignal:
@@ -29,29 +40,46 @@ class AudioSignal:
         self.sr = sr
     
     @classmethod
-    def load(cls, file:str, mode:str="native"):
-        """Create an AudioSignal instance from an audio file. 
-        Currently implemented using `librosa`. 
+    def load(cls, file:str, mode:str="native", cache:SampleCache=None):
+        """Create an AudioSignal instance from an audio file. WAV
+        files are read directly, other formats are decoded using 
+        `librosa` (see `decoding.decode`). The audio is resampled
+        to the default sample rate if necessary.
         
         Aurguments:
         - file: audio file path
         - mode: 'mono' produces a mono signal, 'native' uses the 
         native number of channels, 'center' produces a centered
-        stereo signal."""
+        stereo signal.
+        - cache: optional on-disk cache for decoded audio data (see
+        `SampleCache`). Cached data is memory-mapped and read-only."""
         # verify input
         MODES = ['native', 'mono', 'center']
         if not (type(mode) == str and mode.lower() in MODES):
             raise ValueError("The following options are available " \
             "for 'mode': 'native', 'mono', 'center'")
+        mode = mode.lower()
         # load audio file
+        if cache is None:
+            audio = cls._decode(file, mode)
+        else:
+            audio = cache.load(file, mode, _SR, lambda: cls._decode(file, mode))
+        # NOTE: decoded data is float32, casting only copies it if 
+        # higher precision is configured
+        return cls(audio.astype(_DTYPE, copy=False), _SR)
+
+    @classmethod
+    def _decode(cls, file:str, mode:str) -> np.ndarray:
+        """Decode an audio file and resample it to the default 
+        sample rate."""
         if mode == 'native':
-            audio, sr = librosa.load(file, sr=_SR, mono=False)
+            audio = decode(file, sr=_SR, mono=False)
         elif mode == 'mono':
-            audio, sr = librosa.load(file, sr=_SR, mono=True)
+            audio = decode(file, sr=_SR, mono=True)
         elif mode == 'center':
-            audio, sr = librosa.load(file, sr=_SR, mono=True)
+            audio = decode(file, sr=_SR, mono=True)
             audio = cls.mono_to_center(audio)
-        return cls(audio, sr)
+        return audio
     
     @property 
     def num_channels(self):
@@ -84,6 +112,7 @@ class AudioSignal:
     
     def preview(self):
         """Playback the loaded sample once."""
+        import sounddevice as sd
         mono = self.num_channels == 1
         audio = self.data if mono else self.data.T
         sd.play(audio, self.sr)
@@ -111,14 +140,128 @@ class AudioSignal:
                 chunk = np.concatenate((until_end, back_from_start), axis=1)
             return chunk
 
+    def _read(self, start_idx:int, end_idx:int) -> np.ndarray:
+        """Returns the samples in the given range (view)."""
+        return self.data[..., start_idx:end_idx]
+
+    def iter_chunks(self, size:int=1024):
+        """Iterate over consecutive chunks of audio data (no looping).
+        The last chunk is shorter if the number of samples is not a 
+        multiple of the chunk size. Chunks are views, not copies."""
+        for start_idx in range(0, self.num_samples, size):
+            yield self.data[..., start_idx:start_idx + size]
+
+    @classmethod
+    def open(cls, file:str, mode:str="native", cache:SampleCache=None):
+        """Open an audio file for streaming without decoding it as a 
+        whole. WAV files at the default sample rate are memory-mapped
+        (see `MappedAudioSignal`). Other files are decoded into the 
+        (memory-mapped) on-disk cache if one is given, and loaded into
+        memory otherwise."""
+        try:
+            signal = MappedAudioSignal(file, mode)
+        except ValueError:
+            # unsupported format or sample rate
+            signal = None
+        if signal is not None and signal.sr == _SR:
+            return signal
+        return cls.load(file, mode, cache=cache)
+
+
+class MappedAudioSignal(AudioSignal):
+    """Audio signal streamed from a memory-mapped WAV file. Only the 
+    requested chunks are read and converted to floating point data, so
+    the resident memory is independent of the length of the file. The 
+    native sample rate of the file is used (no resampling)."""
+
+    def __init__(self, file:str, mode:str="native"):
+        """Memory-maps a WAV file (see `AudioSignal.load` for the modes)."""
+        if not (type(mode) == str and mode.lower() in ['native', 'mono', 'center']):
+            raise ValueError("The following options are available " \
+            "for 'mode': 'native', 'mono', 'center'")
+        self.file = file
+        self.mode = mode.lower()
+        self._frames, self._info = map_wav(file)
+        self.sr = self._info.sr
+
+    @property
+    def data(self) -> np.ndarray:
+        """The complete audio data (CAUTION: loads the whole file)."""
+        return self._read(0, self.num_samples)
+
+    @property 
+    def num_channels(self):
+        if self.mode == 'mono':
+            return 1
+        elif self.mode == 'center':
+            return 2
+        return self._info.num_channels
+
+    @property 
+    def num_samples(self):
+        return self._info.num_frames
+
+    def _read(self, start_idx:int, end_idx:int) -> np.ndarray:
+        """Reads and converts the samples in the given range."""
+        frames = self._frames[start_idx:end_idx]
+        if self._info.sampwidth == 3:
+            frames = unpack_int24(frames)
+        mono = self.mode != 'native' or self._info.num_channels == 1
+        audio = pcm_to_float(frames, self._info, mono=mono)
+        if self.mode == 'center':
+            audio = self.mono_to_center(audio)
+        return audio.astype(_DTYPE, copy=False)
+
+    def get_chunk(self, start_idx:int=0, size:int=1024):
+        """Extract a chunk of audio data with given size and starting point."""
+        # check if sample is large enough
+        if self.num_samples < size:
+            raise ValueError('Requested size is longer than signal.')
+        end_idx = start_idx + size
+        if end_idx <= self.num_samples:
+            return self._read(start_idx, end_idx)
+        until_end = self._read(start_idx, self.num_samples)
+        back_from_start = self._read(0, end_idx - self.num_samples)
+        return np.concatenate((until_end, back_from_start), axis=-1)
+
+    def iter_chunks(self, size:int=1024):
+        """Iterate over consecutive chunks of audio data (no looping)."""
+        for start_idx in range(0, self.num_samples, size):
+            yield self._read(start_idx, min(start_idx + size, self.num_samples))
+
 
 class Sample:
     """Class to store audio and metadata of audio samples."""
 
-    def __init__(self, name:str, path:str, mode='native'):
+    def __init__(self, name:str, path:str, mode='native', 
+                 cache:SampleCache=None, store:"SampleStore"=None,
+                 stream:bool=False, gain_db:float=0, loop:bool=False,
+                 bpm:float=None):
+        """Loads an audio sample. If a sample store is given, the audio
+        data is taken from (and shared via) the store. Otherwise, the 
+        file is loaded, optionally using an on-disk cache. Long files
+        can be streamed instead of loaded (see `AudioSignal.open`).
+        
+        The gain (dB) is applied to each chunk on playback (e.g. for 
+        loudness normalization), the audio data itself is unchanged.
+        If `loop` is set, click-free loop points are determined right 
+        away (see `.prepare_loop()`, using the tempo `bpm` if known)."""
         self.name = name
         self.path = path
-        self.audio = AudioSignal.load(self.path, mode=mode)
+        self.mode = mode
+        self.gain_db = gain_db
+        if stream:
+            self.audio = AudioSignal.open(self.path, mode=mode, cache=cache)
+        elif store is None:
+            self.audio = AudioSignal.load(self.path, mode=mode, cache=cache)
+        else:
+            self.audio = store.get(self.path, mode=mode)
+        # loop region and crossfaded seam (see `.prepare_loop()`)
+        self.loop_start = 0
+        self.loop_end = self.audio.num_samples
+        self.seam:np.ndarray = None
+        if loop:
+            self.prepare_loop(bpm)
 
     def __str__(self):
         return "SAMPLE: " + self.name
@@ -131,29 +274,426 @@ class Sample:
     def num_samples(self):
         return self.audio.num_samples
     
+    def _find_zero_crossing(self, start_idx:int, end_idx:int, last:bool=False) -> int:
+        """Returns the index of the first (or last) rising zero crossing
+        of the mono mix in the given range (None if there is none)."""
+        start_idx, end_idx = max(start_idx, 1), min(end_idx, self.num_samples)
+        if end_idx <= start_idx:
+            return None
+        audio = self.audio._read(start_idx - 1, end_idx)
+        mono = audio if audio.ndim == 1 else np.mean(audio, axis=0)
+        crossings = np.flatnonzero((mono[:-1] < 0) & (mono[1:] >= 0))
+        if len(crossings) == 0:
+            return None
+        return start_idx + int(crossings[-1 if last else 0])
+
+    def prepare_loop(self, bpm:float=None, crossfade:float=_LOOP_CROSSFADE, 
+                     search:float=_LOOP_SEARCH):
+        """Determines loop points and precomputes the loop seam, so the
+        sample loops without clicks while playback only copies slices.
+
+        The loop starts at the first rising zero crossing (of the mono
+        mix) after the first `crossfade` seconds and ends at the last 
+        rising zero crossing before the end of the sample (or before the
+        end of the last complete beat if the tempo is given). The last
+        part of the loop is crossfaded with the audio preceding the loop
+        start, so the waveform continues smoothly when jumping back. 
+        Only the crossfaded part (`crossfade` seconds) is stored.
+
+        Arguments:
+        - bpm: tempo of the sample (loop length is a number of beats)
+        - crossfade: length of the crossfade (s)
+        - search: max. distance of the loop points from the start and
+        the end (or last beat) for finding zero crossings (s)
+        """
+        sr = self.audio.sr
+        num_samples = self.num_samples
+        search_len = int(search * sr)
+        fade_len = int(crossfade * sr)
+        # the loop starts after the audio used for the crossfade
+        loop_start = self._find_zero_crossing(fade_len, fade_len + search_len) or fade_len
+        loop_end = num_samples
+        if bpm:
+            beat_len = 60 / bpm * sr
+            num_beats = int((num_samples - loop_start) / beat_len)
+            if num_beats:
+                loop_end = loop_start + int(round(num_beats * beat_len))
+        loop_end = self._find_zero_crossing(loop_end - search_len, loop_end, last=True) or loop_end
+        if loop_end - loop_start <= fade_len:
+            # too short for looping with a crossfade
+            loop_start, loop_end, fade_len = 0, num_samples, 0
+        # precompute seam: end of the loop fading into the audio preceding the loop start
+        tail = self.audio._read(loop_end - fade_len, loop_end)
+        pre_roll = self.audio._read(loop_start - fade_len, loop_start)
+        fade_in = (0.5 - 0.5 * np.cos(np.pi * (np.arange(fade_len) + 0.5) / fade_len)).astype(tail.dtype)
+        self.seam = tail * (1 - fade_in) + pre_roll * fade_in
+        self.loop_start, self.loop_end = loop_start, loop_end
+
+    def get_next_idx(self, start_idx:int, size:int) -> int:
+        """Playback position after reading `size` samples from `start_idx`
+        (wrapping around at the end of the loop)."""
+        idx = start_idx + size
+        loop_len = self.loop_end - self.loop_start
+        while idx >= self.loop_end and loop_len > 0:
+            idx -= loop_len
+        return idx
+
     def get_chunk(self, start_idx:int, size:int=1024) -> np.ndarray:
-        return self.audio.get_chunk(start_idx,size)
+        if self.seam is None:
+            chunk = self.audio.get_chunk(start_idx,size)
+        else:
+            chunk = self._get_loop_chunk(start_idx, size)
+        if self.gain_db:
+            # NOTE: only the chunk is rescaled, no full-length copy
+            chunk = chunk * chunk.dtype.type(convert_db_to_ratio(self.gain_db))
+        return chunk
+
+    def _get_loop_chunk(self, start_idx:int, size:int) -> np.ndarray:
+        """Reads a chunk of the looped sample (slices of the audio data 
+        and the precomputed seam, see `.prepare_loop()`)."""
+        seam_start = self.loop_end - self.seam.shape[-1]
+        parts = []
+        idx, remaining = start_idx, size
+        while remaining > 0:
+            if idx < seam_start:
+                end_idx = min(seam_start, idx + remaining)
+                parts.append(self.audio._read(idx, end_idx))
+            else:
+                end_idx = min(self.loop_end, idx + remaining)
+                parts.append(self.seam[..., idx - seam_start:end_idx - seam_start])
+            remaining -= end_idx - idx
+            idx = self.loop_start if end_idx >= self.loop_end else end_idx
+        return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=-1)
 
     def preview(self):
-        self.audio.preview()
+        if self.gain_db:
+            ratio = convert_db_to_ratio(self.gain_db)
+            AudioSignal(self.audio.data * ratio, self.audio.sr).preview()
+        else:
+            self.audio.preview()
+
+
+class SampleStore:
+    """In-memory LRU cache for decoded audio data with a memory budget.
+    The stored arrays are read-only and shared by all `AudioSignal` 
+    objects handed out by the store. Centered stereo data is derived 
+    from the mono data without decoding the file again and only takes 
+    up the memory of a single channel (both channels are views of the 
+    same data). The store is thread-safe."""
+
+    def __init__(self, max_bytes:int=_SAMPLE_STORE_SIZE, cache:SampleCache=None):
+        """Arguments:
+        - max_bytes: memory budget, least recently used samples are 
+        evicted once it is exceeded
+        - cache: optional on-disk cache used for loading samples
+        """
+        self.max_bytes = max_bytes
+        self.cache = cache
+        # maps (file path, mode) to (audio data, size in bytes)
+        self._entries:OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file:str, mode:str='native') -> AudioSignal:
+        """Returns the audio signal for an audio file (see 
+        `AudioSignal.load` for the available modes)."""
+        mode = mode.lower()
+        key = (os.path.abspath(file), mode)
+        with self._lock:
+            audiodata = self._lookup(key)
+            if audiodata is not None:
+                self.hits += 1
+                return AudioSignal(audiodata, _SR)
+            self.misses += 1
+        if mode == 'center':
+            # derive centered stereo data from mono data
+            def get_channel():
+                mono = self._get_data(file, 'mono')
+                return np.multiply(mono, SQRT12, dtype=mono.dtype)
+            if self.cache is None:
+                channel = get_channel()
+            else:
+                # shared via the cache like the decoded data
+                channel = self.cache.load(file, 'center-channel', _SR, get_channel)
+                channel = channel.astype(_DTYPE, copy=False)
+            channel.flags.writeable = False
+            audiodata = np.broadcast_to(channel, (2, len(channel)))
+            self._insert(key, audiodata, channel.nbytes)
+        else:
+            audiodata = self._get_data(file, mode)
+        return AudioSignal(audiodata, _SR)
+
+    def _get_data(self, file:str, mode:str) -> np.ndarray:
+        """Look up audio data without counting hits/misses, load 
+        and insert it on a miss."""
+        key = (os.path.abspath(file), mode)
+        with self._lock:
+            audiodata = self._lookup(key)
+        if audiodata is None:
+            audiodata = AudioSignal.load(file, mode=mode, cache=self.cache).data
+            audiodata.flags.writeable = False
+            self._insert(key, audiodata, audiodata.nbytes)
+        return audiodata
+
+    def _lookup(self, key:tuple) -> np.ndarray:
+        """Returns stored audio data or None (lock must be held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _insert(self, key:tuple, audiodata:np.ndarray, nbytes:int):
+        with self._lock:
+            self._entries[key] = (audiodata, nbytes)
+            self._entries.move_to_end(key)
+            # evict least recently used entries (but keep the new one)
+            while self.resident_bytes > self.max_bytes and len(self._entries) > 1:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @property
+    def resident_bytes(self) -> int:
+        """Memory used by the stored audio data (in bytes)."""
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of requests served from memory."""
+        num_requests = self.hits + self.misses
+        return self.hits / num_requests if num_requests else 0.
+
+    @property
+    def stats(self) -> dict:
+        """Summary of the store's usage statistics."""
+        return {
+            "entries": len(self._entries),
+            "resident_bytes": self.resident_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Removes all samples from the store."""
+        with self._lock:
+            self._entries.clear()
+
+
+def get_shared_memory_path() -> str:
+    """Default directory of the `SharedSampleStore` (in shared memory
+    if available, i.e. /dev/shm on Linux)."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "sb4deartraining-samples")
+
+
+class SharedSampleStore(SampleStore):
+    """Sample store sharing decoded audio data between processes. Each
+    sample is decoded once and written to a memory-mapped file in a 
+    directory shared by all processes (by default in shared memory, see
+    `get_shared_memory_path`). Every process maps the same pages, so 
+    memory usage does not grow with the number of worker processes. 
+    All arrays handed out are read-only views of the shared data.
+    
+    The files outlive the processes (so new workers start quickly);
+    call `.clear_shared()` to remove them."""
+
+    def __init__(self, path:str=None, max_bytes:int=_SAMPLE_STORE_SIZE):
+        """Arguments:
+        - path: directory shared by the processes
+        - max_bytes: budget of mapped memory per process (see `SampleStore`)
+        """
+        super().__init__(max_bytes, SampleCache(path or get_shared_memory_path()))
+
+    def clear_shared(self):
+        """Removes the shared data of all processes."""
+        self.clear()
+        self.cache.clear()
 
 
 class SampleSelector():
-    """Provides methods to load audio samples from a specified path."""
+    """Provides methods to load audio samples from a specified path.
+    The available samples and their metadata are looked up in a library
+    index (see `SampleLibrary`) instead of scanning the directory. 
+    Optionally, the next random sample is decoded in the background 
+    while the current one is in use (prefetching)."""
 
-    def __init__(self, path:str=_AUDIO_SAMPLE_PATH):
+    def __init__(self, 
+                 path:str=_AUDIO_SAMPLE_PATH, 
+                 cache_path:str=_SAMPLE_CACHE_PATH, 
+                 store:SampleStore=None,
+                 auto_prefetch:bool=False,
+                 max_workers:int=_PREFETCH_WORKERS,
+                 loudness_target:float=None,
+                 rng:random.Random | int=None):
+        """Arguments:
+        - path: directory containing the audio samples
+        - cache_path: directory for caching decoded samples (see 
+        `SampleCache`), `None` disables caching
+        - store: in-memory sample store, possibly shared with other 
+        selectors (a new one is created by default)
+        - auto_prefetch: prefetch the next random sample whenever a 
+        random sample is requested
+        - max_workers: maximal number of threads used for prefetching
+        - loudness_target: if set, samples are played back at this 
+        integrated loudness (LUFS) using the loudness stored in the 
+        library (limited to avoid clipping)
+        - rng: random number generator (or seed) for the selection of
+        samples, can be overridden per call (e.g. by each exercise)
+        """
         self.path = path 
+        self.rng = get_rng(rng)
+        if store is None:
+            cache = SampleCache(cache_path) if cache_path else None
+            store = SampleStore(cache=cache)
+        self.store = store
+        self.library = SampleLibrary(path, cache_path)
+        self.loudness_target = loudness_target
+        # prefetching
+        self.auto_prefetch = auto_prefetch
+        self.max_workers = max_workers
+        self._executor:ThreadPoolExecutor = None
+        self._prefetched:dict[tuple, Future] = {}
+        self._prefetch_lock = threading.Lock()
     
     @property
     def samples(self):
-        path = self.path
-        samples = [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
-        return samples
+        return self.library.names
     
-    def get_random_sample(self, mode='native', path_only=False) -> Sample:
-        sample_file = random.choice(self.samples)
-        sample_path = os.path.join(self.path, sample_file)
-        if path_only:
-            return sample_path
+    def get_random_sample(self, mode='native', path_only=False, stream=False,
+                          rng:random.Random=None, **filters) -> Sample:
+        """Returns a random sample (drawn with `rng`, by default the one
+        of the selector). Keyword arguments restrict the selection (see 
+        `SampleLibrary.filter`, e.g. `num_channels=2`)."""
+        rng = rng or self.rng
+        # use a prefetched sample if available (drawn earlier with the same rng)
+        sample = None
+        if not (path_only or stream):
+            sample = self._get_prefetched(self._get_prefetch_key(mode, rng, filters))
+        if sample is None:
+            sample_file = self.library.choice(rng, **filters)
+            sample_path = self.library.get_path(sample_file)
+            if path_only:
+                return sample_path
+            if stream:
+                gain_db = self.get_normalization_gain(sample_file)
+                return Sample(sample_file, sample_path, mode=mode, cache=self.store.cache, 
+                              stream=True, gain_db=gain_db, loop=True)
+            sample = Sample(sample_file, sample_path, mode=mode, store=self.store, loop=True)
+        if self.auto_prefetch:
+            self.prefetch(mode, rng, **filters)
+        sample.gain_db = self.get_normalization_gain(sample.name)
+        return sample
+
+    def get_sample(self, name:str, mode='native') -> Sample:
+        """Returns the sample with the given name (loaded via the store)."""
+        sample = Sample(name, self.library.get_path(name), mode=mode, store=self.store, loop=True)
+        sample.gain_db = self.get_normalization_gain(name)
+        return sample
+
+    def get_sample_for_band(self, freqs:list[float], min_db:float=_MIN_BAND_ENERGY_DB,
+                            mode='native', rng:random.Random=None,
+                            **filters) -> tuple[Sample, float]:
+        """Returns a random sample together with one of the frequencies
+        such that the sample has sufficient energy around the frequency
+        (see `SampleLibrary.choice_by_band`). Raises a LookupError if
+        there is no such pair. Like random samples, the pairs are 
+        prefetched (see `prefetch_for_band`)."""
+        rng = rng or self.rng
+        key = self._get_prefetch_key(mode, rng, filters, (tuple(freqs), min_db))
+        prefetched = self._get_prefetched(key)
+        if prefetched is None:
+            name, freq = self.library.choice_by_band(freqs, min_db, rng, **filters)
+            sample = Sample(name, self.library.get_path(name), mode=mode, store=self.store, loop=True)
         else:
-            return Sample(sample_file, sample_path, mode=mode)
+            sample, freq = prefetched
+        if self.auto_prefetch:
+            self.prefetch_for_band(freqs, min_db, mode, rng, **filters)
+        sample.gain_db = self.get_normalization_gain(sample.name)
+        return sample, freq
+
+    def get_normalization_gain(self, name:str, loudness_target:float=None) -> float:
+        """Returns the gain (dB) bringing a sample to the loudness target
+        (by default the one of the selector, 0 if no target is set)."""
+        if loudness_target is None:
+            loudness_target = self.loudness_target
+        if loudness_target is None:
+            return 0.
+        entry = self.library.get(name)
+        return get_normalization_gain(entry["loudness_lufs"], loudness_target, entry["peak_db"])
+
+    @staticmethod
+    def _get_prefetch_key(mode:str, rng:random.Random, filters:dict, band:tuple=None) -> tuple:
+        filters = {key: tuple(val) if type(val) == list else val for key, val in filters.items()}
+        return (rng, mode.lower(), tuple(sorted(filters.items())), band)
+
+    def prefetch(self, mode='native', rng:random.Random=None, **filters) -> Future:
+        """Starts loading a random sample in a background thread. The
+        sample is returned by the next call of `get_random_sample` with
+        the same mode, filters and random number generator (so that 
+        exercises with their own generator only get their own draws). 
+        At most one sample per mode, filters and generator is prefetched."""
+        rng = rng or self.rng
+        key = self._get_prefetch_key(mode, rng, filters)
+        return self._submit(key, lambda: (self.library.choice(rng, **filters), None), mode)
+
+    def prefetch_for_band(self, freqs:list[float], min_db:float=_MIN_BAND_ENERGY_DB,
+                          mode='native', rng:random.Random=None, **filters) -> Future:
+        """Starts loading a random sample for one of the frequencies (see 
+        `get_sample_for_band`) in a background thread. The pair of sample 
+        and frequency is returned by the next call of `get_sample_for_band`
+        with the same arguments (see `prefetch`)."""
+        rng = rng or self.rng
+        key = self._get_prefetch_key(mode, rng, filters, (tuple(freqs), min_db))
+        return self._submit(key, lambda: self.library.choice_by_band(freqs, min_db, rng, **filters), mode)
+
+    def _submit(self, key:tuple, draw:Callable[[], tuple[str, float]], mode:str) -> Future:
+        """Draws a sample (name and frequency) unless one is already 
+        prefetched for the key and loads it in a background thread."""
+        with self._prefetch_lock:
+            future = self._prefetched.get(key)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="sample-prefetch")
+            sample_file, freq = draw()
+            sample_path = self.library.get_path(sample_file)
+            load = lambda: Sample(sample_file, sample_path, mode=mode, store=self.store, loop=True)
+            if key[-1] is None:
+                # random sample (see `prefetch`)
+                future = self._executor.submit(load)
+            else:
+                future = self._executor.submit(lambda: (load(), freq))
+            self._prefetched[key] = future
+        return future
+
+    def _get_prefetched(self, key:tuple) -> Sample | tuple[Sample, float]:
+        """Returns the prefetched sample (and frequency) for the key (see
+        `_get_prefetch_key`), waiting for it if necessary, or None if not 
+        available."""
+        with self._prefetch_lock:
+            future = self._prefetched.pop(key, None)
+        if future is None or future.cancelled():
+            return None
+        try:
+            return future.result()
+        except Exception:
+            # fall back to loading synchronously
+            return None
+
+    def close(self):
+        """Cancels pending prefetches and shuts down the worker threads."""
+        with self._prefetch_lock:
+            for future in self._prefetched.values():
+                future.cancel()
+            self._prefetched.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,5 @@
+"""Web service for ear training sessions (see `app`).
+
+Run the server with `python -m sb4deartraining.server [--host H] [--port P]`."""
+
+from .app import TrainingServer, serve
@@ -0,0 +1,37 @@
+"""Command line interface of the training server."""
+
+# external imports
+import argparse
+# internal/relative imports
+from ..config import _SERVER_HOST, _SERVER_PORT, _SERVER_WORKERS
+from ..config import _AUDIO_SAMPLE_PATH, _SAMPLE_CACHE_PATH, _RESULTS_PATH
+from ..playback.samples import SampleSelector, SharedSampleStore
+from ..games.results import ResultsStore
+from .app import serve
+
+
+def main(argv:list[str]=None):
+    parser = argparse.ArgumentParser(description="Serve ear training sessions over HTTP.")
+    parser.add_argument("--host", default=_SERVER_HOST, help="interface to listen on")
+    parser.add_argument("--port", type=int, default=_SERVER_PORT, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=_SERVER_WORKERS, help="render threads")
+    parser.add_argument("--samples", default=_AUDIO_SAMPLE_PATH, help="sample directory")
+    parser.add_argument("--cache", default=_SAMPLE_CACHE_PATH, help="cache directory")
+    parser.add_argument("--shared", action="store_true", 
+                        help="share decoded samples with other server processes")
+    parser.add_argument("--results", nargs="?", const=_RESULTS_PATH, default=None,
+                        help="record answers to a database (default path: %(const)s)")
+    args = parser.parse_args(argv)
+    store = SharedSampleStore() if args.shared else None
+    selector = SampleSelector(args.samples, args.cache, store=store)
+    results = ResultsStore(args.results) if args.results else None
+    try:
+        serve(args.host, args.port, sample_selector=selector, max_workers=args.workers,
+              results=results)
+    finally:
+        if results is not None:
+            results.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""Asynchronous HTTP service serving exercise rounds to web clients.
+
+Each client session owns a headless exercise (see `games.engine`). All
+sessions share one sample selector (and thus the decoded samples in
+memory). Preparing, rendering and encoding rounds is CPU bound and
+runs on a bounded pool of worker threads, so the event loop only parses
+requests and streams the encoded audio. Encoded audio is cached (see
+`RenderCache`), so a round whose sample and effect settings were played
+before is neither rendered nor encoded again.
+
+Endpoints (JSON unless noted otherwise):
+- GET    /exercises                         available exercises
+- POST   /sessions                          new session, body: {"exercise": ...,
+                                            "params": {...}, "user": ...,
+                                            "adaptive": "staircase" | "elo",
+                                            "seed": ...}
+- GET    /sessions/{id}                     session state and score
+- DELETE /sessions/{id}                     ends a session (sessions idle for
+                                            longer than the session TTL are
+                                            ended by the server)
+- POST   /sessions/{id}/rounds              starts the next round
+- GET    /sessions/{id}/audio?version=wet   audio of the round (chunked), version
+        &format=wav                         'dry' or 'wet', format 'wav' or 'flac'
+- POST   /sessions/{id}/answer              body: {"choice": option index}
+"""
+
+# external imports
+import copy
+import time
+import asyncio
+import traceback
+import importlib.util
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator
+# internal/relative imports
+from ..config import _SERVER_HOST, _SERVER_PORT, _SERVER_WORKERS
+from ..config import _SERVER_MAX_SESSIONS, _SERVER_SESSION_TTL, _STREAM_CHUNK_SIZE
+from ..playback.samples import SampleSelector
+from ..playback.rendering import RenderedSample
+from ..playback.encoding import FORMATS, RenderCache, iter_encoded
+from ..games.engine import Exercise
+from ..games.results import ResultsStore
+from ..games.adaptive import SCHEDULERS, DifficultyScheduler
+from ..games.volume import GainExercise
+from ..games.frequency import FrequencyExercise
+from ..games.stereo import PanningExercise, WidthExercise
+from .protocol import HTTPError, Request
+from .protocol import read_request, write_json, write_chunked
+
+# exercises available to clients
+EXERCISES = {
+    "gain": GainExercise,
+    "frequency": FrequencyExercise,
+    "panning": PanningExercise,
+    "width": WidthExercise,
+}
+
+
+class Session:
+    """State of a client session."""
+
+    def __init__(self, exercise:Exercise, scheduler_key:tuple=None):
+        self.id = exercise.session_id
+        self.exercise = exercise
+        # difficulty scheduler shared by the user's sessions (see 
+        # `TrainingServer.get_scheduler()`)
+        self.scheduler_key = scheduler_key
+        self.last_access = time.monotonic()
+        # serializes the requests of a session
+        self.lock = asyncio.Lock()
+
+    @property
+    def scheduler(self) -> DifficultyScheduler:
+        return self.exercise.scheduler
+
+    def as_dict(self) -> dict:
+        return {
+            "session": self.id,
+            "exercise": self.exercise.name,
+            "round": self.exercise.round_number,
+            "score": self.exercise.score.as_dict(),
+        }
+
+
+class TrainingServer:
+    """HTTP service managing concurrent training sessions."""
+
+    def __init__(self, sample_selector:SampleSelector=None,
+                 max_workers:int=_SERVER_WORKERS,
+                 max_sessions:int=_SERVER_MAX_SESSIONS,
+                 chunk_size:int=_STREAM_CHUNK_SIZE,
+                 render_cache:RenderCache=None, dither:bool=True,
+                 results:ResultsStore=None,
+                 session_ttl:float=_SERVER_SESSION_TTL):
+        """Creates the service (see `.start()` for serving requests).
+
+        Arguments:
+        - sample_selector: source of the samples shared by all sessions
+        - max_workers: threads preparing and rendering rounds
+        - max_sessions: max. number of concurrent sessions
+        - chunk_size: samples per chunk of streamed audio
+        - render_cache: cache of the encoded audio, by default a new one
+        is created
+        - dither: dither the audio when converting to 16 bit
+        - results: store recording the answers of all sessions and the
+        difficulty of the users (see `.get_scheduler()`)
+        - session_ttl: idle time (s) after which sessions are ended (None
+        keeps idle sessions until they are deleted)
+        """
+        self.sample_selector = sample_selector or SampleSelector()
+        self.max_workers = max_workers
+        self.max_sessions = max_sessions
+        self.chunk_size = chunk_size
+        self.render_cache = render_cache or RenderCache()
+        self.dither = dither
+        self.results = results
+        self.session_ttl = session_ttl
+        self.sessions:dict[str, Session] = {}
+        # difficulty schedulers of the users (by user, exercise and kind),
+        # the least recently used ones are dropped beyond `max_sessions`
+        # (unless a session still uses them)
+        self.schedulers:OrderedDict[tuple, DifficultyScheduler] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="server-render")
+        # bounds the number of jobs waiting for the worker threads
+        self._jobs:asyncio.Semaphore = None
+        self._server:asyncio.Server = None
+        self._reaper:asyncio.Task = None
+
+    # --- Serving ---
+    async def start(self, host:str=_SERVER_HOST, port:int=_SERVER_PORT) -> asyncio.Server:
+        """Starts listening (port 0 picks a free port, see `.address`)."""
+        self._jobs = asyncio.Semaphore(2 * self.max_workers)
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        if self.session_ttl is not None:
+            self._reaper = asyncio.create_task(self.reap_periodically())
+        return self._server
+
+    @property
+    def address(self) -> tuple:
+        """Host and port the server is listening on."""
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stops listening and ends all sessions."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for session in self.sessions.values():
+            session.exercise.close()
+        self.sessions.clear()
+        for key, scheduler in self.schedulers.items():
+            self.save_scheduler(key, scheduler)
+        self.schedulers.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def reap_periodically(self):
+        """Ends idle sessions (runs until the server is closed)."""
+        while True:
+            await asyncio.sleep(self.session_ttl / 4)
+            self.reap_sessions()
+
+    def reap_sessions(self) -> int:
+        """Ends the sessions idle for longer than the session TTL (except
+        those with a request in progress). Returns their number."""
+        if self.session_ttl is None:
+            return 0
+        deadline = time.monotonic() - self.session_ttl
+        stale = [session for session in self.sessions.values()
+                 if session.last_access < deadline and not session.lock.locked()]
+        for session in stale:
+            self.end_session(session)
+        return len(stale)
+
+    async def run_job(self, func:Callable, *args):
+        """Runs a blocking function on the worker threads."""
+        async with self._jobs:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        """Answers the requests of a (persistent) connection."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    await self.dispatch(request, writer)
+                except HTTPError as e:
+                    await write_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # answer unexpected errors (e.g. no matching sample)
+                    # instead of dropping the connection
+                    traceback.print_exception(e)
+                    await write_json(writer, 500, {"error": f"{type(e).__name__}: {e}"},
+                                     keep_alive=False)
+                    break
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request:Request, writer:asyncio.StreamWriter):
+        """Routes a request to its handler."""
+        parts = [part for part in request.path.split("/") if part]
+        route = (request.method, len(parts))
+        if route == ("GET", 1) and parts[0] == "exercises":
+            data = {"exercises": sorted(EXERCISES)}
+        elif route == ("POST", 1) and parts[0] == "sessions":
+            data = await self.create_session(request.json())
+        elif len(parts) >= 2 and parts[0] == "sessions":
+            session = self.get_session(parts[1])
+            chunks = None
+            async with session.lock:
+                session.last_access = time.monotonic()
+                if route == ("GET", 2):
+                    data = session.as_dict()
+                elif route == ("DELETE", 2):
+                    data = self.end_session(session)
+                elif route == ("POST", 3) and parts[2] == "rounds":
+                    data = await self.next_round(session)
+                elif route == ("POST", 3) and parts[2] == "answer":
+                    data = self.answer(session, request.json())
+                elif route == ("GET", 3) and parts[2] == "audio":
+                    fmt = self.get_format(request.query.get("format", "wav"))
+                    # rendered while the session is locked, streamed afterwards
+                    chunks = await self.get_audio(session, request.query.get("version", "wet"), fmt)
+                else:
+                    raise HTTPError(404)
+            if chunks is not None:
+                try:
+                    await write_chunked(writer, 200, self.iter_in_executor(chunks),
+                                        content_type=FORMATS[fmt], keep_alive=request.keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # the response has started, only closing the connection is left
+                    traceback.print_exception(e)
+                    raise ConnectionAbortedError("Streaming failed.") from e
+                return
+        else:
+            raise HTTPError(404)
+        await write_json(writer, 200, data, keep_alive=request.keep_alive)
+
+    # --- Handlers ---
+    async def create_session(self, data:dict) -> dict:
+        if len(self.sessions) >= self.max_sessions:
+            self.reap_sessions()
+        if len(self.sessions) >= self.max_sessions:
+            raise HTTPError(503, "Too many sessions.")
+        exercise_class = EXERCISES.get(data.get("exercise"))
+        if exercise_class is None:
+            raise HTTPError(400, f"Unknown exercise, available: {', '.join(sorted(EXERCISES))}.")
+        params = data.get("params", {})
+        if not isinstance(params, dict):
+            raise HTTPError(400, "'params' must be an object.")
+        user = data.get("user")
+        if user is not None and not isinstance(user, str):
+            raise HTTPError(400, "'user' must be a string.")
+        key, scheduler = await self.get_scheduler(exercise_class, user, data.get("adaptive"))
+        seed = data.get("seed")
+        if seed is not None and type(seed) != int:
+            raise HTTPError(400, "'seed' must be an integer.")
+        try:
+            # rounds are prepared by the server's workers and rendered
+            # when their audio is requested (unless cached)
+            exercise = exercise_class(**params, sample_selector=self.sample_selector,
+                                      render=False, prerender_depth=0,
+                                      results=self.results, user=user, scheduler=scheduler,
+                                      rng=seed)
+        except (TypeError, ValueError) as e:
+            raise HTTPError(400, str(e))
+        session = Session(exercise, key)
+        self.sessions[session.id] = session
+        return session.as_dict()
+
+    async def get_scheduler(self, exercise_class:type, user:str, kind:str) -> tuple:
+        """Returns the key and the difficulty scheduler of a user (shared
+        by the user's sessions of an exercise, new for anonymous sessions).
+        The state of a user's scheduler is restored from the results store
+        and saved there when the user's sessions end (see 
+        `.save_scheduler()`), so it carries over server restarts."""
+        if kind is None:
+            return None, None
+        if kind not in SCHEDULERS:
+            raise HTTPError(400, f"'adaptive' must be one of: {', '.join(SCHEDULERS)}.")
+        num_levels = len(exercise_class.difficulty_levels)
+        if user is None:
+            return None, SCHEDULERS[kind](num_levels)
+        key = (user, exercise_class.name, kind)
+        scheduler = self.schedulers.get(key)
+        if scheduler is None:
+            scheduler = await self.run_job(self.load_scheduler, key, num_levels)
+            # (another session of the user might have loaded it meanwhile)
+            scheduler = self.schedulers.setdefault(key, scheduler)
+        self.schedulers.move_to_end(key)
+        self.evict_schedulers(keep=key)
+        return key, scheduler
+
+    def evict_schedulers(self, keep:tuple=None):
+        """Saves and drops the least recently used schedulers beyond 
+        `max_sessions`, except the ones of live sessions (and `keep`)."""
+        in_use = {session.scheduler_key for session in self.sessions.values()}
+        in_use.add(keep)
+        for key in list(self.schedulers):
+            if len(self.schedulers) <= self.max_sessions:
+                break
+            if key not in in_use:
+                self.save_scheduler(key, self.schedulers.pop(key), wait=False)
+
+    def load_scheduler(self, key:tuple, num_levels:int) -> DifficultyScheduler:
+        """Restores a scheduler from the results store (a new one if there
+        is no matching state)."""
+        scheduler_class = SCHEDULERS[key[2]]
+        state = self.results.load_state(*key) if self.results is not None else None
+        if state is not None:
+            try:
+                scheduler = DifficultyScheduler.from_dict(state)
+            except ValueError:
+                scheduler = None
+            if type(scheduler) == scheduler_class and scheduler.num_levels == num_levels:
+                return scheduler
+        return scheduler_class(num_levels)
+
+    def save_scheduler(self, key:tuple, scheduler:DifficultyScheduler, wait:bool=True):
+        """Saves the state of a scheduler to the results store (if any),
+        in a worker thread unless `wait` is set."""
+        if self.results is None:
+            return
+        args = (*key, scheduler.as_dict(), time.time())
+        if wait:
+            self.results.save_state(*args)
+        else:
+            self._executor.submit(self.results.save_state, *args)
+
+    def get_session(self, session_id:str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404, "Unknown session.")
+        return session
+
+    def end_session(self, session:Session) -> dict:
+        self.sessions.pop(session.id, None)
+        session.exercise.close()
+        if session.scheduler_key is not None:
+            # (the scheduler the session played with, even if it was dropped)
+            self.save_scheduler(session.scheduler_key, session.scheduler, wait=False)
+        return session.as_dict()
+
+    async def next_round(self, session:Session) -> dict:
+        exercise = session.exercise
+        exercise.start_round(await self.run_job(exercise.make_round))
+        sample = exercise.round.sample
+        sr = sample.audio.sr
+        return {
+            "round": exercise.round_number,
+            "options": [option["label"] for option in exercise.options],
+            "sample": sample.name,
+            "num_channels": sample.num_channels,
+            "difficulty": exercise.round.difficulty,
+            "sr": sr,
+            "duration": sample.loop_end / sr,
+            "loop_start": sample.loop_start / sr,
+            "loop_end": sample.loop_end / sr,
+        }
+
+    def answer(self, session:Session, data:dict) -> dict:
+        exercise = session.exercise
+        if exercise.round is None:
+            raise HTTPError(409, "No round started.")
+        choice = data.get("choice")
+        if not (type(choice) == int and 0 <= choice < len(exercise.options)):
+            raise HTTPError(400, "'choice' must be the index of an option.")
+        return {
+            "correct": exercise.answer(choice),
+            "solution": exercise.options.index(exercise.solution),
+            "score": exercise.score.as_dict(),
+        }
+
+    def get_format(self, fmt:str) -> str:
+        if fmt not in FORMATS:
+            raise HTTPError(400, f"'format' must be one of: {', '.join(FORMATS)}.")
+        if fmt == "flac" and importlib.util.find_spec("soundfile") is None:
+            raise HTTPError(400, "FLAC encoding is not available.")
+        return fmt
+
+    async def get_audio(self, session:Session, version:str, fmt:str="wav") -> Iterator[bytes]:
+        """Renders the wet sample of the current round unless its audio is
+        cached (on the worker threads) and returns the chunks of the
+        encoded audio (blocking, see `.iter_in_executor()`). The chunks do
+        not depend on the session anymore, so they can be streamed after
+        the session lock is released."""
+        exercise = session.exercise
+        if exercise.round is None:
+            raise HTTPError(409, "No round started.")
+        if version not in ("dry", "wet"):
+            raise HTTPError(400, "'version' must be 'dry' or 'wet'.")
+        round = exercise.round
+        fxs = round.fxs if version == "wet" else None
+        key = self.render_cache.get_key(round.sample, fxs, fmt)
+        if version == "wet" and round.wet is None and key not in self.render_cache:
+            round = await self.run_job(exercise.render, round)
+            exercise.round = round
+        def encode():
+            sample = round.sample
+            if version == "wet":
+                if round.wet is None:
+                    # evicted from the cache meanwhile, rendered with a copy
+                    # of the effects (their state belongs to the round)
+                    sample = RenderedSample(round.sample, copy.deepcopy(round.fxs))
+                else:
+                    sample = round.wet
+            return iter_encoded(sample, fmt, self.chunk_size, self.dither)
+        return self.render_cache.stream(key, encode, 2 * self.chunk_size)
+
+    async def iter_in_executor(self, chunks:Iterator[bytes]) -> AsyncIterator[bytes]:
+        """Produces the chunks of a blocking iterator on the worker threads."""
+        done = object()
+        while (chunk := await self.run_job(next, chunks, done)) is not done:
+            yield chunk
+
+
+def serve(host:str=_SERVER_HOST, port:int=_SERVER_PORT, **kwargs):
+    """Runs the training server until interrupted (see `TrainingServer`
+    for the keyword arguments)."""
+    async def main():
+        server = TrainingServer(**kwargs)
+        await server.start(host, port)
+        print(f"Serving on http://{host}:{server.address[1]}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    asyncio.run(main())
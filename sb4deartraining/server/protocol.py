@@ -0,0 +1,132 @@
+"""Minimal HTTP/1.1 on top of asyncio streams (standard library only).
+
+Supports persistent connections, request bodies with a content length
+and chunked responses for streaming."""
+
+# external imports
+import json
+import asyncio
+from http import HTTPStatus
+from typing import AsyncIterator, Iterator, NamedTuple
+from urllib.parse import urlsplit, parse_qsl
+
+# max. size of the request line and headers (bytes)
+MAX_HEADER_SIZE = 16 * 2 ** 10
+# max. size of request bodies (bytes)
+MAX_BODY_SIZE = 2 ** 20
+
+
+class HTTPError(Exception):
+    """Error answered with the given status code."""
+
+    def __init__(self, status:int, message:str=None):
+        self.status = HTTPStatus(status)
+        self.message = message or self.status.phrase
+        super().__init__(self.message)
+
+
+class Request(NamedTuple):
+    """A parsed HTTP request."""
+    method:str          # e.g. 'GET'
+    path:str            # path without query string
+    query:dict          # query parameters
+    headers:dict        # header fields (lower case names)
+    body:bytes          # request body
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    def json(self) -> dict:
+        """Returns the body parsed as JSON object (empty if no body)."""
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Invalid JSON body.")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "JSON object expected.")
+        return data
+
+
+async def read_request(reader:asyncio.StreamReader) -> Request:
+    """Reads the next request from a connection. Returns None if the
+    client closed the connection."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HTTPError(400, "Incomplete request.")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431)
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(400, "Invalid request line.")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid content length.")
+    if length < 0:
+        raise HTTPError(400, "Invalid content length.")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413)
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+
+
+def _head(status:int, headers:dict) -> bytes:
+    status = HTTPStatus(status)
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def write_response(writer:asyncio.StreamWriter, status:int, body:bytes=b"",
+                         content_type:str="application/json", keep_alive:bool=True):
+    """Writes a complete response."""
+    writer.write(_head(status, {
+        "Content-Type": content_type,
+        "Content-Length": len(body),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }) + body)
+    await writer.drain()
+
+
+async def write_json(writer:asyncio.StreamWriter, status:int, data, keep_alive:bool=True):
+    """Writes a response with a JSON body."""
+    await write_response(writer, status, json.dumps(data).encode(), keep_alive=keep_alive)
+
+
+async def write_chunked(writer:asyncio.StreamWriter, status:int,
+                        chunks:AsyncIterator[bytes] | Iterator[bytes],
+                        content_type:str="application/octet-stream", keep_alive:bool=True):
+    """Writes a response with chunked transfer encoding. Each chunk is
+    sent as soon as it is available; waiting for the client to receive
+    it (backpressure) does not block the event loop."""
+    writer.write(_head(status, {
+        "Content-Type": content_type,
+        "Transfer-Encoding": "chunked",
+        "Connection": "keep-alive" if keep_alive else "close",
+    }))
+    async def send(chunk:bytes):
+        if chunk:
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            await writer.drain()
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            await send(chunk)
+    else:
+        for chunk in chunks:
+            await send(chunk)
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
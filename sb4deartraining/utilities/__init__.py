@@ -1 +1,10 @@
-"""Utility functions for various audio-related tasks."""
\ No newline at end of file
+"""Utility functions for various audio-related tasks."""
+
+# external imports
+import numpy as np
+
+
+def _as_array(x):
+    """Converts lists and tuples to arrays (scalars and arrays are kept),
+    so that the conversions accept all of them."""
+    return np.asarray(x) if isinstance(x, (list, tuple)) else x
@@ -1,15 +1,90 @@
+"""Utility functions for working with frequencies and pitch.
 
+The functions accept scalars as well as NumPy arrays (broadcast against
+each other) and return arrays for array input."""
+
+# external imports
+import numpy as np
+# internal imports
+from ..config import _JUST_BELOW_NYQUIST
 from ..constants import ST_RATIOS
 
-def add_semi_tones(freq:float, st:int|float=0):
-    if st == 0:
-        return freq
-    elif type(st) == int:
-        # write st = 12 * n + k with 0 <= k < 12
-        n = st // 12
-        k = st % 12
-        freq *= 2 ** n
-        freq *= ST_RATIOS[k]
-        return freq
-    else:
-        return freq * 2 ** (st / 12)
\ No newline at end of file
+_ST_RATIOS = np.array(ST_RATIOS)
+
+
+def add_semi_tones(freq:float|np.ndarray, st:int|float|np.ndarray=0):
+    """Shifts frequencies by (possibly fractional) semi-tones. Integer
+    steps use the exact semi-tone ratios (see `ST_RATIOS`).
+
+    Arguments:
+    - freq: frequencies (Hz)
+    - st: semi-tones (negative values shift down)
+    """
+    if np.ndim(freq) == 0 and np.ndim(st) == 0 and not isinstance(st, np.ndarray):
+        if st == 0:
+            return freq
+        elif type(st) == int:
+            # write st = 12 * n + k with 0 <= k < 12
+            n = st // 12
+            k = st % 12
+            freq *= 2 ** n
+            freq *= ST_RATIOS[k]
+            return freq
+        else:
+            return freq * 2 ** (st / 12)
+    st = np.asarray(st)
+    if np.issubdtype(st.dtype, np.integer):
+        # st = 12 * n + k as above (scaling by 2 ** n is exact)
+        n, k = np.divmod(st, 12)
+        return np.asarray(freq) * np.ldexp(_ST_RATIOS[k], n)
+    return np.asarray(freq) * 2 ** (st / 12)
+
+def get_band_freqs(base:float=1000, f_min:float=16, f_max:float=_JUST_BELOW_NYQUIST,
+                   bands_per_octave:int=1) -> np.ndarray:
+    """Returns the grid of bands (e.g. octaves or third-octaves) through a
+    base frequency within a given range as ascending array.
+
+    Arguments:
+    - base: Reference frequency (Hz)
+    - f_min: Lowest admissible frequency (Hz)
+    - f_max: Highest admissible frequency (Hz)
+    - bands_per_octave: 1 for octaves, 3 for third-octaves, ...
+    """
+    if not 0 < f_min <= f_max:
+        return np.empty(0)
+    # octaves of the base frequency covering the range
+    n = np.arange(np.floor(np.log2(f_min / base)) - 1, np.ceil(np.log2(f_max / base)) + 1)
+    # steps within an octave (computed like base * 2 ** (j / bands) * 2 ** n)
+    steps = base * 2 ** (np.arange(bands_per_octave) / bands_per_octave)
+    freqs = np.ldexp(steps, n[:, np.newaxis].astype(int)).ravel()
+    return freqs[(f_min <= freqs) & (freqs <= f_max)]
+
+def get_octave_freqs(base:float=1000, f_min:float=16, f_max:float=_JUST_BELOW_NYQUIST) -> list[float]:
+    """Returns all octaves of a base frequency within a given range,
+    sorted in ascending order (the base frequency is always included,
+    see `get_band_freqs` for an array).
+
+    Arguments:
+    - base: Reference frequency (Hz)
+    - f_min: Lowest admissible frequency (Hz)
+    - f_max: Highest admissible frequency (Hz)
+    """
+    # lower octaves down to f_min, higher ones up to f_max
+    n_min = min(np.floor(np.log2(f_min / base)), 0)
+    n_max = max(np.ceil(np.log2(f_max / base)), 0)
+    n = np.arange(n_min, n_max + 1).astype(int)
+    octaves = np.ldexp(float(base), n)
+    octaves = octaves[((n < 0) & (f_min <= octaves)) | (n == 0) | ((n > 0) & (octaves <= f_max))]
+    return octaves.tolist()
+
+def get_third_freqs(base:float=1000, f_min:float=16, f_max:float=_JUST_BELOW_NYQUIST) -> list[float]:
+    """Returns the third-octave grid through a base frequency within
+    a given range, sorted in ascending order (see `get_band_freqs` for
+    an array).
+
+    Arguments:
+    - base: Reference frequency (Hz)
+    - f_min: Lowest admissible frequency (Hz)
+    - f_max: Highest admissible frequency (Hz)
+    """
+    return get_band_freqs(base, f_min, f_max, 3).tolist()
@@ -1,16 +1,22 @@
-"""Utility functions for working with audio levels."""
+"""Utility functions for working with audio levels.
 
+The conversions accept scalars as well as NumPy arrays (or lists) and
+return arrays for array input."""
+
+# external imports
 import numpy as np
+# internal imports
+from . import _as_array
 
 def convert_ratio_to_db(ratio:float) -> float:
     """Converts level difference (dB) to amplitude ratio."""
     # db = 20 * np.log10(ratio)
-    db = 20 * np.log10(np.maximum(ratio, 1e-12))
+    db = 20 * np.log10(np.maximum(_as_array(ratio), 1e-12))
     return db
 
 def convert_db_to_ratio(db):
     """Converts amplitude ratio to level difference (dB)."""
-    ratio = 10 ** (db / 20)
+    ratio = 10 ** (_as_array(db) / 20)
     return ratio
 
 def add_db(signal:np.ndarray, db:float) -> np.ndarray:
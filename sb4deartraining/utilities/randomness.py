@@ -0,0 +1,26 @@
+"""Random number generators for reproducible randomness.
+
+Components drawing random values (sample selection, options of exercises,
+noise, ...) accept a generator (or a seed) instead of using the global
+state of `random` or `np.random`. Seeded generators make round sequences
+reproducible (e.g. for benchmarks), and generators owned by a session are
+not shared with (or perturbed by) concurrent sessions."""
+
+# external imports
+import random
+import numpy as np
+
+
+def get_rng(rng:random.Random | int=None) -> random.Random:
+    """Returns `rng` if it is a generator, otherwise a new generator
+    seeded with it (None seeds from the operating system)."""
+    if isinstance(rng, random.Random):
+        return rng
+    return random.Random(rng)
+
+
+def get_np_rng(rng:np.random.Generator | int=None) -> np.random.Generator:
+    """Returns `rng` if it is a NumPy generator, otherwise a new one seeded
+    with it (None seeds from the operating system)."""
+    return np.random.default_rng(rng)
+
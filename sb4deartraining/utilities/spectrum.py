@@ -0,0 +1,56 @@
+"""Utility functions for spectral analysis of audio signals."""
+
+# external imports
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+# internal imports
+from ..config import _SR
+from .frequencies import get_third_freqs
+
+
+def get_power_spectrum(audiodata:np.ndarray, sr:int=_SR, n_fft:int=16384) -> tuple[np.ndarray]:
+    """Computes the average power spectrum of an audio signal (mixed 
+    down to mono) from Hann-windowed frames with 50% overlap. All frames
+    are transformed in a single call.
+
+    Arguments:
+    - audiodata: audio data, 1d (mono) or 2d (num_channels, num_samples)
+    - sr: sample rate
+    - n_fft: frame length (frequency resolution sr / n_fft)
+
+    Returns the frequencies of the FFT bins and the power per bin.
+    """
+    mono = audiodata if audiodata.ndim == 1 else np.mean(audiodata, axis=0)
+    if len(mono) < n_fft:
+        mono = np.pad(mono, (0, n_fft - len(mono)))
+    frames = sliding_window_view(mono, n_fft)[::n_fft // 2]
+    spectra = np.fft.rfft(frames * np.hanning(n_fft).astype(mono.dtype), axis=-1)
+    power = np.mean(np.abs(spectra) ** 2, axis=0)
+    freqs = np.fft.rfftfreq(n_fft, 1 / sr)
+    return freqs, power
+
+def get_band_energies(audiodata:np.ndarray, sr:int=_SR, band_freqs:list[float]=None, 
+                      n_fft:int=16384) -> np.ndarray:
+    """Computes the energy of an audio signal in third-octave bands 
+    relative to its total energy (dB). Bands without energy (or without
+    FFT bins) get -inf.
+
+    Arguments:
+    - audiodata: audio data, 1d (mono) or 2d (num_channels, num_samples)
+    - sr: sample rate
+    - band_freqs: center frequencies of the bands (by default, the 
+    third-octave grid from `get_third_freqs` up to the Nyquist frequency)
+    - n_fft: frame length of the spectral analysis
+    """
+    if band_freqs is None:
+        band_freqs = get_third_freqs(f_max=sr / 2 - 1)
+    freqs, power = get_power_spectrum(audiodata, sr, n_fft)
+    # band edges half a third-octave below/above the center frequencies
+    centers = np.asarray(band_freqs, dtype=float)
+    lower = np.searchsorted(freqs, centers * 2 ** (-1 / 6))
+    upper = np.searchsorted(freqs, centers * 2 ** (1 / 6))
+    cumulative = np.concatenate([[0.], np.cumsum(power, dtype=np.float64)])
+    energies = cumulative[upper] - cumulative[lower]
+    total = cumulative[-1]
+    with np.errstate(divide='ignore'):
+        return 10 * np.log10(energies / total) if total > 0 else np.full(len(centers), -np.inf)
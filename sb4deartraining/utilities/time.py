@@ -1,33 +1,41 @@
-"""Several utility functions for working with time in audio data."""
+"""Several utility functions for working with time in audio data.
+
+The functions accept scalars as well as NumPy arrays (or lists) and
+return arrays for array input."""
 
 # external imports
 import numpy as np
 # internal imports
 from ..config import _SR
+from . import _as_array
 
 def convert_samples_to_seconds(num_samples:int, sr:int=_SR) -> float:
     """Convert the number of audio samples to seconds.
-    
+
     Arguments:
     - num_samples: Number of samples
     - sr: Sample rate
     """
-    seconds = num_samples / sr
+    seconds = _as_array(num_samples) / sr
     return seconds
 
 def convert_seconds_to_samples(seconds:float, sr:int=_SR) -> int:
-    """Convert time in seconds to number of audio samples.
-    
+    """Convert time in seconds to number of audio samples (truncated
+    towards zero like `int()`).
+
     Arguments:
     - seconds: Time in seconds
     - sr: Sample rate
     """
-    num_samples = int(seconds * sr)
+    seconds = _as_array(seconds)
+    if np.ndim(seconds) == 0:
+        return int(seconds * sr)
+    num_samples = (seconds * sr).astype(np.int64)
     return num_samples
 
 def convert_samples_to_ms(num_samples:int, sr:int=_SR) -> float:
     """Convert the number of audio samples to milliseconds.
-    
+
     Arguments:
     - num_samples: Number of samples
     - sr: Sample rate
@@ -37,11 +45,10 @@ def convert_samples_to_ms(num_samples:int, sr:int=_SR) -> float:
 
 def convert_ms_to_samples(ms:float, sr:int=_SR) -> int:
     """Convert time in milliseconds to number of audio samples.
-    
+
     Arguments:
     - ms: Time in milliseconds
     - sr: Sample rate
     """
-    num_samples = convert_seconds_to_samples(ms / 1000, sr)
+    num_samples = convert_seconds_to_samples(_as_array(ms) / 1000, sr)
     return num_samples
-